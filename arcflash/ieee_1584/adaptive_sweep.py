@@ -0,0 +1,201 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Adaptive one-parameter sweeps, for finding discontinuities, kinks and other anomalies in the results.
+#
+# tests/parameter_sweep.py sweeps V_oc over 4.16 - 15 kV in fixed 10 V steps, to look at anomalies in the full vs
+# reduced results (refer additional_test_cases/"Full vs reduced results - anomalies"). A fixed step wastes nearly every
+# evaluation on smooth stretches of the curve, and still only locates a feature to within one step.
+#
+# adaptive_sweep() starts with a coarse, evenly spaced grid, and repeatedly bisects only the intervals next to a large
+# change in slope, until they are narrower than `x_tol`:
+#
+#   * On a smooth stretch of the curve, the change in slope between neighbouring intervals is proportional to their
+#     width, so it soon falls below the threshold and the refinement stops.
+#   * At a kink (e.g. I_arc where the LV model meets the HV model at 0.6 kV, or E at the 508 mm Table 6 breakpoint),
+#     the change in slope does not get smaller as the intervals get narrower, so the kink is bracketed down to x_tol.
+#   * At a jump (e.g. the reduced E at 0.6 kV, or E at the 660.4 mm Table 6 breakpoint), the slope of the interval
+#     containing the jump grows as it gets narrower, so the jump is bracketed down to x_tol too.
+#   * Intervals where one of the `crossings` outputs changes sign are also bisected down to x_tol, e.g. to find where
+#     the reduced arcing current case starts to give a higher E than the full case.
+#
+# (The join between the two interpolation formulas at 2.7 kV, Eqs 16 - 24, is smooth: both the value and the slope
+# are continuous there, so it is not reported.)
+#
+# The slope threshold is `slope_rtol` times the average slope of a curve that rises through its whole range over the
+# sweep, i.e. slope_rtol * (max(y) - min(y)) / (hi - lo), using the range of y on the initial grid.
+#
+# Each round of bisection is a single call to the (vectorised) function, so the number of calls is about
+# log2((hi - lo) / (n_initial * x_tol)). The number of evaluations grows with the number of features found, not with
+# the resolution: each feature costs a few evaluations per halving of the interval width.
+#
+#     result = sweep_parameter(base, "V_oc", 0.208, 15.0, x_tol=1e-4)
+#     result.features       # dict of columns, one row per feature found
+#     result.n_evaluations, result.uniform_equivalent
+
+import numpy as np
+
+from arcflash.ieee_1584 import sweep
+
+FEATURE_KINDS = ("jump", "kink", "crossing",)
+
+# Parameters that sweep_parameter() can vary, in the units of vectorized.py.
+PARAMETERS = ("V_oc", "G", "D", "height", "width", "depth", "I_bf", "T",)
+
+
+class AdaptiveSweep:
+    def __init__(self, x: np.ndarray, values: dict, features: dict, n_evaluations: int, n_calls: int,
+                 uniform_equivalent: int):
+        # x                     the points evaluated, in increasing order
+        # values                dict of output name -> values at x
+        # features              dict of columns, one row per feature, sorted by x. Refer _features().
+        # n_evaluations         number of points evaluated (len(x))
+        # n_calls               number of calls to the function
+        # uniform_equivalent    number of points an evenly spaced grid would need for the same resolution (x_tol)
+        self.x = x
+        self.values = values
+        self.features = features
+        self.n_evaluations = n_evaluations
+        self.n_calls = n_calls
+        self.uniform_equivalent = uniform_equivalent
+
+
+def _slopes(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.diff(y) / np.diff(x)
+
+
+def _flag(x: np.ndarray, values: dict, slope_tol: dict, crossings: tuple) -> np.ndarray:
+    # Intervals to bisect: those next to a change in slope larger than the threshold, or (for the `crossings`
+    # outputs) where the output changes sign.
+    flagged = np.zeros(len(x) - 1, dtype=bool)
+    for name, y in values.items():
+        change = np.abs(np.diff(_slopes(x, y))) > slope_tol[name]  # at interior points
+        flagged[:-1] |= change
+        flagged[1:] |= change
+        if name in crossings:
+            flagged |= np.sign(y[:-1]) * np.sign(y[1:]) < 0
+    return flagged
+
+
+def adaptive_sweep(f, lo: float, hi: float, x_tol: float = None, n_initial: int = 65, slope_rtol: float = 0.05,
+                   jump_rtol: float = 1e-6, crossings: tuple = (), max_evaluations: int = 100_000) -> AdaptiveSweep:
+    # Sweeps f over [lo, hi], refining where it has a jump, kink or (for the `crossings` outputs) a change of sign.
+    #
+    # f(x) takes an array of x and returns a dict of output name -> array of values, one per x.
+    # x_tol:    width to which features are bracketed. Default (hi - lo) / 1e6.
+    # slope_rtol, jump_rtol:    thresholds, relative to each output's range over the initial grid. Refer the notes at
+    #           the top of this file and _features().
+    # max_evaluations:  the refinement stops early (leaving features bracketed less tightly) rather than exceed this.
+    assert hi > lo
+    assert n_initial >= 3
+    if x_tol is None:
+        x_tol = (hi - lo) / 1e6
+
+    x = np.linspace(lo, hi, n_initial)
+    values = {name: np.asarray(y, dtype=float) for name, y in f(x).items()}
+    unknown = set(crossings) - set(values)
+    if unknown:
+        raise ValueError(f"Unknown output(s) {sorted(unknown)} in crossings. Must be one of {tuple(values)}.")
+    n_calls = 1
+
+    scale = {name: max(np.nanmax(y) - np.nanmin(y), np.finfo(float).tiny) for name, y in values.items()}
+    slope_tol = {name: slope_rtol * s / (hi - lo) for name, s in scale.items()}
+
+    while True:
+        flagged = _flag(x, values, slope_tol, crossings) & (np.diff(x) > x_tol)
+        n_new = np.count_nonzero(flagged)
+        if n_new == 0 or len(x) + n_new > max_evaluations:
+            break
+        x_new = (x[:-1][flagged] + x[1:][flagged]) / 2
+        new = f(x_new)
+        n_calls += 1
+
+        # Merge the new points in. Each new point goes straight after the left end of its interval.
+        order = np.argsort(np.concatenate((x, x_new)), kind="stable")
+        x = np.concatenate((x, x_new))[order]
+        values = {name: np.concatenate((y, np.asarray(new[name], dtype=float)))[order] for name, y in values.items()}
+
+    features = _features(x, values, slope_tol, {name: jump_rtol * s for name, s in scale.items()}, crossings)
+    return AdaptiveSweep(x, values, features, len(x), n_calls, int(np.ceil((hi - lo) / x_tol)) + 1)
+
+
+def _features(x: np.ndarray, values: dict, slope_tol: dict, jump_tol: dict, crossings: tuple) -> dict:
+    # The features found, as a dict of columns, one row per feature:
+    #   output      name of the output
+    #   kind        "jump", "kink" or "crossing"
+    #   x           estimated location
+    #   x_lo, x_hi  bracket containing the feature
+    #   size        jump: the change in value across it
+    #               kink: the change in slope across it
+    #               crossing: the slope at the crossing
+    #
+    # A run of consecutive points with a change in slope over the threshold is one feature. It is a jump if the change
+    # in value across its steepest interval is more than the slopes on either side of the run can account for, by more
+    # than jump_tol. Otherwise it is a kink.
+    rows = []
+    for name, y in values.items():
+        s = _slopes(x, y)
+        change = np.flatnonzero(np.abs(np.diff(s)) > slope_tol[name]) + 1  # indices into x
+        runs = np.split(change, np.flatnonzero(np.diff(change) > 1) + 1) if len(change) else []
+        for run in runs:
+            first, last = run[0], run[-1]
+            # Intervals first - 1 ... last lie within the run. The slopes just outside it are those of intervals
+            # first - 2 and last + 1, where they exist.
+            s_left = s[first - 2] if first >= 2 else s[first - 1]
+            s_right = s[last + 1] if last + 1 < len(s) else s[last]
+            dy = np.diff(y)[first - 1:last + 1]
+            h = np.diff(x)[first - 1:last + 1]
+            j = int(np.argmax(np.abs(dy)))
+            excess = np.abs(dy[j]) - h[j] * max(abs(s_left), abs(s_right))
+            if excess > jump_tol[name]:
+                rows.append((name, "jump", (x[first - 1 + j] + x[first + j]) / 2, x[first - 1 + j], x[first + j],
+                             dy[j]))
+            else:
+                i = first + int(np.argmax(np.abs(np.diff(s)[first - 1:last])))
+                rows.append((name, "kink", x[i], x[first - 1], x[last + 1], s_right - s_left))
+
+        if name in crossings:
+            for i in np.flatnonzero(np.sign(y[:-1]) * np.sign(y[1:]) < 0):
+                x_0 = x[i] - y[i] / s[i]
+                rows.append((name, "crossing", x_0, x[i], x[i + 1], s[i]))
+
+    rows.sort(key=lambda row: (row[2], row[0]))
+    columns = ("output", "kind", "x", "x_lo", "x_hi", "size",)
+    features = {column: [row[k] for row in rows] for k, column in enumerate(columns)}
+    return {
+        "output": np.array(features["output"], dtype=str),
+        "kind": np.array(features["kind"], dtype=str),
+        **{column: np.array(features[column], dtype=float) for column in columns[2:]},
+    }
+
+
+def evaluate_full_and_reduced(columns: dict) -> dict:
+    # The outputs looked at by sweep_parameter(): those of sweep.evaluate_scenarios(), i.e. I_arc, E and AFB for the
+    # full and reduced cases (with the same T), and E_margin = E_full - E_reduced, which is negative where the reduced
+    # case gives the higher incident energy.
+    out = {name: values for name, values in sweep.evaluate_scenarios(columns).items() if name not in columns}
+    out["E_margin"] = out["E_full"] - out["E_reduced"]
+    return out
+
+
+def sweep_parameter(base: dict, parameter: str, lo: float, hi: float, crossings: tuple = ("E_margin",),
+                    **kwargs) -> AdaptiveSweep:
+    # Adaptive sweep of one input of the IEEE 1584 calculation, with the others fixed.
+    #
+    # base:         the fixed inputs, as a dict of V_oc, EC, G, D, height, width, depth, I_bf and T, in the units of
+    #               vectorized.py. The input being swept may be left out.
+    # parameter:    the input to sweep, one of PARAMETERS, from lo to hi.
+    # Other arguments are passed to adaptive_sweep(). The outputs are those of evaluate_full_and_reduced().
+    #
+    # Like vectorized.py, this does no checking of input ranges, so a sweep can go outside the model's range of
+    # validity (e.g. V_oc from 0.208 to 15 kV crosses from the LV model to the HV model at 0.6 kV).
+    if parameter not in PARAMETERS:
+        raise ValueError(f"Unknown parameter {parameter!r}. Must be one of {PARAMETERS}.")
+
+    def f(x: np.ndarray) -> dict:
+        columns = {name: np.full(len(x), base[name]) for name in PARAMETERS + ("EC",) if name != parameter}
+        columns[parameter] = x
+        return evaluate_full_and_reduced(columns)
+
+    return adaptive_sweep(f, lo, hi, crossings=crossings, **kwargs)
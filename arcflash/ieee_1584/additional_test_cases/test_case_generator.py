@@ -15,9 +15,7 @@
 #  8. Box height, height (mm)
 #  9. Box depth, a selection of either "Typical" or "Shallow(<=8 inch)".
 
-import itertools
-from math import prod
-
+from arcflash.ieee_1584.scenario_space import ScenarioSpace
 from arcflash.ieee_1584.units import kA, kV, ms, mm
 
 # Electrode configuration: pick one of five options.
@@ -156,14 +154,19 @@ depth = (
     # 1000 * mm,
 )
 
-# Generate all possible combinations of the above
+# Generate all possible combinations of the above.
+# Scenarios are yielded as tuples of plain floats, in kV, kA, mm, and ms - see scenario_space.UNITS.
+
+LV_space = ScenarioSpace(EC=EC, V_oc=V_oc_LV, I_bf=I_bf_LV, G=G_LV, D=D, T=T, width=width, height=height, depth=depth)
+HV_space = ScenarioSpace(EC=EC, V_oc=V_oc_HV, I_bf=I_bf_HV, G=G_HV, D=D, T=T, width=width, height=height, depth=depth)
+space = LV_space + HV_space
+scenarios_iter = iter(space)
 
-LV_scenarios_iter = itertools.product(EC, V_oc_LV, I_bf_LV, G_LV, D, T, width, height, depth)
-HV_scenarios_iter = itertools.product(EC, V_oc_HV, I_bf_HV, G_HV, D, T, width, height, depth)
-scenarios_iter = itertools.chain(LV_scenarios_iter, HV_scenarios_iter)
+# The same scenarios, less those which are invalid due to busbar gap vs. enclosure width (see Cubicle.check_model_bounds)
+valid_space = space.filter(("width", "G",), lambda width, G: width >= 4 * G)
 
 # Count number of possible scenarios
 
-no_of_LV_scenarios = prod([len(x) for x in (EC, V_oc_LV, I_bf_LV, G_LV, D, T, width, height, depth,)])
-no_of_HV_scenarios = prod([len(x) for x in (EC, V_oc_HV, I_bf_HV, G_HV, D, T, width, height, depth,)])
-no_of_scenarios = no_of_LV_scenarios + no_of_HV_scenarios
+no_of_LV_scenarios = len(LV_space)
+no_of_HV_scenarios = len(HV_space)
+no_of_scenarios = len(space)
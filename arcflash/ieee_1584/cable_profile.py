@@ -0,0 +1,140 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Arc flash profile along a cable run.
+#
+# The bolted fault current falls along a feeder as the cable impedance adds to the source impedance. The incident energy
+# does not simply fall with it: a lower fault current usually means a longer clearing time, so the worst point along a
+# long cable (e.g. a trailing cable in a mine, feeding equipment that is moved along it) can be anywhere between the two
+# ends.
+#
+# cable_profile() works out I_bf at many points along the cable, and evaluates IEEE 1584 at all of them at once with
+# the vectorised calculation, for equipment matching a template Cubicle. At a distance x from the sending end:
+#
+#       Z(x) = Z_source + (R + jX) * x
+#       I_bf(x) = V_prefault * V_oc / (sqrt(3) * |Z(x)|)
+#
+# where Z_source is worked out from the fault level I_sc and X/R ratio at the sending end, as for
+# Network.add_source(), and R + jX is the cable's (positive sequence) impedance per unit length.
+#
+# The clearing time is either fixed, or given by a time-current curve T_curve(I_arc) -> T (kA -> ms), e.g. from
+# ppe_breakpoints.tabulated_curve().
+#
+# Points where I_bf is outside the model's range (refer validation.py) are not evaluated, and have NaN results.
+#
+#     profile = cable_profile(c, I_sc=20 * kA, X_R=8, R=0.12 * ohm / m / 1000, X=0.08 * ohm / m / 1000,
+#                             length=2000 * m, T_arc=tabulated_curve(...))
+#     profile.x[profile.worst], profile.E_max, profile.AFB_max
+
+from functools import partial
+from math import sqrt
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.executor import Executor
+from arcflash.ieee_1584.short_circuit import _impedance
+from arcflash.ieee_1584.units import Q_, kV, kA, ms, m, mm, ohm, J_per_sq_cm
+from arcflash.ieee_1584.sweep import evaluate_rows
+from arcflash.ieee_1584.validation import validate
+
+
+class CableProfile:
+    def __init__(self, columns: dict):
+        # Columns, one value per point along the cable:
+        #   x           distance from the sending end (m)
+        #   I_bf        bolted fault current (kA)
+        #   reduced     True where the reduced arcing current case gives the higher E (refer cable_profile())
+        #   I_arc       arcing current (kA)
+        #   T           clearing time (ms)
+        #   E           incident energy (J/cm²)
+        #   AFB         arc flash boundary (mm)
+        #   invalid     validation reason code, 0 for points that were evaluated (refer validation.py)
+        self.columns = columns
+        for name, column in columns.items():
+            setattr(self, name, column)
+
+        # Index of the point with the highest E, or None if no point could be evaluated.
+        self.worst = None if np.all(np.isnan(self.E)) else int(np.nanargmax(self.E))
+
+    @property
+    def E_max(self) -> Q_:
+        return np.nanmax(self.E) * J_per_sq_cm if self.worst is not None else None
+
+    @property
+    def AFB_max(self) -> Q_:
+        return np.nanmax(self.AFB) * mm if self.worst is not None else None
+
+
+def fault_currents_along(V_oc: Q_, I_sc: Q_, X_R: float, R: Q_, X: Q_, x: np.ndarray, V_prefault: float = 1.0):
+    # Bolted fault current (kA) at distances x (m) along the cable. Refer the notes at the top of this file.
+    assert V_oc.check('[electric_potential]')
+    assert I_sc.check('[current]')
+    assert R.check('[resistance] / [length]')
+    assert X.check('[resistance] / [length]')
+
+    _V_oc = V_oc.m_as(kV)
+    Z_source = _impedance(_V_oc / (sqrt(3) * I_sc.m_as(kA)), X_R)  # ohms (kV / kA)
+    z = complex(R.m_as(ohm / m), X.m_as(ohm / m))
+    return V_prefault * _V_oc / (sqrt(3) * np.abs(Z_source + z * np.asarray(x, dtype=float)))
+
+
+def _evaluate_points(columns: dict, T_arc, full_or_reduced: str) -> dict:
+    # Evaluates a chunk of points along the cable. T_arc is a fixed time (ms), or a function T_curve(I_arc) -> T.
+    # Returns I_arc, T, E and AFB, and "reduced" (1 where the reduced arcing current case is used, else 0).
+    args = tuple(columns[name] for name in ("V_oc", "EC", "G", "D", "CF", "VarCF", "I_bf",))
+
+    def case(which: str) -> dict:
+        if callable(T_arc):
+            I_arc = vectorized.calculate_from_factors(*args, 1.0, which)["I_arc"]
+            T = np.asarray(T_arc(I_arc), dtype=float)
+        else:
+            T = np.full(len(columns["I_bf"]), T_arc)
+        r = vectorized.calculate_from_factors(*args, T, which)
+        r["T"] = T
+        return r
+
+    if full_or_reduced == "worst":
+        full, reduced = case("full"), case("reduced")
+        use_reduced = reduced["E"] > full["E"]
+        r = {name: np.where(use_reduced, reduced[name], full[name]) for name in full}
+    else:
+        r = case(full_or_reduced)
+        use_reduced = np.full(len(r["E"]), full_or_reduced == "reduced")
+    r["reduced"] = use_reduced.astype(float)
+    return r
+
+
+def cable_profile(c: Cubicle, I_sc: Q_, X_R: float, R: Q_, X: Q_, length: Q_, T_arc, n_points: int = 1000,
+                  full_or_reduced: str = "worst", V_prefault: float = 1.0, executor: Executor = None) -> CableProfile:
+    # c:        the equipment at every point along the cable. Its V_oc is the system voltage.
+    # I_sc:     three-phase fault level at the sending end, with X/R ratio X_R.
+    # R, X:     cable impedance per unit length (per phase), e.g. 0.12 * ohm / (1000 * m).
+    # length:   length of the cable. The profile has n_points evenly spaced points, including both ends.
+    # T_arc:    clearing time, either a fixed time (e.g. 200 * ms), or a function T_curve(I_arc) -> T, for I_arc in kA
+    #           and T in ms (NumPy arrays).
+    # full_or_reduced:  "full", "reduced", or "worst" - at each point, the case with the higher E.
+    # executor: the points are evaluated in chunks, on `executor` (refer executor.py). For a ProcessExecutor, a T_curve
+    #           function must be picklable, e.g. from ppe_breakpoints.tabulated_curve().
+    assert length.check('[length]')
+    assert full_or_reduced in ("full", "reduced", "worst",)
+    if isinstance(T_arc, Q_):
+        assert T_arc.check('[time]')
+        T_arc = T_arc.m_as(ms)
+
+    x = np.linspace(0, length.m_as(m), n_points)
+    I_bf = fault_currents_along(c.V_oc, I_sc, X_R, R, X, x, V_prefault)
+
+    V_oc, G, D, width = c.V_oc.m_as(kV), c.G.m_as(mm), c.D.m_as(mm), c.width.m_as(mm)
+    invalid = validate(np.full(n_points, V_oc), c.EC, G, D, width, I_bf)
+
+    points = {"V_oc": V_oc, "EC": c.EC, "G": G, "D": D, "CF": c.CF.m, "VarCF": c.VarCF.m, "I_bf": I_bf}
+    evaluate = partial(_evaluate_points, T_arc=T_arc, full_or_reduced=full_or_reduced)
+    r = evaluate_rows(points, invalid == 0, evaluate, executor)
+
+    columns = {"x": x, "I_bf": I_bf, "reduced": r["reduced"] == 1}
+    for name in ("I_arc", "T", "E", "AFB",):
+        columns[name] = r[name]
+    columns["invalid"] = invalid
+    return CableProfile(columns)
@@ -8,22 +8,29 @@ from arcflash.ieee_1584.equations import I_arc_intermediate, I_arc_min, interpol
 from arcflash.ieee_1584.units import Q_, kV, cal_per_sq_cm, sec, kA
 
 
+def check_inputs(c: Cubicle, I_bf: Q_, full_or_reduced: str) -> None:
+    assert I_bf.check('[current]')
+
+    if (0.208 * kV <= c.V_oc <= 0.600 * kV) and not (0.500 * kA <= I_bf <= 106.000 * kA):
+        raise ValueError(f"I_bf out of range for LV calculation. I_bf = {I_bf:.3f~P} is outside the range 500 A to 106 kA.")
+    elif (0.600 * kV < c.V_oc <= 15.000 * kV) and not (0.200 * kA <= I_bf <= 65.000 * kA):
+        raise ValueError(f"I_bf out of range for HV calculation. I_bf = {I_bf:.3f~P} is outside the range 200 A to 65 kA.")
+
+    assert full_or_reduced in ("full", "reduced",)
+
+
 class Calculation:
-    def __init__(self, c: Cubicle, I_bf: Q_, full_or_reduced: str):
+    def __init__(self, c: Cubicle, I_bf: Q_, full_or_reduced: str, check: bool = True):
         # "full" means the full value of I_arc is used.
         # "reduced" means that I_arc_min is used, e.g. that the arcing current variation factor VarCF is used.
         #
         # I have called these "full"/"reduced" to avoid confusion with "max"/"min" which mean e.g.
         # "maximum fault operating scenario" and "minimum fault operating scenario" in context.
+        #
+        # check=False ("trusted inputs") skips the input checks below. Refer Cubicle.__init__().
 
-        assert I_bf.check('[current]')
-
-        if (0.208 * kV <= c.V_oc <= 0.600 * kV) and not (0.500 * kA <= I_bf <= 106.000 * kA):
-            raise ValueError(f"I_bf out of range for LV calculation. I_bf = {I_bf:.3f~P} is outside the range 500 A to 106 kA.")
-        elif (0.600 * kV < c.V_oc <= 15.000 * kV) and not (0.200 * kA <= I_bf <= 65.000 * kA):
-            raise ValueError(f"I_bf out of range for HV calculation. I_bf = {I_bf:.3f~P} is outside the range 200 A to 65 kA.")
-
-        assert full_or_reduced in ("full", "reduced",)
+        if check:
+            check_inputs(c, I_bf, full_or_reduced)
 
         self.c = c
         self.I_bf = I_bf
@@ -107,3 +114,43 @@ Then, with T_arc = {self.T_arc:.1f~P}:
 E = {self.E:.3f~P} or {self.E.to(cal_per_sq_cm):.3f~P}
 AFB = {self.AFB:.0f~P}
 """
+
+
+def calculate_full_and_reduced(c: Cubicle, I_bf: Q_, T_arc_full: Q_ = None, T_arc_reduced: Q_ = None,
+                               check: bool = True) -> (Calculation, Calculation):
+    # Does both the "full" and the "reduced" calculation for one case, i.e. the equivalent of:
+    #
+    #     full = Calculation(c, I_bf, "full")
+    #     full.calculate_I_arc()
+    #     full.calculate_E_AFB(T_arc_full)
+    #     reduced = Calculation(c, I_bf, "reduced")
+    #     reduced.calculate_I_arc()
+    #     reduced.calculate_E_AFB(T_arc_reduced)
+    #
+    # but the intermediate arcing currents (Eq 1, and Eq 25 for LV) are only worked out once, and the reduced values
+    # are derived from the full ones. Each case has its own clearing time. If a clearing time is None, E and AFB are
+    # not calculated for that case - e.g. when the clearing time is to be looked up from I_arc. Call calculate_E_AFB()
+    # on the returned Calculation later.
+    #
+    # Returns (full, reduced). The results are identical to those of separate calculations.
+    if check:
+        check_inputs(c, I_bf, "full")
+    full = Calculation(c, I_bf, "full", check=False)
+    reduced = Calculation(c, I_bf, "reduced", check=False)
+
+    full.calculate_I_arc()
+    if c.vlevel == "HV":
+        reduced.I_arc_600 = I_arc_min(c, full.I_arc_600)
+        reduced.I_arc_2700 = I_arc_min(c, full.I_arc_2700)
+        reduced.I_arc_14300 = I_arc_min(c, full.I_arc_14300)
+        reduced.I_arc = interpolate(c, reduced.I_arc_600, reduced.I_arc_2700, reduced.I_arc_14300)
+    elif c.vlevel == "LV":
+        # I_arc_600 is the full value in both cases. Refer Calculation.calculate_E_AFB().
+        reduced.I_arc_600 = full.I_arc_600
+        reduced.I_arc = I_arc_min(c, full.I_arc)
+
+    if T_arc_full is not None:
+        full.calculate_E_AFB(T_arc_full)
+    if T_arc_reduced is not None:
+        reduced.calculate_E_AFB(T_arc_reduced)
+    return full, reduced
@@ -0,0 +1,164 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# A calculation "plan" specialised for one Cubicle, for fast repeated evaluation at many values of I_bf and T.
+#
+# For a fixed cubicle, much of Eq 1 and Eqs 3-6 does not depend on I_bf or T. CompiledCubicle works these parts out
+# once, when it is created:
+#
+#   * Eq 1:     k1 + k3 * log10(G)
+#   * Eqs 3-6:  log10(12.552 / 50) + k1 + k2 * log10(G) + log10(1 / CF) + k12 * log10(D)
+#   * Eq 2:     the reduction factor (1 - 0.5 * VarCF)
+#   * Eq 25:    (0.6 / V_oc) ** 2, and (0.6 ** 2 - V_oc ** 2) / 0.6 ** 2
+#   * Eqs 16-24: the interpolation between 0.6, 2.7, and 14.3 kV is linear in the three intermediate values, so it is
+#     reduced to three weights. For V_oc > 2.7 kV the weight of the 0.6 kV value is zero, and the 0.6 kV intermediate
+#     values are not calculated at all.
+#
+# Also, the I_bf polynomial in Eq 1 (Table 1, k4 ... k10) has the same coefficients as the polynomial in the
+# denominator of Eqs 3-6 (Tables 3-5, k4 ... k10), and the 2.7 kV and 14.3 kV polynomials are often the same as each
+# other. Each distinct polynomial is evaluated only once per call.
+#
+#     compiled = cubicle.compile()
+#     I_arc, E, AFB = compiled(15 * kA, 197 * ms, "full")
+#
+# I_bf and T can be scalars or arrays. The results are the same as Calculation (to within floating-point rounding).
+# As with Calculation, I_bf must be within the range of the model.
+
+from math import log10
+
+import numpy as np
+
+from arcflash.ieee_1584.tables import table_1, table_3, table_4, table_5
+from arcflash.ieee_1584.units import Q_, kA, kV, mm, ms, dimensionless, J_per_sq_cm
+
+_tables_3_4_5 = {0.6: table_3, 2.7: table_4, 14.3: table_5}
+
+
+def _interpolation_weights(V_oc: float) -> dict:
+    # Weights w such that interpolate(c, x_600, x_2700, x_14300) == w[0.6] * x_600 + w[2.7] * x_2700 + w[14.3] * x_14300
+    # Refer equations.interpolate().
+
+    # Eq 17 / 20 / 23: x2 = (1 - a) * x_2700 + a * x_14300
+    a = 1 + (V_oc - 14.3) / 11.6
+    if V_oc > 2.7:
+        return {2.7: 1 - a, 14.3: a}
+
+    # Eq 16 / 19 / 22: x1 = (1 - b) * x_600 + b * x_2700
+    b = 1 + (V_oc - 2.7) / 2.1
+    # Eq 18 / 21 / 24: x3 = x1 * (2.7 - V_oc) / 2.1 + x2 * (V_oc - 0.6) / 2.1
+    w1 = (2.7 - V_oc) / 2.1
+    w2 = (V_oc - 0.6) / 2.1
+    return {0.6: w1 * (1 - b), 2.7: w1 * b + w2 * (1 - a), 14.3: w2 * a}
+
+
+def _horner(coefficients: tuple, x):
+    y = coefficients[0]
+    for k in coefficients[1:]:
+        y = y * x + k
+    return y
+
+
+class _Level:
+    # Folded constants for one intermediate voltage level (or for the LV calculation).
+    def __init__(self, c, V: float, polys: list):
+        _G = c.G.m_as(mm)
+        _D = c.D.m_as(mm)
+        _CF = c.CF.m_as(dimensionless)
+
+        # Equation 1
+        k = table_1[(c.EC, V,)]
+        self.I_arc_const = k["k1"] + k["k3"] * log10(_G)
+        self.I_arc_k2 = k["k2"]
+        self.I_arc_poly = self._poly_index(polys, tuple(k[f"k{i}"] for i in range(4, 11)))
+
+        # Equations 3, 4, 5, 6
+        k = _tables_3_4_5[V][c.EC]
+        self.E_const = log10(12.552 / 50) + k["k1"] + k["k2"] * log10(_G) + log10(1 / _CF) + k["k12"] * log10(_D)
+        self.E_k3 = k["k3"]
+        self.E_k11 = k["k11"]
+        self.E_k13 = k["k13"]
+        self.E_poly = self._poly_index(polys, tuple(k[f"k{i}"] for i in range(4, 11)))
+
+        # Equations 7, 8, 9, 10 (via E). Refer vectorized.intermediate_AFB_from_E().
+        self.AFB_const = log10(_D) + log10(5.0208) / k["k12"]
+        self.AFB_k12 = k["k12"]
+
+    @staticmethod
+    def _poly_index(polys: list, coefficients: tuple) -> int:
+        if coefficients not in polys:
+            polys.append(coefficients)
+        return polys.index(coefficients)
+
+
+class CompiledCubicle:
+    def __init__(self, c):
+        self.c = c
+        self.vlevel = c.vlevel
+        self._V_oc = c.V_oc.m_as(kV)
+        self._reduction = 1 - 0.5 * c.VarCF.m_as(dimensionless)
+
+        # Distinct I_bf polynomials. Each level refers to these by index.
+        self._polys = list()
+
+        if self.vlevel == "HV":
+            self._weights = _interpolation_weights(self._V_oc)
+            self._levels = {V: _Level(c, V, self._polys) for V in self._weights}
+        else:
+            self._level = _Level(c, 0.6, self._polys)
+            self._lv_x1 = (0.6 / self._V_oc) ** 2
+            self._lv_x3 = (0.6 ** 2 - self._V_oc ** 2) / 0.6 ** 2
+
+    def __call__(self, I_bf: Q_, T_arc: Q_, full_or_reduced: str = "full") -> (Q_, Q_, Q_):
+        # Returns I_arc, E, AFB.
+        assert I_bf.check('[current]')
+        assert T_arc.check('[time]')
+        r = self.evaluate(I_bf.m_as(kA), T_arc.m_as(ms), full_or_reduced)
+        return r["I_arc"] * kA, r["E"] * J_per_sq_cm, r["AFB"] * mm
+
+    def evaluate(self, I_bf, T, full_or_reduced: str = "full") -> dict:
+        # As __call__(), but for plain floats (or arrays) in the units used by vectorized.py: I_bf in kA, T in ms.
+        # Returns a dict of I_arc (kA), E (J/cm²), and AFB (mm).
+        assert full_or_reduced in ("full", "reduced",)
+        reduced = full_or_reduced == "reduced"
+
+        I_bf = np.asarray(I_bf, dtype=float)
+        T = np.asarray(T, dtype=float)
+        log_I_bf = np.log10(I_bf)
+        polys = [_horner(p, I_bf) for p in self._polys]
+
+        if self.vlevel == "LV":
+            lvl = self._level
+            # Eq 1, then Eq 25
+            I_arc_600 = 10 ** (lvl.I_arc_const + lvl.I_arc_k2 * log_I_bf) * polys[lvl.I_arc_poly]
+            I_arc = 1 / np.sqrt(self._lv_x1 * (1 / I_arc_600 ** 2 - self._lv_x3 / I_bf ** 2))
+            if reduced:
+                I_arc = I_arc * self._reduction
+
+            # Eq 6. Note I_arc_600 (full), **not** I_arc_600 (reduced), even in a "reduced" calculation.
+            log_E = self._log_E(lvl, I_arc_600, np.log10(I_arc), I_bf, log_I_bf, T, polys)
+            E = 10 ** log_E
+            AFB = 10 ** (lvl.AFB_const - log_E / lvl.AFB_k12)
+        else:
+            I_arc = 0.0
+            E = 0.0
+            AFB = 0.0
+            for V, lvl in self._levels.items():
+                w = self._weights[V]
+                # Eq 1, Eq 2
+                I_arc_x = 10 ** (lvl.I_arc_const + lvl.I_arc_k2 * log_I_bf) * polys[lvl.I_arc_poly]
+                if reduced:
+                    I_arc_x = I_arc_x * self._reduction
+                # Eqs 3, 4, 5
+                log_E = self._log_E(lvl, I_arc_x, np.log10(I_arc_x), I_bf, log_I_bf, T, polys)
+
+                I_arc = I_arc + w * I_arc_x
+                E = E + w * 10 ** log_E
+                AFB = AFB + w * 10 ** (lvl.AFB_const - log_E / lvl.AFB_k12)
+
+        return {"I_arc": I_arc, "E": E, "AFB": AFB}
+
+    @staticmethod
+    def _log_E(lvl: _Level, I_arc_num, log_I_arc, I_bf, log_I_bf, T, polys: list):
+        # log10 of Eqs 3, 4, 5, 6.
+        x3 = lvl.E_k3 * I_arc_num / (I_bf * polys[lvl.E_poly])
+        return np.log10(T) + lvl.E_const + x3 + lvl.E_k11 * log_I_bf + lvl.E_k13 * log_I_arc
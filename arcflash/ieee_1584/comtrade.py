@@ -0,0 +1,321 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Incident energy reconstructed from a fault recording, in COMTRADE format (IEEE C37.111).
+#
+# After a real arc flash event, the fault currents recorded by protection relays or disturbance recorders can be used
+# to work out the incident energy that was actually released. A recording is split into short windows (by default, one
+# cycle of the power system frequency); the RMS current in each window is one step of a multi-step calculation
+# (refer multistep.py), lasting for the duration of the window.
+#
+# Recordings can be long, so the .dat file is read in chunks and windows are processed as they arrive - memory use does
+# not depend on the length of the recording.
+#
+# The recorded current during an arcing fault is the *arcing* current I_arc, not the bolted fault current I_bf that
+# IEEE 1584 starts from. By default (measured="arcing") I_bf is found from I_arc for each window by inverting Equation 1
+# (with Equation 25 for LV, and the interpolation of Equations 16-24 for HV). Use measured="bolted" to use the recorded
+# current as I_bf directly. The recorded current is then clipped to the model's range of I_bf, as it is (via the range
+# of arcing currents) for measured="arcing" - a window with a current just above `threshold`, e.g. as the fault starts
+# or clears, counts as a fault at the bottom of the range.
+#
+# Each batch of windows is evaluated at once, with the vectorised calculation (refer _step_energies()).
+#
+# Windows where the current is below `threshold` (e.g. load current before the fault, and zero current after the fault
+# is cleared) are not part of the arc, and are skipped.
+#
+# Supported: ASCII, BINARY, BINARY32 and FLOAT32 data files, with a single sampling rate. Channel values are scaled to
+# primary amps or kiloamps, according to the channel's units.
+#
+#     E, AFB, n_windows = recorded_E_and_AFB(cubicle, "event.cfg", channels=("IA", "IB", "IC"))
+
+import itertools
+import os
+from math import ceil, sqrt, pi
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.multistep import MultistepAccumulator
+from arcflash.ieee_1584.units import Q_, kA, kV, mm, sec, dimensionless
+from arcflash.ieee_1584.validation import I_BF_RANGE
+
+FORMATS = ("ASCII", "BINARY", "BINARY32", "FLOAT32",)
+
+
+class AnalogChannel:
+    def __init__(self, fields: list):
+        # An,ch_id,ph,ccbm,uu,a,b,skew,min,max[,primary,secondary,PS]
+        self.index = int(fields[0])
+        self.name = fields[1].strip()
+        self.phase = fields[2].strip()
+        self.units = fields[4].strip()
+        self.a = float(fields[5])
+        self.b = float(fields[6])
+        self.skew = float(fields[7] or 0)
+        if len(fields) >= 13:
+            self.primary = float(fields[10])
+            self.secondary = float(fields[11])
+            self.primary_or_secondary = fields[12].strip().upper()
+        else:
+            self.primary, self.secondary, self.primary_or_secondary = 1.0, 1.0, "P"
+
+    def scale(self) -> (float, float):
+        # Returns (a, b) such that a * raw + b is the primary value, in kA for current channels.
+        a, b = self.a, self.b
+        if self.primary_or_secondary == "S":
+            a, b = a * self.primary / self.secondary, b * self.primary / self.secondary
+        to_kA = {"A": 1e-3, "kA": 1.0}.get(self.units)
+        if to_kA is None:
+            raise ValueError(f"Channel {self.name!r} has units {self.units!r}. Current channels must be in A or kA.")
+        return a * to_kA, b * to_kA
+
+
+class ComtradeConfig:
+    # The contents of a .cfg file.
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, encoding="latin-1") as fh:
+            lines = [line.rstrip("\r\n") for line in fh]
+        fields = [line.split(",") for line in lines]
+
+        self.station_name = fields[0][0]
+        self.revision = int(fields[0][2]) if len(fields[0]) > 2 and fields[0][2].strip() else 1991
+
+        n_analog = int(fields[1][1].strip().rstrip("Aa"))
+        n_digital = int(fields[1][2].strip().rstrip("Dd"))
+        self.analog = [AnalogChannel(f) for f in fields[2:2 + n_analog]]
+        self.n_digital = n_digital
+
+        i = 2 + n_analog + n_digital
+        self.frequency = float(fields[i][0])
+        n_rates = int(fields[i + 1][0])
+        rates = [(float(f[0]), int(f[1])) for f in fields[i + 2:i + 2 + max(n_rates, 1)]]
+        if len(rates) > 1:
+            raise ValueError(f"{path}: recordings with more than one sampling rate are not supported.")
+        self.sample_rate, self.n_samples = rates[0]
+
+        i += 2 + max(n_rates, 1)
+        self.start = lines[i]
+        self.trigger = lines[i + 1]
+        self.format = lines[i + 2].strip().upper()
+        if self.format not in FORMATS:
+            raise ValueError(f"{path}: unknown data file format {self.format!r}. Must be one of {FORMATS}.")
+        self.time_multiplier = float(fields[i + 3][0]) if len(lines) > i + 3 and lines[i + 3].strip() else 1.0
+
+    def channel_index(self, name) -> int:
+        # Position of an analog channel, by name (e.g. "IA") or by its 1-based channel number.
+        for j, ch in enumerate(self.analog):
+            if ch.name == name or ch.index == name:
+                return j
+        raise ValueError(f"{self.path}: no analog channel {name!r}.")
+
+    @property
+    def dat_path(self) -> str:
+        base, ext = os.path.splitext(self.path)
+        return base + (".DAT" if ext.isupper() else ".dat")
+
+    def _binary_dtype(self) -> np.dtype:
+        analog = {"BINARY": "<i2", "BINARY32": "<i4", "FLOAT32": "<f4"}[self.format]
+        return np.dtype([("n", "<u4"), ("timestamp", "<u4"), ("analog", analog, (len(self.analog),)),
+                         ("digital", "<u2", (ceil(self.n_digital / 16),))])
+
+
+def read_chunks(cfg: ComtradeConfig, chunk_size: int = 65536):
+    # Yields (time in seconds, analog values) for successive chunks of samples from the .dat file. The analog values
+    # are the raw (unscaled) values, as an array of shape (n_samples_in_chunk, n_analog_channels).
+    if cfg.format == "ASCII":
+        with open(cfg.dat_path, encoding="latin-1") as fh:
+            while True:
+                lines = list(itertools.islice(fh, chunk_size))
+                if not lines:
+                    return
+                data = np.loadtxt(lines, delimiter=",", ndmin=2)
+                yield _times(cfg, data[:, 0], data[:, 1]), data[:, 2:2 + len(cfg.analog)]
+    else:
+        dtype = cfg._binary_dtype()
+        with open(cfg.dat_path, mode="rb") as fh:
+            while True:
+                data = np.fromfile(fh, dtype=dtype, count=chunk_size)
+                if len(data) == 0:
+                    return
+                yield _times(cfg, data["n"], data["timestamp"]), data["analog"].astype(float)
+
+
+def _times(cfg: ComtradeConfig, n: np.ndarray, timestamp: np.ndarray) -> np.ndarray:
+    # Sample times, in seconds. From the sampling rate if it is given, otherwise from the timestamps (microseconds).
+    if cfg.sample_rate > 0:
+        return (np.asarray(n, dtype=float) - 1) / cfg.sample_rate
+    return np.asarray(timestamp, dtype=float) * cfg.time_multiplier * 1e-6
+
+
+def rms_windows(cfg: ComtradeConfig, channels: tuple, window_cycles: float = 1.0, chunk_size: int = 65536):
+    # Yields (start time in seconds, duration in seconds, RMS current in kA) for successive windows of the recording.
+    # The RMS current is averaged over the given channels (e.g. the three phases). A final partial window is dropped.
+    if cfg.sample_rate <= 0:
+        raise ValueError(f"{cfg.path}: a fixed sampling rate is needed to split the recording into windows.")
+    window = max(int(round(cfg.sample_rate / cfg.frequency * window_cycles)), 1)
+    columns = [cfg.channel_index(ch) for ch in channels]
+    scales = np.array([cfg.analog[j].scale() for j in columns])
+
+    # Samples left over from the previous chunk, which don't yet fill a window.
+    carry_t = np.empty(0)
+    carry_x = np.empty((0, len(columns)))
+    for t, raw in read_chunks(cfg, chunk_size):
+        x = raw[:, columns] * scales[:, 0] + scales[:, 1]
+        t = np.concatenate([carry_t, t])
+        x = np.concatenate([carry_x, x])
+
+        n_windows = len(t) // window
+        used = n_windows * window
+        if n_windows:
+            sq = (x[:used] ** 2).reshape(n_windows, window, len(columns))
+            I_rms = np.sqrt(sq.mean(axis=1)).mean(axis=1)
+            starts = t[:used:window]
+            for start, I in zip(starts.tolist(), I_rms.tolist()):
+                yield start, window / cfg.sample_rate, I
+        carry_t, carry_x = t[used:], x[used:]
+
+
+def I_bf_from_I_arc(c: Cubicle, I_arc, full_or_reduced: str = "full", n_grid: int = 512,
+                    iterations: int = 50) -> np.ndarray:
+    # Inverts Equation 1 (and Eq 25, or Eqs 16-24): finds I_bf (kA) such that the arcing current is I_arc (kA).
+    # I_arc is clipped to the range of arcing currents over the model's range of I_bf.
+    #
+    # The arcing current nearly always increases with I_bf, but not quite always - due to the polynomial terms in Eq 1,
+    # it can decrease slightly at the top of the range of I_bf (e.g. for HCB and VOA at 208 V). So the arcing current is
+    # first tabulated on a log-spaced grid of I_bf, to find the grid cells that bracket a solution. Where there is more
+    # than one, the highest I_bf is used, as the conservative choice. The solution is then refined by bisection.
+    compiled = c.compile()
+    grid = np.log(np.geomspace(*I_BF_RANGE[c.vlevel], n_grid))
+    a = compiled.evaluate(np.exp(grid), 1.0, full_or_reduced)["I_arc"]
+
+    I_arc = np.clip(np.asarray(I_arc, dtype=float), a.min(), a.max())
+    target = I_arc[..., np.newaxis]
+    brackets = (a[:-1] - target) * (a[1:] - target) <= 0
+    cell = n_grid - 2 - np.argmax(brackets[..., ::-1], axis=-1)
+
+    lo, hi = grid[cell], grid[cell + 1]
+    rising = a[cell + 1] >= a[cell]
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        below = (compiled.evaluate(np.exp(mid), 1.0, full_or_reduced)["I_arc"] < I_arc) == rising
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+    return np.exp((lo + hi) / 2)
+
+
+def _step_energies(c: Cubicle, I_bf: np.ndarray, T: np.ndarray, full_or_reduced: str) -> dict:
+    # Incident energy (J/cm²) of each step, for I_bf in kA and T in ms, and for HV the intermediate E_600, E_2700 and
+    # E_14300 that MultistepAccumulator needs for the AFB. The same equations, in the same order, as Calculation.
+    I_bf = np.asarray(I_bf, dtype=float)
+    ec = vectorized.ec_index(c.EC)
+    V_oc, G, D = c.V_oc.m_as(kV), c.G.m_as(mm), c.D.m_as(mm)
+    CF, VarCF = c.CF.m_as(dimensionless), c.VarCF.m_as(dimensionless)
+    reduced = full_or_reduced == "reduced"
+
+    if c.vlevel == "LV":
+        I_arc_600 = vectorized.I_arc_intermediate(ec, 0.6, I_bf, G)
+        I_arc = vectorized.I_arc_final_LV(V_oc, I_arc_600, I_bf)
+        if reduced:
+            I_arc = vectorized.I_arc_min(I_arc, VarCF)
+        return {"E": vectorized.intermediate_E(ec, 0.6, I_arc, I_bf, T, G, CF, D, I_arc_600)}
+
+    E_x = dict()
+    for V in vectorized.V_LEVELS:
+        I_arc = vectorized.I_arc_intermediate(ec, V, I_bf, G)
+        if reduced:
+            I_arc = vectorized.I_arc_min(I_arc, VarCF)
+        E_x[V] = vectorized.intermediate_E(ec, V, I_arc, I_bf, T, G, CF, D)
+    E_600, E_2700, E_14300 = (E_x[V] for V in vectorized.V_LEVELS)
+    return {"E": vectorized.interpolate(V_oc, E_600, E_2700, E_14300), "E_600": E_600, "E_2700": E_2700,
+            "E_14300": E_14300}
+
+
+def recorded_E_and_AFB(c: Cubicle, cfg_path: str, channels: tuple = ("IA", "IB", "IC",), window_cycles: float = 1.0,
+                       threshold: Q_ = 0.2 * kA, measured: str = "arcing", full_or_reduced: str = "full",
+                       chunk_size: int = 65536) -> (Q_, Q_, int):
+    # Total incident energy E and arc flash boundary AFB for the arcing windows of a recording.
+    # Returns (E, AFB, number of arcing windows).
+    assert measured in ("arcing", "bolted",)
+    assert threshold.check('[current]')
+    cfg = ComtradeConfig(cfg_path)
+    _threshold = threshold.m_as(kA)
+
+    acc = MultistepAccumulator(c)
+    batch = list()
+    for window in itertools.chain(rms_windows(cfg, channels, window_cycles, chunk_size), [None]):
+        if window is not None and window[2] >= _threshold:
+            batch.append(window)
+        # Arcing windows are processed in batches, so that I_bf_from_I_arc() and the calculation are vectorised.
+        if batch and (window is None or len(batch) == 1024):
+            T = np.array([duration for _, duration, _ in batch]) * 1000  # s -> ms
+            I = np.array([I for _, _, I in batch])
+            if measured == "arcing":
+                I_bf = I_bf_from_I_arc(c, I, full_or_reduced)
+            else:
+                I_bf = np.clip(I, *I_BF_RANGE[c.vlevel])
+            acc.add_values(**_step_energies(c, I_bf, T, full_or_reduced))
+            batch = list()
+
+    return acc.E, acc.AFB, acc.n_steps
+
+
+def write_sample(path: str, I_fault: Q_, fault_start: Q_, fault_duration: Q_, total_duration: Q_,
+                 I_load: Q_ = 0.1 * kA, frequency: float = 50.0, sample_rate: float = 4000.0, fmt: str = "ASCII",
+                 X_R: float = 10.0, seed: int = 0) -> str:
+    # Writes a synthetic three-phase fault recording (a .cfg file and a .dat file), for tests and examples.
+    #
+    # Before the fault the phase currents are I_load (RMS). From fault_start, for fault_duration, they are I_fault (RMS,
+    # symmetrical) plus a decaying DC offset (time constant from X_R). After the fault is cleared they are zero. A
+    # little noise is added. Returns the path of the .cfg file.
+    assert fmt in ("ASCII", "BINARY",)
+    base, _ = os.path.splitext(path)
+    cfg_path, dat_path = base + ".cfg", base + ".dat"
+
+    n_samples = int(round(total_duration.m_as(sec) * sample_rate))
+    t = np.arange(n_samples) / sample_rate
+    # Fault inception and clearing, as sample numbers.
+    i0 = int(round(fault_start.m_as(sec) * sample_rate))
+    i1 = i0 + int(round(fault_duration.m_as(sec) * sample_rate))
+    t_fault = np.maximum(t - i0 / sample_rate, 0)
+    w = 2 * pi * frequency
+    tau = X_R / w
+    rng = np.random.default_rng(seed)
+
+    currents = list()
+    for shift in (0, -2 * pi / 3, 2 * pi / 3):
+        load = sqrt(2) * I_load.m_as(kA) * 1000 * np.sin(w * t + shift)
+        I_peak = sqrt(2) * I_fault.m_as(kA) * 1000
+        fault = I_peak * (np.sin(w * t_fault + shift) - np.sin(shift) * np.exp(-t_fault / tau))
+        i = np.concatenate([load[:i0], fault[i0:i1], np.zeros(n_samples - i1)])
+        currents.append(i + rng.normal(0, 0.001 * I_fault.m_as(kA) * 1000, n_samples))
+    currents = np.array(currents).T
+
+    # Scale to the 16-bit range.
+    a = float(np.abs(currents).max()) / 32000
+    raw = np.round(currents / a).astype(np.int16)
+
+    with open(cfg_path, mode="w") as fh:
+        fh.write("arcflash sample,SAMPLE,1999\n3,3A,0D\n")
+        for j, ph in enumerate("ABC"):
+            fh.write(f"{j + 1},I{ph},{ph},,A,{a!r},0,0,-32767,32767,1,1,P\n")
+        fh.write(f"{frequency:g}\n1\n{sample_rate:g},{n_samples}\n")
+        fh.write("01/01/2000,00:00:00.000000\n01/01/2000,00:00:00.000000\n")
+        fh.write(f"{fmt}\n1\n")
+
+    n = np.arange(1, n_samples + 1)
+    timestamps = np.round(t * 1e6).astype(np.int64)
+    if fmt == "ASCII":
+        with open(dat_path, mode="w") as fh:
+            for row in zip(n.tolist(), timestamps.tolist(), *raw.T.tolist()):
+                fh.write(",".join(map(str, row)) + "\n")
+    else:
+        cfg_dtype = np.dtype([("n", "<u4"), ("timestamp", "<u4"), ("analog", "<i2", (3,)), ("digital", "<u2", (0,))])
+        records = np.zeros(n_samples, dtype=cfg_dtype)
+        records["n"] = n
+        records["timestamp"] = timestamps
+        records["analog"] = raw
+        records.tofile(dat_path)
+
+    return cfg_path
@@ -0,0 +1,162 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Fault currents for many switching states of a network, without refactorising Ybus for each state.
+#
+# Sites with tie breakers and alternate feeds have many possible switching states, and the worst-case arc flash hazard
+# at a bus is often in an unusual one. ContingencyAnalysis factorises Ybus once, for the network's base switching state,
+# and then treats each switching state as a low-rank change to it.
+#
+# Opening or closing a branch with admittance y between buses f and t changes Ybus by +/- y * a * a^T, where a is the
+# vector with +1 at f and -1 at t. For k changed branches, Y' = Y + A @ dY @ A^T, and by the Woodbury identity:
+#
+#       Z' = Z - U @ inverse(C) @ U^T,      where U = Z @ A (n x k), and C = inverse(dY) + A^T @ U (k x k)
+#
+# (Z is symmetric, so A^T @ Z = U^T.) Only the diagonal of Z' is needed for fault currents, which costs O(n * k^2) per
+# state. Z @ a for every switchable branch is calculated once, up front, so no further solves are needed.
+#
+# If a switching state changes which buses are energised (i.e. it isolates part of the network, or connects a
+# de-energised part to a source), the update does not apply - Y' has a different size, or C is singular. So there is one
+# base case per distinct set of energised buses: the first state seen with a new set of energised buses is factorised in
+# full, and becomes the base case for every later state with the same energised buses.
+#
+#     analysis = ContingencyAnalysis(network, ["Tie 1", "Tie 2", "Feeder B"])
+#     states = all_switching_states(3)            # bool array, one row per state, one column per switchable branch
+#     I_bf = analysis.fault_currents(states[5])   # kA, one per bus
+#     results = contingency_study(analysis, states, equipment)
+
+import itertools
+
+import numpy as np
+
+from arcflash.ieee_1584.executor import Executor
+from arcflash.ieee_1584.short_circuit import Network, evaluate_energised, fault_currents_from_Z, _components, _energised
+from arcflash.ieee_1584.sweep import evaluate_scenarios
+
+
+def all_switching_states(n_switches: int) -> np.ndarray:
+    # Every combination of open (False) / closed (True) for n switchable branches, one state per row.
+    return np.array(list(itertools.product((False, True,), repeat=n_switches)), dtype=bool).reshape(-1, n_switches)
+
+
+class _BaseCase:
+    # A factorised switching state, and Z @ a for every switchable branch between its energised buses (whether the
+    # branch is open or closed in this state).
+    def __init__(self, network: Network, branches: list, closed: np.ndarray, sparse: bool):
+        self.closed = closed
+        with _SwitchingState(branches, closed):
+            self.factorised = network.factorise(sparse)
+        self.Z_diagonal = self.factorised.Z_diagonal()
+
+        energised = self.factorised.energised
+        index = self.factorised.index
+        # Branches with a de-energised end do not affect the energised network in any state sharing this base case.
+        self.in_base = np.array([energised[b.from_bus] and energised[b.to_bus] for b in branches], dtype=bool)
+        self.ends = np.array([(index[b.from_bus], index[b.to_bus]) for b in branches], dtype=np.intp).reshape(-1, 2)
+
+        A = np.zeros((self.factorised.n, len(branches)), dtype=complex)
+        for j in np.flatnonzero(self.in_base):
+            A[self.ends[j, 0], j] = 1
+            A[self.ends[j, 1], j] = -1
+        self.U = self.factorised.factor.solve(A) if A.size else A
+
+
+class ContingencyAnalysis:
+    def __init__(self, network: Network, switchable: list, sparse: bool = None):
+        # `switchable`: names of the branches whose state varies. The network's current state is the first base case.
+        self.network = network
+        self.switchable = list(switchable)
+        self.sparse = sparse
+
+        self._branches = [network.branches[network._branch_index(name)] for name in self.switchable]
+        self._z = np.array([b.z for b in self._branches], dtype=complex)
+
+        # Buses connected by closed branches that are not switchable are always in the same island. Label these groups
+        # once, so that finding the energised buses for a switching state only has to consider the switchable branches.
+        switchable_set = set(map(id, self._branches))
+        fixed = [(b.from_bus, b.to_bus) for b in network.branches if b.closed and id(b) not in switchable_set]
+        self._group = _components(len(network.bus_names), fixed)
+        self._n_groups = int(self._group.max()) + 1 if len(self._group) else 0
+        self._source_groups = [self._group[i] for i, _ in network.sources]
+        self._branch_groups = [(self._group[b.from_bus], self._group[b.to_bus]) for b in self._branches]
+
+        # Base cases, by set of energised buses.
+        base = _BaseCase(network, self._branches, np.array([b.closed for b in self._branches], dtype=bool), sparse)
+        self._bases = {base.factorised.energised.tobytes(): base}
+
+        # Number of states evaluated by low-rank update, and by full factorisation.
+        self.n_updated = 0
+        self.n_factorised = 1
+
+    def Z_diagonal(self, closed) -> np.ndarray:
+        # Diagonal of Zbus (per-unit, NaN for de-energised buses) with each switchable branch open (False) or closed
+        # (True), as given by `closed`.
+        closed = np.asarray(closed, dtype=bool)
+        assert closed.shape == (len(self._branches),)
+
+        energised = self._energised(closed)
+        base = self._bases.get(energised.tobytes())
+        if base is None:
+            base = _BaseCase(self.network, self._branches, closed, self.sparse)
+            self._bases[energised.tobytes()] = base
+            self.n_factorised += 1
+            return base.Z_diagonal.copy()
+
+        self.n_updated += 1
+        changed = np.flatnonzero((closed != base.closed) & base.in_base)
+        if len(changed) == 0:
+            return base.Z_diagonal.copy()
+
+        U = base.U[:, changed]
+        ends = base.ends[changed]
+        A_T_U = U[ends[:, 0]] - U[ends[:, 1]]
+
+        # dY is +y for a branch being closed, and -y for a branch being opened.
+        C = np.diag(np.where(closed[changed], self._z[changed], -self._z[changed])) + A_T_U
+
+        d = base.Z_diagonal.copy()
+        d[energised] -= np.einsum("ik,ik->i", U, np.linalg.solve(C, U.T).T)
+        return d
+
+    def fault_currents(self, closed, V_prefault: float = 1.0) -> np.ndarray:
+        # Bolted three-phase fault current at each bus (kA) for one switching state.
+        return fault_currents_from_Z(self.network, self.Z_diagonal(closed), V_prefault)
+
+    def _energised(self, closed: np.ndarray) -> np.ndarray:
+        edges = [e for e, c in zip(self._branch_groups, closed.tolist()) if c]
+        return _energised(self._n_groups, self._source_groups, edges)[self._group]
+
+
+class _SwitchingState:
+    # Temporarily sets the state of some branches, restoring the original state afterwards.
+    def __init__(self, branches: list, closed: np.ndarray):
+        self.branches = branches
+        self.closed = closed
+
+    def __enter__(self):
+        self.original = [b.closed for b in self.branches]
+        for b, c in zip(self.branches, np.asarray(self.closed).tolist()):
+            b.closed = c
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for b, c in zip(self.branches, self.original):
+            b.closed = c
+
+
+def contingency_study(analysis: ContingencyAnalysis, states, equipment: dict, V_prefault: float = 1.0,
+                      evaluate=evaluate_scenarios, executor: Executor = None) -> dict:
+    # Evaluates IEEE 1584 for every item of equipment in every switching state, as one batch.
+    #
+    # `states` is a bool array with one row per switching state (refer all_switching_states()), and `equipment` is as
+    # for short_circuit.arc_flash_study(). Returns the equipment columns repeated once per state, plus a "state" column
+    # (the row of `states`) and the results of arc_flash_study(). As there, rows whose fault current (in that state) or
+    # other inputs are outside the model's range have NaN results, and a reason code in the "invalid" column.
+    states = np.asarray(states, dtype=bool).reshape(-1, len(analysis.switchable))
+    bus = analysis.network.bus_index(equipment["bus"])
+
+    columns = {name: np.tile(np.broadcast_to(np.asarray(values), bus.shape), len(states))
+               for name, values in equipment.items()}
+    columns["state"] = np.repeat(np.arange(len(states)), len(bus))
+    columns.setdefault("V_oc", np.tile(analysis.network.V_nom[bus], len(states)))
+    columns["I_bf"] = np.concatenate([analysis.fault_currents(s, V_prefault)[bus] for s in states])
+    return evaluate_energised(columns, columns["I_bf"] > 0, evaluate, executor)
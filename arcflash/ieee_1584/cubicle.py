@@ -8,14 +8,17 @@ from arcflash.ieee_1584.units import Q_, kV, mm, inch, dimensionless
 
 class Cubicle:
     # The Cubicle class encapsulates physical parameters of equipment that do not change with current (kA) or time (ms).
-    def __init__(self, V_oc: Q_, EC: str, G: Q_, D: Q_, height: Q_, width: Q_, depth: Q_):
-        # Check units
-        assert V_oc.check('[electric_potential]')
-        assert G.check('[length]')
-        assert D.check('[length]')
-        assert height.check('[length]')
-        assert width.check('[length]')
-        assert depth.check('[length]')
+    def __init__(self, V_oc: Q_, EC: str, G: Q_, D: Q_, height: Q_, width: Q_, depth: Q_, check: bool = True):
+        # check=False ("trusted inputs") skips the unit and model bounds checks, for inputs that have already been
+        # checked, e.g. by validation.validate(). The results of the calculation are the same either way.
+        if check:
+            # Check units
+            assert V_oc.check('[electric_potential]')
+            assert G.check('[length]')
+            assert D.check('[length]')
+            assert height.check('[length]')
+            assert width.check('[length]')
+            assert depth.check('[length]')
 
         # Assign input data
         self.V_oc = V_oc
@@ -37,8 +40,9 @@ class Cubicle:
         # Calculate dependent variables and do basic input checking
         self.calc_VarCf()
         self.calc_CF()
-        self.check_model_bounds()
-        self.sanity_check()
+        if check:
+            self.check_model_bounds()
+            self.sanity_check()
 
         if 0.600 * kV < self.V_oc <= 15.000 * kV:
             self.vlevel = "HV"
@@ -183,6 +187,12 @@ class Cubicle:
         elif self.enclosure_type == "Shallow":
             self.CF = 1 / x1 * dimensionless
 
+    def compile(self):
+        # Returns a CompiledCubicle - a fast evaluator for this cubicle, for many values of I_bf and T.
+        # Refer compiled.py.
+        from arcflash.ieee_1584.compiled import CompiledCubicle
+        return CompiledCubicle(self)
+
     def pretty_print(self) -> str:
         return f"""Cubicle parameters:
         
@@ -0,0 +1,195 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Pluggable executors for the bulk calculation entry points.
+#
+# Different deployments need different parallelism: serial in tests, threads where the work is mostly NumPy (which
+# releases the GIL for large array operations), processes on large servers, and a single warm pool shared by every call
+# in a long-running service. The bulk entry points take an `executor` argument instead of managing their own pools:
+#
+#   sweep.evaluate_rows() and everything built on it - short_circuit.arc_flash_study(),
+#       contingency.contingency_study(), transformer.transformer_study(), validation.evaluate_valid()
+#   sweep.run_sweep()                               one task per shard
+#   scheduler.Schedule.calculate_full_and_reduced() one task per block
+#   interval.bounds() - and worst_case.EnergyBound and worst_case.worst_case(), which use it
+#                                                   chunks of buses (or grid cells)
+#   cable_profile.cable_profile()                   chunks of points along the cable
+#   surrogate.build_surrogate()                     chunks of grid nodes and certification points
+#   ppe_breakpoints.I_bf_breakpoints() and clearing_time_breakpoints()
+#                                                   chunks of (bus, I_bf) points
+#   labels.write_label_files()                      chunks of label files
+#
+# comtrade.recorded_E_and_AFB() does not take an executor: it streams the recording, and works out each batch of (at
+# most 1024) windows as it is read, so there is never enough work at once to be worth splitting - and the Cubicle it
+# needs holds pint Quantities, which would have to be re-created in the unit registry of every worker process.
+#
+# If `executor` is None, the default executor is used: SerialExecutor(), unless changed with set_default_executor().
+#
+# An Executor splits a dict of columns into chunks of rows (map_chunks()), runs a function on each chunk, and
+# reassembles the results in the original order. The chunk size is tuned to the number of rows and workers: enough
+# chunks to keep every worker busy to the end, but each chunk at least MIN_CHUNK rows (so the per-task overhead, and the
+# cost of sending the chunk to a process, stays small) and at most MAX_CHUNK rows (so the chunk's arrays and
+# temporaries stay in the CPU cache). A SerialExecutor doesn't split the rows at all, so the default is the same single
+# call as before executors were added. Pass chunk_size to the executor to fix it instead.
+#
+# Pools are started on first use and then kept, so that a ProcessExecutor's worker processes only start up, and import
+# arcflash, once - not on every call. Each worker process runs an initializer that imports the modules in PRELOAD,
+# which builds the unit registry (and warms its caches, refer units.py) and the coefficient tables of vectorized.py
+# before the first task arrives. Close an executor with shutdown(), or use it as a context manager.
+#
+#     with ProcessExecutor(workers=8) as executor:
+#         results = arc_flash_study(network, equipment, executor=executor)
+#         run_sweep(space, "sweep_out", n_shards=1000, executor=executor)
+#
+# Functions and columns sent to a ProcessExecutor must be picklable, e.g. module-level functions.
+
+import importlib
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+
+MIN_CHUNK = 4096
+MAX_CHUNK = 65536
+
+# Chunks per worker, when the rows are split evenly.
+CHUNKS_PER_WORKER = 4
+
+PRELOAD = ("arcflash.ieee_1584.units", "arcflash.ieee_1584.tables", "arcflash.ieee_1584.vectorized",
+           "arcflash.ieee_1584.sweep",)
+
+
+class Executor:
+    workers = 1
+
+    def __init__(self, chunk_size: int = None):
+        assert chunk_size is None or chunk_size >= 1
+        self._chunk_size = chunk_size
+
+    def map(self, fn, items) -> list:
+        # [fn(item) for item in items], in order.
+        raise NotImplementedError
+
+    def chunk_size(self, n_rows: int) -> int:
+        # Rows per chunk for map_chunks(). Refer the notes at the top of this file.
+        if self._chunk_size is not None:
+            return self._chunk_size
+        if self.workers == 1:
+            return max(n_rows, 1)
+        even = -(-n_rows // (self.workers * CHUNKS_PER_WORKER))
+        return int(min(max(even, MIN_CHUNK), MAX_CHUNK))
+
+    def map_chunks(self, fn, columns: dict) -> dict:
+        # Runs fn(chunk) -> dict of arrays on chunks of the rows of `columns`, and concatenates the results in order.
+        # Columns are arrays with one value per row; scalars are passed to every chunk as they are. Scalar results are
+        # passed through if they are scalar input columns (e.g. echoed back by sweep.evaluate_scenarios()), and
+        # otherwise broadcast to one value per row.
+        n_rows = _n_rows(columns)
+        size = self.chunk_size(n_rows)
+        if n_rows <= size:
+            return fn(columns)
+
+        chunks = [{name: v[start:start + size] if np.ndim(v) > 0 else v for name, v in columns.items()}
+                  for start in range(0, n_rows, size)]
+        results = self.map(fn, chunks)
+        out = {}
+        for name, first in results[0].items():
+            if np.ndim(first) == 0 and name in columns and np.ndim(columns[name]) == 0:
+                out[name] = first  # a scalar input, passed through, as when there is only one chunk
+            else:
+                out[name] = np.concatenate([np.broadcast_to(r[name], (_n_rows(c),)) if np.ndim(r[name]) == 0
+                                            else r[name] for r, c in zip(results, chunks)])
+        return out
+
+    def shutdown(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+
+def _n_rows(columns: dict) -> int:
+    return next((len(v) for v in columns.values() if np.ndim(v) > 0), 0)
+
+
+class SerialExecutor(Executor):
+    # Runs everything in the calling thread. map_chunks() only splits the rows if chunk_size is given.
+    def map(self, fn, items) -> list:
+        return [fn(item) for item in items]
+
+
+class _PoolExecutor(Executor):
+    def __init__(self, workers: int = None, chunk_size: int = None):
+        super().__init__(chunk_size)
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+
+    def _make_pool(self):
+        raise NotImplementedError
+
+    @property
+    def pool(self):
+        # The pool, started on first use.
+        if self._pool is None:
+            self._pool = self._make_pool()
+        return self._pool
+
+    def map(self, fn, items) -> list:
+        return list(self.pool.map(fn, items))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class ThreadExecutor(_PoolExecutor):
+    # A pool of threads. Worthwhile where most of the time is spent in NumPy operations on large arrays, which release
+    # the GIL, or on free-threaded builds of Python. Refer units.py for the thread safety of the unit registry.
+    def _make_pool(self):
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+
+class ProcessExecutor(_PoolExecutor):
+    # A pool of worker processes. `initializer(*initargs)` is run in each worker, after PRELOAD (and `preload`) have
+    # been imported. `mp_context` is passed to ProcessPoolExecutor, e.g. multiprocessing.get_context("spawn").
+    def __init__(self, workers: int = None, chunk_size: int = None, preload: tuple = (), initializer=None,
+                 initargs: tuple = (), mp_context=None):
+        super().__init__(workers, chunk_size)
+        self.preload = PRELOAD + tuple(preload)
+        self.initializer = initializer
+        self.initargs = initargs
+        self.mp_context = mp_context
+
+    def _make_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context,
+                                   initializer=_initialize_worker,
+                                   initargs=(self.preload, self.initializer, self.initargs))
+
+
+def _initialize_worker(preload: tuple, initializer, initargs: tuple) -> None:
+    # Runs once in each worker process of a ProcessExecutor.
+    for module in preload:
+        importlib.import_module(module)
+    # Work sent to a worker runs there, serially - never in a pool of its own.
+    set_default_executor(SerialExecutor())
+    if initializer is not None:
+        initializer(*initargs)
+
+
+_default_executor = SerialExecutor()
+
+
+def set_default_executor(executor: Executor) -> Executor:
+    # Sets the executor used when a bulk entry point is called with executor=None. Returns the previous default.
+    global _default_executor
+    assert isinstance(executor, Executor)
+    previous, _default_executor = _default_executor, executor
+    return previous
+
+
+def get_executor(executor: Executor = None) -> Executor:
+    return _default_executor if executor is None else executor
@@ -0,0 +1,100 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Immutable, fully initialised versions of Cubicle and Calculation, for sharing between threads.
+#
+# Cubicle and Calculation are built up in stages - Calculation starts out with placeholders set to None, which are
+# filled in by calculate_I_arc() and then calculate_E_AFB(). That is fine for a script, but in a multi-threaded program
+# (e.g. a web backend with a thread pool) it is hard to be sure that no thread ever sees a half-finished object.
+#
+# FrozenCubicle and ArcFlashResult are frozen dataclasses. Every field is calculated when the object is created, and
+# can't be changed afterwards, so they can be shared freely between threads (including on free-threaded builds of
+# Python). They are also hashable, so they can be used as dict keys or cached.
+#
+# All the values they hold are immutable too: strings, and pint Quantities with plain float magnitudes. (A Quantity
+# with a NumPy array magnitude could be changed in place, so these classes only hold scalars.) The shared unit
+# registry in units.py is safe to use from several threads - refer the notes there.
+#
+#     c = FrozenCubicle(V_oc=4.16 * kV, EC="VCB", G=104 * mm, D=914.4 * mm, height=1143 * mm, width=762 * mm,
+#                       depth=508 * mm)
+#     r = ArcFlashResult.calculate(c, 15 * kA, 197 * ms, "full")
+#     r.I_arc, r.E, r.AFB
+
+from dataclasses import dataclass, field, fields
+
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.units import Q_
+
+
+@dataclass(frozen=True)
+class FrozenCubicle:
+    V_oc: Q_
+    EC: str
+    G: Q_
+    D: Q_
+    height: Q_
+    width: Q_
+    depth: Q_
+
+    # Calculated from the fields above. Refer Cubicle.
+    vlevel: str = field(init=False)
+    VarCF: Q_ = field(init=False)
+    CF: Q_ = field(init=False)
+    enclosure_type: str = field(init=False, compare=False)
+    width_1: Q_ = field(init=False, compare=False)
+    height_1: Q_ = field(init=False, compare=False)
+    EES: Q_ = field(init=False, compare=False)
+
+    def __post_init__(self):
+        # Cubicle does all the calculation and input checking. It is only used here, so nothing else can change it.
+        c = Cubicle(self.V_oc, self.EC, self.G, self.D, self.height, self.width, self.depth)
+        for f in fields(self):
+            if not f.init:
+                object.__setattr__(self, f.name, getattr(c, f.name))
+
+    @classmethod
+    def from_cubicle(cls, c: Cubicle) -> "FrozenCubicle":
+        return cls(c.V_oc, c.EC, c.G, c.D, c.height, c.width, c.depth)
+
+    def compile(self):
+        # Refer Cubicle.compile(). A CompiledCubicle is not changed by evaluating it, so it can be shared too.
+        from arcflash.ieee_1584.compiled import CompiledCubicle
+        return CompiledCubicle(self)
+
+
+@dataclass(frozen=True)
+class ArcFlashResult:
+    cubicle: FrozenCubicle
+    I_bf: Q_
+    T_arc: Q_
+    full_or_reduced: str
+
+    I_arc: Q_
+    E: Q_
+    AFB: Q_
+
+    # Intermediate values. These are None for LV calculations, except I_arc_600. Refer Calculation.
+    I_arc_600: Q_ = field(default=None, compare=False)
+    I_arc_2700: Q_ = field(default=None, compare=False)
+    I_arc_14300: Q_ = field(default=None, compare=False)
+    E_600: Q_ = field(default=None, compare=False)
+    E_2700: Q_ = field(default=None, compare=False)
+    E_14300: Q_ = field(default=None, compare=False)
+    AFB_600: Q_ = field(default=None, compare=False)
+    AFB_2700: Q_ = field(default=None, compare=False)
+    AFB_14300: Q_ = field(default=None, compare=False)
+
+    @classmethod
+    def calculate(cls, c: FrozenCubicle, I_bf: Q_, T_arc: Q_, full_or_reduced: str) -> "ArcFlashResult":
+        # Does the whole calculation (Calculation.calculate_I_arc() then Calculation.calculate_E_AFB()) in one step.
+        # The Calculation object is local to this call.
+        if isinstance(c, Cubicle):
+            c = FrozenCubicle.from_cubicle(c)
+        calc = Calculation(c, I_bf, full_or_reduced)
+        calc.calculate_I_arc()
+        calc.calculate_E_AFB(T_arc)
+
+        values = {f.name: getattr(calc, f.name) for f in fields(cls) if f.name not in ("cubicle", "full_or_reduced",)}
+        return cls(cubicle=c, full_or_reduced=full_or_reduced, **values)
+
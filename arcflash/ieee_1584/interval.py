@@ -0,0 +1,615 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Guaranteed upper and lower bounds on I_arc, E and AFB, when the inputs are only known to within a range - e.g. I_bf
+# +/- 10%, G +/- 2 mm, and T anywhere between the minimum and maximum clearing times.
+#
+# Each uncertain input is an Interval [lo, hi] (one per bus), and the calculation (Eqs 1-25, and the enclosure size
+# correction factor of Table 6 / Eqs 11-15) is evaluated in interval arithmetic: every operation returns an interval
+# that contains every value the operation could take, for any values of its inputs within their intervals. So the final
+# intervals contain every value of I_arc, E and AFB the inputs could give.
+#
+# Plain interval arithmetic overestimates when a variable appears more than once (the "dependency problem"): I_bf and G
+# each appear many times (directly, and through I_arc), and every appearance is allowed to vary independently. For LV
+# buses in particular, Eq 25 and Eq 6 are very sensitive to this. To keep the bounds tight:
+#
+#   * Single-variable functions are bounded exactly. log10, 10 ** x and sqrt are monotonic. The polynomials in I_bf
+#     (Eq 1, and the denominator of Eqs 3-6) are bounded by their values at the ends of the interval and at any turning
+#     points inside it - their coefficients only depend on the electrode configuration and voltage level, so their
+#     turning points are found once, when this module is imported. CF (Table 6, Eqs 14 and 15) is bounded branch by
+#     branch (refer CF_interval()).
+#   * The calculation is evaluated together with intervals containing its partial derivatives with respect to I_bf and
+#     G (forward mode automatic differentiation, in interval arithmetic). Where both derivatives have a known sign, the
+#     result is monotonic, and its bounds are its values at two corners of the (I_bf, G) box - exactly. Otherwise, the
+#     mean value theorem bounds it by f(c) + f'(x) * (x - c), for c at the middle of the box, which overestimates much
+#     less than plain interval arithmetic on small boxes. (For HV buses, T is treated the same way - refer bounds().)
+#   * The I_bf interval is split into `n_sub` pieces. Pieces where monotonicity can't be shown, and which set one of the
+#     bus's bounds, are split into four (halving I_bf and G), up to `max_splits` times (branch and bound). Splitting
+#     narrows the derivative intervals, so monotonicity can be shown on more of the range. Pieces that don't set one of
+#     the bounds are not split further, as that could not make the bounds any tighter.
+#
+# D and CF are not treated this way - they are usually exact. If they are given as intervals, the bounds are still
+# valid, but may be wider than the true range for HV buses.
+#
+# Rounding: the calculation is done in ordinary floating point, which is accurate to around 1E-13 (relative) over the
+# whole chain of equations. The final bounds are widened by a relative margin of ROUNDING_MARGIN = 1E-9 to cover this.
+#
+# Cost: with the defaults, bounds() takes around 100 times as long as vectorized.calculate() for the same buses (for
+# I_bf +/- 10% and G +/- 2 mm), and its bounds are typically within 0.1% of the true range. With max_splits = 0, it
+# takes around 15 times as long, but the bounds for LV buses can be tens of percent wider than the true range.
+#
+# Units are as in vectorized.py. V_oc and EC are exact (one value per bus). As in vectorized.py, no check is made that
+# the inputs are within the model's range (refer validation.py).
+#
+#     b = bounds(V_oc, EC, G=Interval.plus_minus(G, 2), D=D, height=height, width=width, depth=depth,
+#                I_bf=Interval.relative(I_bf, 0.1), T=Interval(T_min, T_max), full_or_reduced="full")
+#     b["E"].lo, b["E"].hi, b["AFB"].lo, b["AFB"].hi
+
+from functools import partial
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.executor import Executor, get_executor
+from arcflash.ieee_1584.vectorized import V_LEVELS, ec_index
+
+ROUNDING_MARGIN = 1e-9
+
+
+class Interval:
+    # Closed intervals [lo, hi], one per element of the arrays lo and hi.
+
+    # So that `array * interval` etc. uses Interval's operators, rather than NumPy's.
+    __array_ufunc__ = None
+
+    def __init__(self, lo, hi=None):
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = self.lo if hi is None else np.asarray(hi, dtype=float)
+
+    @property
+    def exact(self) -> bool:
+        # True if the interval was made from exact values (lo and hi are the same array).
+        return self.lo is self.hi
+
+    @classmethod
+    def relative(cls, x, tolerance: float) -> "Interval":
+        # x +/- tolerance * x, e.g. Interval.relative(I_bf, 0.1) for I_bf +/- 10%.
+        x = np.asarray(x, dtype=float)
+        return cls(x * (1 - tolerance), x * (1 + tolerance))
+
+    @classmethod
+    def plus_minus(cls, x, tolerance: float) -> "Interval":
+        # x +/- tolerance, e.g. Interval.plus_minus(G, 2) for G +/- 2 mm.
+        x = np.asarray(x, dtype=float)
+        return cls(x - tolerance, x + tolerance)
+
+    def __repr__(self) -> str:
+        return f"Interval({self.lo!r}, {self.hi!r})"
+
+    def __getitem__(self, item) -> "Interval":
+        return Interval(self.lo[item], self.hi[item])
+
+    def __add__(self, other) -> "Interval":
+        if isinstance(other, _Sensitive):
+            return NotImplemented
+        other = _interval(other)
+        if self.exact and other.exact:
+            return Interval(self.lo + other.lo)
+        return Interval(self.lo + other.lo, self.hi + other.hi)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> "Interval":
+        return Interval(-self.lo) if self.exact else Interval(-self.hi, -self.lo)
+
+    def __sub__(self, other) -> "Interval":
+        if isinstance(other, _Sensitive):
+            return NotImplemented
+        return self + -_interval(other)
+
+    def __rsub__(self, other) -> "Interval":
+        return _interval(other) + -self
+
+    def __mul__(self, other) -> "Interval":
+        if isinstance(other, _Sensitive):
+            return NotImplemented
+        other = _interval(other)
+        if self.exact or other.exact:
+            # Two products are enough. (Most multiplications in the calculation are by a coefficient.)
+            x, y = (self, other) if other.exact else (other, self)
+            if x.exact:
+                return Interval(x.lo * y.lo)
+            a, b = x.lo * y.lo, x.hi * y.lo
+            return Interval(np.minimum(a, b), np.maximum(a, b))
+        a, b, c, d = self.lo * other.lo, self.lo * other.hi, self.hi * other.lo, self.hi * other.hi
+        return Interval(np.minimum(np.minimum(a, b), np.minimum(c, d)), np.maximum(np.maximum(a, b), np.maximum(c, d)))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other) -> "Interval":
+        if isinstance(other, _Sensitive):
+            return NotImplemented
+        return self * _interval(other).reciprocal()
+
+    def __rtruediv__(self, other) -> "Interval":
+        return _interval(other) * self.reciprocal()
+
+    def reciprocal(self) -> "Interval":
+        # Unbounded if the interval contains 0.
+        contains_zero = (self.lo <= 0) & (self.hi >= 0)
+        with np.errstate(divide="ignore"):
+            return Interval(np.where(contains_zero, -np.inf, 1 / self.hi), np.where(contains_zero, np.inf, 1 / self.lo))
+
+    def square(self) -> "Interval":
+        lo2, hi2 = self.lo ** 2, self.hi ** 2
+        contains_zero = (self.lo <= 0) & (self.hi >= 0)
+        return Interval(np.where(contains_zero, 0, np.minimum(lo2, hi2)), np.maximum(lo2, hi2))
+
+    def contains(self, x) -> np.ndarray:
+        return (self.lo <= x) & (x <= self.hi)
+
+
+def _interval(x) -> Interval:
+    return x if isinstance(x, Interval) else Interval(x)
+
+
+class _Sensitive:
+    # An Interval `value`, with Intervals `slope` containing its partial derivatives with respect to each of the inputs
+    # (I_bf, G and T), over the same inputs. Arithmetic follows the usual rules of differentiation. Anything that is not
+    # a _Sensitive is a constant.
+    __array_ufunc__ = None
+
+    def __init__(self, value: Interval, slope: tuple):
+        self.value = value
+        self.slope = slope
+
+    def __add__(self, other) -> "_Sensitive":
+        if not isinstance(other, _Sensitive):
+            return _Sensitive(self.value + other, self.slope)
+        return _Sensitive(self.value + other.value, tuple(a + b for a, b in zip(self.slope, other.slope)))
+
+    __radd__ = __add__
+
+    def __neg__(self) -> "_Sensitive":
+        return _Sensitive(-self.value, tuple(-a for a in self.slope))
+
+    def __sub__(self, other) -> "_Sensitive":
+        return self + -other
+
+    def __rsub__(self, other) -> "_Sensitive":
+        return -self + other
+
+    def __mul__(self, other) -> "_Sensitive":
+        if not isinstance(other, _Sensitive):
+            other = _interval(other)
+            return _Sensitive(self.value * other, tuple(a * other for a in self.slope))
+        return _Sensitive(self.value * other.value,
+                          tuple(a * other.value + self.value * b for a, b in zip(self.slope, other.slope)))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other) -> "_Sensitive":
+        if not isinstance(other, _Sensitive):
+            return self * _interval(other).reciprocal()
+        return self * other.reciprocal()
+
+    def __rtruediv__(self, other) -> "_Sensitive":
+        return self.reciprocal() * other
+
+    def reciprocal(self) -> "_Sensitive":
+        r = self.value.reciprocal()
+        return self._chain(r, -r.square())
+
+    def square(self) -> "_Sensitive":
+        return self._chain(self.value.square(), 2 * self.value)
+
+    def _chain(self, value: Interval, derivative: Interval) -> "_Sensitive":
+        # f(self), given f(self.value) and f'(self.value).
+        return _Sensitive(value, tuple(a * derivative for a in self.slope))
+
+
+def log10(x):
+    # -inf where the interval reaches 0 or below.
+    if isinstance(x, _Sensitive):
+        return x._chain(log10(x.value), x.value.reciprocal() * (1 / np.log(10)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return Interval(np.where(x.lo > 0, np.log10(np.maximum(x.lo, 0)), -np.inf), np.log10(x.hi))
+
+
+def pow10(x):
+    if isinstance(x, _Sensitive):
+        value = pow10(x.value)
+        return x._chain(value, value * np.log(10))
+    return Interval(10 ** x.lo, 10 ** x.hi)
+
+
+def sqrt(x):
+    if isinstance(x, _Sensitive):
+        value = sqrt(x.value)
+        return x._chain(value, value.reciprocal() * 0.5)
+    return Interval(np.sqrt(np.maximum(x.lo, 0)), np.sqrt(np.maximum(x.hi, 0)))
+
+
+def _widen(x: Interval) -> Interval:
+    # Widens an interval of positive values by ROUNDING_MARGIN.
+    return Interval(x.lo * (1 - ROUNDING_MARGIN), x.hi * (1 + ROUNDING_MARGIN))
+
+
+def _horner(k, x):
+    # k[0] * x ** n + k[1] * x ** (n - 1) + ... + k[n], for exact x.
+    p = k[0]
+    for kn in k[1:]:
+        p = p * x + kn
+    return p
+
+
+def _turning_points(coefficients: np.ndarray) -> np.ndarray:
+    # The real roots of the derivative of each polynomial (one per row of `coefficients`, highest power first), padded
+    # with NaN to the same length.
+    n = coefficients.shape[1] - 1
+    out = np.full((len(coefficients), max(n - 1, 0)), np.nan)
+    for i, k in enumerate(coefficients):
+        roots = np.roots(np.polyder(k))
+        roots = np.sort(roots[np.abs(roots.imag) <= 1e-9 * np.abs(roots)].real)
+        out[i, :len(roots)] = roots
+    return out
+
+
+def _polynomial_range(k, turning_points: np.ndarray, x: Interval) -> Interval:
+    # Exact range of the polynomial with coefficients k (highest power first) over x: the smallest and largest of its
+    # values at the ends of the interval and at any turning points inside it.
+    if x.exact:
+        return Interval(_horner(k, x.lo))
+    at_lo, at_hi = _horner(k, x.lo), _horner(k, x.hi)
+    lo, hi = np.minimum(at_lo, at_hi), np.maximum(at_lo, at_hi)
+    for t in turning_points.T:
+        inside = np.flatnonzero((x.lo < t) & (t < x.hi))
+        if len(inside):
+            at_t = _horner([kn[inside] for kn in k], t[inside])
+            lo[inside] = np.minimum(lo[inside], at_t)
+            hi[inside] = np.maximum(hi[inside], at_t)
+    return Interval(lo, hi)
+
+
+class _Polynomials:
+    # Polynomials in I_bf, one per electrode configuration (rows of `coefficients`, highest power first), and their
+    # derivatives, with their turning points.
+    def __init__(self, coefficients: np.ndarray):
+        n = coefficients.shape[1] - 1
+        self.k = coefficients
+        self.dk = coefficients[:, :-1] * np.arange(n, 0, -1)
+        self.turning_points = _turning_points(self.k)
+        self.d_turning_points = _turning_points(self.dk)
+
+    def __call__(self, ec: np.ndarray, x):
+        if isinstance(x, _Sensitive):
+            return x._chain(self(ec, x.value),
+                            _polynomial_range(self.dk[ec].T, self.d_turning_points[ec], x.value))
+        return _polynomial_range(self.k[ec].T, self.turning_points[ec], x)
+
+
+# The polynomials in I_bf of Eq 1 (k4 ... k10), and of the denominator of Eqs 3-6 (k4 ... k10, 0).
+_polynomials_1 = {V: _Polynomials(vectorized._table_1[V][:, 3:10]) for V in V_LEVELS}
+_polynomials_3_4_5 = {
+    V: _Polynomials(np.column_stack((table[:, 3:10], np.zeros(len(table)))))
+    for V, table in vectorized._tables_3_4_5.items()
+}
+
+
+# Table 6, one branch at a time. Each branch is (lower limit, upper limit, function of the dimension in mm -> inch).
+# Every function is non-decreasing. Refer Cubicle.calc_CF().
+_MM_TO_IN = 0.03937
+
+
+def _eq_11_12(V_oc, A, B):
+    return lambda dim: (660.4 + ((dim - 660.4) * ((V_oc + A) / B))) / 25.4
+
+
+def _table_6_range(dim: Interval, shallow: bool, vcb_height: np.ndarray, V_oc, A, B) -> Interval:
+    # Range of height_1 or width_1 (inch) for dimensions in `dim` (mm). `vcb_height` is True where `dim` is the
+    # height of a VCB enclosure, which has its own rules above 660.4 mm.
+    eq_11_12 = _eq_11_12(V_oc, A, B)
+    small = (lambda d: _MM_TO_IN * d) if shallow else (lambda d: np.full_like(d, 20.0))
+    branches = (
+        (-np.inf, 508, small),
+        (508, 660.4, lambda d: _MM_TO_IN * d),
+        (660.4, 1244.6, lambda d: np.where(vcb_height, _MM_TO_IN * d, eq_11_12(d))),
+        (1244.6, np.inf, lambda d: np.where(vcb_height, 49.0, eq_11_12(np.full_like(d, 1244.6)))),
+    )
+    lo = np.full(dim.lo.shape, np.inf)
+    hi = np.full(dim.lo.shape, -np.inf)
+    for a, b, f in branches:
+        d_lo, d_hi = np.maximum(dim.lo, a), np.minimum(dim.hi, b)
+        overlaps = d_lo <= d_hi
+        lo = np.where(overlaps, np.minimum(lo, f(d_lo)), lo)
+        hi = np.where(overlaps, np.maximum(hi, f(d_hi)), hi)
+    return Interval(lo, hi)
+
+
+def _quadratic(b1, b2, b3, x: Interval) -> Interval:
+    # Range of b1 * x ** 2 + b2 * x + b3 over x. Includes the turning point if it is inside the interval.
+    def f(x):
+        return b1 * x ** 2 + b2 * x + b3
+
+    at_lo, at_hi = f(x.lo), f(x.hi)
+    vertex = -b2 / (2 * b1)
+    inside = (x.lo < vertex) & (vertex < x.hi)
+    at_vertex = np.where(inside, f(vertex), at_lo)
+    return Interval(np.minimum.reduce((at_lo, at_hi, at_vertex)), np.maximum.reduce((at_lo, at_hi, at_vertex)))
+
+
+def CF_interval(V_oc, EC, height: Interval, width: Interval, depth: Interval) -> Interval:
+    # Range of the enclosure size correction factor CF, for enclosure dimensions within the given intervals.
+    V_oc = np.asarray(V_oc, dtype=float)
+    ec = ec_index(EC)
+    height, width, depth = _interval(height), _interval(width), _interval(depth)
+    V_oc, ec, h_lo, h_hi, w_lo, w_hi, d_lo, d_hi = np.broadcast_arrays(
+        V_oc, ec, height.lo, height.hi, width.lo, width.hi, depth.lo, depth.hi)
+    height, width, depth = Interval(h_lo, h_hi), Interval(w_lo, w_hi), Interval(d_lo, d_hi)
+
+    enclosed = ec < 3
+    ec3 = np.minimum(ec, 2)  # any valid index, for the open air rows
+    A = np.array([4, 10, 10], dtype=float)[ec3]
+    B = np.array([20, 24, 22], dtype=float)[ec3]
+    vcb = ec == 0
+
+    # Shallow if V_oc < 0.6 kV, height < 508 mm, width < 508 mm, and depth <= 203.2 mm. Refer Cubicle.calc_CF().
+    can_be_shallow = enclosed & (V_oc < 0.6) & (height.lo < 508) & (width.lo < 508) & (depth.lo <= 203.2)
+    can_be_typical = enclosed & ~((V_oc < 0.6) & (height.hi < 508) & (width.hi < 508) & (depth.hi <= 203.2))
+
+    lo = np.where(enclosed, np.inf, 1.0)
+    hi = np.where(enclosed, -np.inf, 1.0)
+    for enclosure_type, possible in (("Typical", can_be_typical), ("Shallow", can_be_shallow),):
+        shallow = enclosure_type == "Shallow"
+        if shallow:
+            # Only dimensions under 508 mm can be shallow.
+            h = Interval(height.lo, np.minimum(height.hi, 508))
+            w = Interval(width.lo, np.minimum(width.hi, 508))
+        else:
+            h, w = height, width
+        # (Rows that can't be this type may have empty ranges here, giving NaN. They are not used.)
+        with np.errstate(invalid="ignore"):
+            height_1 = _table_6_range(h, shallow, vcb, V_oc, A, B)
+            width_1 = _table_6_range(w, shallow, np.zeros_like(vcb), V_oc, A, B)
+            EES = (height_1 + width_1) * 0.5
+
+            b = vectorized._table_7[enclosure_type][ec3].T
+            x1 = _quadratic(b[0], b[1], b[2], EES)
+            CF = x1.reciprocal() if shallow else x1
+
+        lo = np.where(possible, np.minimum(lo, CF.lo), lo)
+        hi = np.where(possible, np.maximum(hi, CF.hi), hi)
+    return Interval(lo, hi)
+
+
+def _I_arc_intermediate(ec, V_level: float, I_bf, G):
+    # Equation 1. Refer vectorized.I_arc_intermediate().
+    k = vectorized._table_1[V_level][ec].T
+    x1 = k[0] + k[1] * log10(I_bf) + k[2] * log10(G)
+    x2 = _polynomials_1[V_level](ec, I_bf)
+    return pow10(x1) * x2
+
+
+def _intermediate_E(ec, V_level: float, I_arc, I_bf, T: Interval, G, CF: Interval, D: Interval, I_arc_600=None):
+    # Equations 3, 4, 5, 6. Refer vectorized.intermediate_E().
+    k = vectorized._tables_3_4_5[V_level][ec].T
+
+    x1 = 12.552 / 50 * T
+    x2 = k[0] + k[1] * log10(G)
+    x3_num = k[2] * (I_arc if I_arc_600 is None else I_arc_600)
+    x3_den = _polynomials_3_4_5[V_level](ec, I_bf)
+    x3 = x3_num / x3_den
+    x4 = k[10] * log10(I_bf) + k[12] * log10(I_arc) - log10(CF)
+    x5 = k[11] * log10(D)
+    return x1 * pow10(x2 + x3 + x4 + x5)
+
+
+def _intermediate_AFB_from_E(ec, V_level: float, E, D: Interval):
+    # Equations 7, 8, 9, 10. Refer vectorized.intermediate_AFB_from_E().
+    k12 = vectorized._tables_3_4_5[V_level][ec, 11]
+    return pow10(log10(D) + (np.log10(5.0208) - log10(E)) * (1 / k12))
+
+
+def _interpolate(V_oc: np.ndarray, x_600, x_2700, x_14300):
+    # Eqs 16-24 are linear in x_600, x_2700 and x_14300, so the interpolation is
+    # w_600 * x_600 + w_2700 * x_2700 + w_14300 * x_14300, with weights found from vectorized.interpolate(). (Evaluating
+    # Eqs 16-24 as written would count x_2700 twice.)
+    unit = np.eye(3)[:, :, np.newaxis] * np.ones_like(V_oc)
+    w_600, w_2700, w_14300 = (vectorized.interpolate(V_oc, *unit[i]) for i in range(3))
+    return w_600 * x_600 + w_2700 * x_2700 + w_14300 * x_14300
+
+
+def _I_arc_final_LV(V_oc: np.ndarray, I_arc_600, I_bf):
+    # Equation 25. Refer vectorized.I_arc_final_LV().
+    x1 = (0.6 / V_oc) ** 2
+    x2 = I_arc_600.square().reciprocal()
+    x3 = (0.6 ** 2 - V_oc ** 2) / 0.6 ** 2 * I_bf.square().reciprocal()
+    x4 = sqrt(x1 * (x2 - x3))
+    return x4.reciprocal()
+
+
+def _evaluate_LV(V_oc, ec, VarCF, reduced: bool, I_bf, G, D, CF, T) -> dict:
+    # The calculation for LV rows (V_oc <= 0.6 kV). Refer vectorized.calculate_from_factors().
+    I_arc_600 = _I_arc_intermediate(ec, 0.6, I_bf, G)
+    I_arc = _I_arc_final_LV(V_oc, I_arc_600, I_bf)
+    if reduced:
+        I_arc = I_arc * (1 - 0.5 * VarCF)
+    E = _intermediate_E(ec, 0.6, I_arc, I_bf, T, G, CF, D, I_arc_600)
+    return {"I_arc": I_arc, "E": E, "AFB": _intermediate_AFB_from_E(ec, 0.6, E, D)}
+
+
+def _evaluate_HV(V_oc, ec, VarCF, reduced: bool, I_bf, G, D, CF, T) -> dict:
+    # The calculation for HV rows (V_oc > 0.6 kV). Refer vectorized.calculate_from_factors().
+    I_arc_x, E_x, AFB_x = [], [], []
+    for V in V_LEVELS:
+        I_arc = _I_arc_intermediate(ec, V, I_bf, G)
+        if reduced:
+            I_arc = I_arc * (1 - 0.5 * VarCF)
+        E = _intermediate_E(ec, V, I_arc, I_bf, T, G, CF, D)
+        I_arc_x.append(I_arc)
+        E_x.append(E)
+        AFB_x.append(_intermediate_AFB_from_E(ec, V, E, D))
+    return {"I_arc": _interpolate(V_oc, *I_arc_x), "E": _interpolate(V_oc, *E_x),
+            "AFB": _interpolate(V_oc, *AFB_x)}
+
+
+def _monotonic_bounds(evaluate, inputs: tuple) -> (dict, np.ndarray):
+    # Bounds on the results of evaluate(*inputs), from the slopes of the results with respect to each input. Also
+    # returns whether the signs of all the slopes are known, for every result.
+    #
+    # As well as the plain interval bounds, two other bounds are found, and the tightest is used (all are valid):
+    #   * Monotonicity: where the signs of all the slopes are known, the bounds are at two corners of the box.
+    #   * The mean value theorem: f(x) is within f(c) + f'(x) * (x - c), for c at the middle of the box.
+    n, k = len(inputs[0].lo), len(inputs)
+    unit = np.eye(k)
+    results = evaluate(*(_Sensitive(x, tuple(Interval(u) for u in unit[i])) for i, x in enumerate(inputs)))
+
+    # The corners (corner c has input i at its upper end if bit i of c is set), and the middle, evaluated together.
+    middle = [(x.lo + x.hi) / 2 for x in inputs]
+    points = evaluate(*(Interval(np.concatenate([x.hi if c >> i & 1 else x.lo for c in range(2 ** k)] + [mid]))
+                        for i, (x, mid) in enumerate(zip(inputs, middle))), copies=2 ** k + 1)
+
+    out = dict()
+    resolved = np.ones(n, dtype=bool)
+    row = np.arange(n)
+    for name, r in results.items():
+        increasing = [slope.lo >= 0 for slope in r.slope]
+        known = np.logical_and.reduce([inc | (slope.hi <= 0) for inc, slope in zip(increasing, r.slope)])
+        resolved &= known
+
+        # The corner where the result is lowest, and the opposite corner.
+        lowest = sum(np.where(inc, 0, 1 << i) for i, inc in enumerate(increasing))
+        corners = points[name][:2 ** k * n]
+        lower = np.where(known, corners.lo.reshape(2 ** k, n)[lowest, row], -np.inf)
+        upper = np.where(known, corners.hi.reshape(2 ** k, n)[2 ** k - 1 - lowest, row], np.inf)
+
+        centred = points[name][2 ** k * n:]
+        for slope, x, mid in zip(r.slope, inputs, middle):
+            centred = centred + slope * (x - mid)
+
+        # (Any bound may be NaN where a box is too wide for the calculation to be bounded, e.g. inf * 0.)
+        lo = np.fmax(np.fmax(r.value.lo, lower), centred.lo)
+        hi = np.fmin(np.fmin(r.value.hi, upper), centred.hi)
+        out[name] = Interval(np.where(np.isnan(lo), -np.inf, lo), np.where(np.isnan(hi), np.inf, hi))
+    return out, resolved
+
+
+# The columns bounds() passes to _bounds(), one value per bus.
+_COLUMNS = ("V_oc", "ec", "G_lo", "G_hi", "D_lo", "D_hi", "CF_lo", "CF_hi", "I_lo", "I_hi", "T_lo", "T_hi",)
+
+
+def bounds(V_oc, EC, G, D, height, width, depth, I_bf, T, full_or_reduced: str, n_sub: int = 2,
+           max_splits: int = 8, tolerance: float = 1e-3, executor: Executor = None) -> dict:
+    # Bounds on I_arc (kA), E (J/cm²) and AFB (mm), for every bus. G, D, height, width, depth, I_bf and T may each be
+    # an Interval, or exact values. Returns a dict of Intervals: "I_arc", "E", "AFB", and "CF".
+    #
+    # n_sub:        number of pieces the I_bf interval is split into at the start, evenly on a log scale
+    # max_splits:   number of times pieces are split into four (refer the notes at the top of this file)
+    # tolerance:    a piece "sets" a bus's bound if it is within this (relative) of the bound
+    # executor:     the buses are bounded in chunks, on `executor` (refer executor.py). Each bus's bounds are worked out
+    #               independently of the others, so they don't depend on how the buses are split into chunks.
+    assert full_or_reduced in ("full", "reduced",)
+    G, D, height, width, depth, I_bf, T = (_interval(x) for x in (G, D, height, width, depth, I_bf, T))
+
+    CF = CF_interval(V_oc, EC, height, width, depth)
+    columns = np.broadcast_arrays(np.asarray(V_oc, dtype=float), ec_index(EC), G.lo, G.hi, D.lo, D.hi, CF.lo, CF.hi,
+                                  I_bf.lo, I_bf.hi, T.lo, T.hi)
+    columns = {name: np.ravel(a) for name, a in zip(_COLUMNS, columns)}
+    evaluate = partial(_bounds, full_or_reduced=full_or_reduced, n_sub=n_sub, max_splits=max_splits,
+                       tolerance=tolerance)
+    b = get_executor(executor).map_chunks(evaluate, columns)
+
+    out = {name: _widen(Interval(b[f"{name}_lo"], b[f"{name}_hi"])) for name in ("I_arc", "E", "AFB",)}
+    out["CF"] = _widen(CF)
+    return out
+
+
+def _bounds(columns: dict, full_or_reduced: str, n_sub: int, max_splits: int, tolerance: float) -> dict:
+    # bounds(), for a chunk of buses. Returns the (not yet widened) bounds as columns "I_arc_lo", "I_arc_hi", ...
+    V_oc, ec, G_lo, G_hi, D_lo, D_hi, CF_lo, CF_hi, I_lo, I_hi, T_lo, T_hi = (columns[name] for name in _COLUMNS)
+    VarCF = vectorized.VarCF(ec, V_oc)
+    n = len(V_oc)
+    names = ("I_arc", "E", "AFB",)
+
+    def evaluate(bus: np.ndarray, box_I_bf: Interval, box_G: Interval) -> dict:
+        # Bounds for boxes of (I_bf, G), each belonging to a bus, and whether each box is resolved (refer
+        # _monotonic_bounds()).
+        pieces = {name: Interval(np.empty(len(bus)), np.empty(len(bus))) for name in names}
+        pieces["resolved"] = np.empty(len(bus), dtype=bool)
+        LV = V_oc[bus] <= 0.6
+        for rows, f in ((LV, _evaluate_LV), (~LV, _evaluate_HV),):
+            if not rows.any():
+                continue
+
+            def _evaluate(I_bf, G, T=None, copies: int = 1):
+                # (The inputs may be for several copies of the rows, one after another.)
+                r = np.tile(bus[rows], copies)
+                if T is None:
+                    T = Interval(T_lo[r], T_hi[r])
+                return f(V_oc[r], ec[r], VarCF[r], full_or_reduced == "reduced", I_bf, G, Interval(D_lo[r], D_hi[r]),
+                         Interval(CF_lo[r], CF_hi[r]), T)
+
+            # T appears once in the LV calculation, so plain interval arithmetic is exact for it. In the HV calculation,
+            # it appears in each of the three intermediate results, which are interpolated with weights of both signs.
+            inputs = (box_I_bf[rows], box_G[rows])
+            if f is _evaluate_HV:
+                inputs += (Interval(T_lo[bus[rows]], T_hi[bus[rows]]),)
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                results, pieces["resolved"][rows] = _monotonic_bounds(_evaluate, inputs)
+            for name, value in results.items():
+                pieces[name].lo[rows] = value.lo
+                pieces[name].hi[rows] = value.hi
+        pieces.update(bus=bus, I_bf=box_I_bf, G=box_G)
+        return pieces
+
+    def per_bus(pieces: dict) -> dict:
+        out = dict()
+        for name in names:
+            lo, hi = np.full(n, np.inf), np.full(n, -np.inf)
+            np.minimum.at(lo, pieces["bus"], pieces[name].lo)
+            np.maximum.at(hi, pieces["bus"], pieces[name].hi)
+            out[name] = Interval(lo, hi)
+        return out
+
+    def select(pieces: dict, rows: np.ndarray) -> dict:
+        return {k: v[rows] for k, v in pieces.items()}
+
+    def concatenate(parts: list) -> dict:
+        out = {k: np.concatenate([p[k] for p in parts]) for k in ("bus", "resolved",)}
+        for k in names + ("I_bf", "G",):
+            out[k] = Interval(np.concatenate([p[k].lo for p in parts]), np.concatenate([p[k].hi for p in parts]))
+        return out
+
+    t = np.linspace(0, 1, n_sub + 1)
+    edges = np.exp(np.log(I_lo)[:, np.newaxis] + t * (np.log(I_hi) - np.log(I_lo))[:, np.newaxis])
+    edges[:, 0], edges[:, -1] = I_lo, I_hi  # exactly the given ends
+    bus = np.repeat(np.arange(n), n_sub)
+    pieces = evaluate(bus, Interval(edges[:, :-1].ravel(), edges[:, 1:].ravel()), Interval(G_lo[bus], G_hi[bus]))
+
+    for _ in range(max_splits):
+        b = per_bus(pieces)
+        sets_bound = np.zeros(len(pieces["bus"]), dtype=bool)
+        for name in names:
+            lo, hi = b[name].lo[pieces["bus"]], b[name].hi[pieces["bus"]]
+            margin_lo = np.where(np.isfinite(lo), tolerance * np.abs(lo), 0)
+            margin_hi = np.where(np.isfinite(hi), tolerance * np.abs(hi), 0)
+            sets_bound |= (pieces[name].lo <= lo + margin_lo) | (pieces[name].hi >= hi - margin_hi)
+        split = sets_bound & ~pieces["resolved"]
+        if not split.any():
+            break
+
+        # Split into four: I_bf (on a log scale) and G are halved.
+        s = select(pieces, split)
+        I_bf_lo, I_bf_hi, G_lo, G_hi = s["I_bf"].lo, s["I_bf"].hi, s["G"].lo, s["G"].hi
+        I_bf_mid, G_mid = np.sqrt(I_bf_lo * I_bf_hi), (G_lo + G_hi) / 2
+        quarters = evaluate(np.tile(s["bus"], 4),
+                            Interval(np.concatenate((I_bf_lo, I_bf_mid, I_bf_lo, I_bf_mid)),
+                                     np.concatenate((I_bf_mid, I_bf_hi, I_bf_mid, I_bf_hi))),
+                            Interval(np.concatenate((G_lo, G_lo, G_mid, G_mid)),
+                                     np.concatenate((G_mid, G_mid, G_hi, G_hi))))
+        pieces = concatenate([select(pieces, ~split), quarters])
+
+    out = dict()
+    for name, value in per_bus(pieces).items():
+        out[f"{name}_lo"], out[f"{name}_hi"] = value.lo, value.hi
+    return out
@@ -0,0 +1,206 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Bulk generation of arc flash labels and reports.
+#
+# Calculation.pretty_print() and Cubicle.pretty_print() are fine for one bus, but formatting pint Quantities through
+# f-strings is far too slow for printing labels for a whole site. The functions here instead work on columnar results
+# (a dict of column name -> array, or a ResultReader) of plain floats, and stream the rendered labels to disk.
+#
+# Label templates use str.format() syntax, e.g. "{bus}: {E:.1f} cal/cm²". A LabelTemplate is parsed once, when it is
+# created; rendering a label is then just a sequence of format() calls.
+#
+# The built-in templates expect these columns. (Any columns can be used in a custom template.)
+#
+#   bus         bus / equipment name
+#   V_oc        kV
+#   E           incident energy, in cal/cm² (note - not J/cm² as in vectorized.py)
+#   AFB         arc flash boundary, mm
+#   D           working distance, mm
+#   PPE         PPE category (refer ppe_category())
+#   D_cat_1 ... D_cat_4     minimum approach distance for each PPE category, mm
+#
+# Values in string columns are HTML-escaped by the SVG and HTML templates.
+
+import html
+import os
+import re
+import string
+from functools import partial
+
+import numpy as np
+
+from arcflash.ieee_1584.executor import Executor, get_executor
+
+# Incident energy ratings (cal/cm²) of the PPE categories, as per NFPA 70E.
+PPE_CATEGORY_RATINGS = (4.0, 8.0, 25.0, 40.0,)
+
+
+class LabelTemplate:
+    def __init__(self, template: str, escape: bool = False):
+        # `escape`: if True, HTML-escape string values (for SVG and HTML templates).
+        self.template = template
+        self.escape = escape
+
+        # Parse the template once, into (literal text, field name, format spec) triples.
+        self._parts = list()
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            if field is not None and (conversion or not field.isidentifier()):
+                raise ValueError(f"Unsupported template field {{{field}}}. Use plain column names, e.g. {{E:.1f}}.")
+            self._parts.append((literal, field, spec or ""))
+        self.fields = tuple(dict.fromkeys(f for _, f, _ in self._parts if f is not None))
+
+    def render(self, row: dict) -> str:
+        out = list()
+        for literal, field, spec in self._parts:
+            out.append(literal)
+            if field is not None:
+                value = row[field]
+                if self.escape and isinstance(value, str):
+                    value = html.escape(value)
+                out.append(format(value, spec))
+        return "".join(out)
+
+    def render_columns(self, columns):
+        # Yields one rendered label per row of `columns` (a dict of arrays, or a ResultReader).
+        for row in _rows(columns, self.fields):
+            yield self.render(row)
+
+
+def _n_rows(columns) -> int:
+    # Number of rows in `columns`: a ResultReader knows it, and for a dict it is the length of any column that isn't a
+    # scalar.
+    if isinstance(columns, dict):
+        return next((len(v) for v in columns.values() if np.ndim(v) > 0), 0)
+    return len(columns)
+
+
+def _rows(columns, fields: tuple, chunk_size: int = 10000):
+    # Yields each row of `columns` as a dict of the given fields. (The number of rows comes from `columns`, so a
+    # template with no fields still gives one label per row.)
+    n = _n_rows(columns)
+    for start in range(0, n, chunk_size):
+        # .tolist() converts a whole chunk to Python floats / strs at once, which is much faster than formatting NumPy
+        # scalars one at a time.
+        chunk = [np.asarray(columns[f][start:start + chunk_size]).tolist() for f in fields]
+        for values in zip(*chunk) if fields else [()] * (min(start + chunk_size, n) - start):
+            yield dict(zip(fields, values))
+
+
+TEXT_LABEL = LabelTemplate("""\
+WARNING - ARC FLASH HAZARD
+Equipment:          {bus}
+Nominal voltage:    {V_oc:.3f} kV
+Incident energy:    {E:.1f} cal/cm² at {D:.0f} mm
+Arc flash boundary: {AFB:.0f} mm
+PPE category:       {PPE}
+Minimum approach distance for PPE category 1: {D_cat_1:.0f} mm, 2: {D_cat_2:.0f} mm, 3: {D_cat_3:.0f} mm, \
+4: {D_cat_4:.0f} mm
+
+""")
+
+HTML_LABEL = LabelTemplate("""\
+<tr><td>{bus}</td><td>{V_oc:.3f}</td><td>{E:.1f}</td><td>{D:.0f}</td><td>{AFB:.0f}</td><td>{PPE}</td>\
+<td>{D_cat_1:.0f}</td><td>{D_cat_2:.0f}</td><td>{D_cat_3:.0f}</td><td>{D_cat_4:.0f}</td></tr>
+""", escape=True)
+
+HTML_HEADER = """\
+<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Arc flash labels</title></head><body>
+<table>
+<tr><th>Equipment</th><th>V<sub>oc</sub> (kV)</th><th>E (cal/cm²)</th><th>Working distance (mm)</th>\
+<th>AFB (mm)</th><th>PPE category</th><th>Cat 1 (mm)</th><th>Cat 2 (mm)</th><th>Cat 3 (mm)</th><th>Cat 4 (mm)</th></tr>
+"""
+
+HTML_FOOTER = """\
+</table>
+</body></html>
+"""
+
+SVG_LABEL = LabelTemplate("""\
+<svg xmlns="http://www.w3.org/2000/svg" width="400" height="350" font-family="sans-serif">
+<rect width="400" height="60" fill="#f60"/>
+<text x="200" y="40" font-size="24" font-weight="bold" text-anchor="middle">WARNING</text>
+<text x="200" y="85" font-size="16" text-anchor="middle">Arc flash hazard</text>
+<text x="20" y="120" font-size="14">Equipment: {bus}</text>
+<text x="20" y="145" font-size="14">Nominal voltage: {V_oc:.3f} kV</text>
+<text x="20" y="170" font-size="14">Incident energy: {E:.1f} cal/cm² at {D:.0f} mm</text>
+<text x="20" y="195" font-size="14">Arc flash boundary: {AFB:.0f} mm</text>
+<text x="20" y="220" font-size="14">PPE category: {PPE}</text>
+<text x="20" y="250" font-size="12">Minimum approach distance by PPE category:</text>
+<text x="20" y="270" font-size="12">Cat 1: {D_cat_1:.0f} mm</text>
+<text x="20" y="290" font-size="12">Cat 2: {D_cat_2:.0f} mm</text>
+<text x="20" y="310" font-size="12">Cat 3: {D_cat_3:.0f} mm</text>
+<text x="20" y="330" font-size="12">Cat 4: {D_cat_4:.0f} mm</text>
+</svg>
+""", escape=True)
+
+
+def ppe_category(E) -> np.ndarray:
+    # Returns the PPE category (as a string: "1" ... "4", or "DANGER" above the category 4 rating) for each incident
+    # energy E (cal/cm²). E that is NaN or infinite, e.g. for rows that were not evaluated (refer validation.py), has
+    # category "N/A".
+    E = np.asarray(E, dtype=float)
+    index = np.searchsorted(PPE_CATEGORY_RATINGS, E, side="left")
+    names = np.array(["1", "2", "3", "4", "DANGER"])
+    return np.where(np.isfinite(E), names[index], "N/A")
+
+
+def write_labels(columns, template: LabelTemplate, path: str, header: str = "", footer: str = "") -> int:
+    # Writes one label per row, one after the other, to a single file (e.g. a text or HTML report).
+    # Returns the number of labels written.
+    n = 0
+    with open(path, mode="w", encoding="utf-8") as fh:
+        fh.write(header)
+        for label in template.render_columns(columns):
+            fh.write(label)
+            n += 1
+        fh.write(footer)
+    return n
+
+
+_UNSAFE = re.compile(r"[^\w.\- ]")
+
+
+def _filename(name: str) -> str:
+    # A rendered filename, made safe to use inside the output directory: anything other than letters, digits, ".", "-",
+    # "_" and spaces is replaced with "_", so it can't contain a path separator or a drive.
+    safe = _UNSAFE.sub("_", name)
+    if safe.strip(". ") == "":
+        raise ValueError(f"Invalid label filename {name!r}.")
+    return safe
+
+
+def _write_files(columns: dict, template: LabelTemplate) -> dict:
+    # Writes the labels for a chunk of rows, each to the file in its "file path" column. (Not a valid template field,
+    # so it can't clash with one.) Refer write_label_files().
+    for path, row in zip(columns["file path"].tolist(), _rows(columns, template.fields)):
+        with open(path, mode="w", encoding="utf-8") as fh:
+            fh.write(template.render(row))
+    return {}
+
+
+def write_label_files(columns, template: LabelTemplate, directory: str, filename: str = "{bus}.svg",
+                      executor: Executor = None) -> int:
+    # Writes each label to its own file (e.g. one SVG per bus). `filename` is itself a template, rendered from the
+    # same row as the label, and made safe with _filename(). Raises ValueError, before writing anything, if two rows
+    # would be written to the same file. Returns the number of labels written.
+    #
+    # The labels are rendered and written in chunks of rows, on `executor` (refer executor.py). Rendering is plain
+    # Python, so it only runs in parallel on a ProcessExecutor (or a free-threaded build of Python).
+    filename_template = LabelTemplate(filename)
+
+    # Work out every filename first, so that nothing is written if any of them is invalid or repeated.
+    names = [_filename(filename_template.render(row)) for row in _rows(columns, filename_template.fields)]
+    seen = set()
+    for name in names:
+        # Case-insensitive, for case-insensitive file systems.
+        if name.casefold() in seen:
+            raise ValueError(f"More than one label would be written to {name!r}. The filenames must be unique.")
+        seen.add(name.casefold())
+
+    os.makedirs(directory, exist_ok=True)
+    chunks = {field: np.asarray(columns[field]) for field in template.fields}
+    chunks["file path"] = np.array([os.path.join(directory, name) for name in names], dtype=object)
+    get_executor(executor).map_chunks(partial(_write_files, template=template), chunks)
+    return len(names)
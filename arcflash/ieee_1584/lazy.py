@@ -0,0 +1,205 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Lazy version of Calculation: every result is calculated the first time it is used, and then kept.
+#
+# Calculation works in two fixed stages. calculate_I_arc() calculates every arcing current, and calculate_E_AFB()
+# calculates every incident energy and arc flash boundary - for HV, that is three intermediate E values, three
+# intermediate AFB values, and two interpolations, even if only E is wanted. Screening runs often only need part of the
+# result, e.g. only I_arc (to look up the clearing time on a time-current curve), or only E (to find the buses that need
+# a closer look).
+#
+# LazyCalculation has the same attributes as Calculation (I_arc, I_arc_600, ..., E, E_600, ..., AFB, AFB_600, ...),
+# but each one is only calculated when it is first read, along with the values it depends on - and nothing else:
+#
+#   I_arc_600, I_arc_2700, I_arc_14300      I_bf
+#   I_arc                                   I_arc_600, I_arc_2700, I_arc_14300 (HV) or I_arc_600 (LV)
+#   E_600, E_2700, E_14300                  the arcing current at the same voltage, T_arc
+#   E                                       E_600, E_2700, E_14300 (HV) or I_arc and I_arc_600 (LV)
+#   AFB_600, AFB_2700, AFB_14300            E at the same voltage
+#   AFB                                     AFB_600, AFB_2700, AFB_14300 (HV) or E (LV)
+#
+# So reading E for an HV cubicle skips the final I_arc and all the AFB values.
+#
+# T_arc can be set when the LazyCalculation is created, or later (e.g. once I_arc is known). Setting it again forgets
+# the values that depend on it (E and AFB), but keeps the arcing currents.
+#
+# The values are calculated with the same functions (refer equations.py) and in the same order as Calculation, so the
+# results are identical. LazyCalculation also has calculate_I_arc() and calculate_E_AFB(), so it can be used in place
+# of a Calculation, e.g. as a step of a multi-step calculation (refer multistep.py).
+#
+#     calc = LazyCalculation(c, 15 * kA, "full")
+#     calc.T_arc = T_curve(calc.I_arc)
+#     calc.E
+
+from arcflash.ieee_1584.calculation import Calculation, check_inputs
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.equations import I_arc_intermediate, I_arc_min, interpolate, I_arc_final_LV, intermediate_E, \
+    intermediate_AFB_from_E
+from arcflash.ieee_1584.units import Q_, kV, sec
+
+
+class _lazy:
+    # A LazyCalculation attribute, calculated by the decorated method on first access. The value is then kept in the
+    # instance's __dict__, which takes precedence over this (non-data) descriptor - so later reads are plain attribute
+    # reads. `depends` names the values it is calculated from. Refer LazyCalculation.dependents().
+    def __init__(self, *depends: str):
+        self.depends = depends
+        self.f = None
+        self.name = None
+
+    def __call__(self, f):
+        self.f = f
+        return self
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, calc, owner=None):
+        if calc is None:
+            return self
+        value = calc.__dict__[self.name] = self.f(calc)
+        return value
+
+
+class LazyCalculation:
+    def __init__(self, c: Cubicle, I_bf: Q_, full_or_reduced: str, T_arc: Q_ = None, check: bool = True):
+        # Refer Calculation.__init__(). T_arc is optional here; E and AFB can't be calculated until it is set.
+        if check:
+            check_inputs(c, I_bf, full_or_reduced)
+
+        self.c = c
+        self.I_bf = I_bf
+        self.full_or_reduced = full_or_reduced
+        self._T_arc = None
+        if T_arc is not None:
+            self.T_arc = T_arc
+
+    @property
+    def T_arc(self) -> Q_:
+        return self._T_arc
+
+    @T_arc.setter
+    def T_arc(self, T_arc: Q_) -> None:
+        assert T_arc.check('[time]')
+        if self._T_arc is not None:
+            self.forget("T_arc")
+        self._T_arc = T_arc.to(sec)
+
+    @classmethod
+    def dependents(cls, name: str) -> tuple:
+        # The names of the values that depend on `name`, directly or indirectly.
+        found = []
+        for attr, value in vars(cls).items():
+            if isinstance(value, _lazy) and attr not in found and cls._depends_on(attr, name):
+                found.append(attr)
+        return tuple(found)
+
+    @classmethod
+    def _depends_on(cls, attr: str, name: str) -> bool:
+        depends = getattr(cls, attr).depends
+        return name in depends or any(cls._depends_on(d, name) for d in depends if isinstance(getattr(cls, d), _lazy))
+
+    def forget(self, name: str) -> None:
+        # Forgets the calculated values that depend on `name`, so that they are calculated again on next access.
+        for attr in self.dependents(name):
+            self.__dict__.pop(attr, None)
+
+    @property
+    def calculated(self) -> tuple:
+        # The names of the values that have been calculated so far.
+        return tuple(attr for attr in self.__dict__ if isinstance(getattr(type(self), attr, None), _lazy))
+
+    def _T(self) -> Q_:
+        if self._T_arc is None:
+            raise ValueError("T_arc must be set before E or AFB can be calculated.")
+        return self._T_arc
+
+    def _I_arc_intermediate(self, V_oc: Q_) -> Q_:
+        if self.c.vlevel == "LV" and V_oc != 0.600 * kV:
+            return None
+        I_arc = I_arc_intermediate(self.c, V_oc, self.I_bf)
+        # For LV, I_arc_600 is always the full value, even in a "reduced" calculation. Refer Calculation.
+        if self.c.vlevel == "HV" and self.full_or_reduced == "reduced":
+            I_arc = I_arc_min(self.c, I_arc)
+        return I_arc
+
+    def _E_intermediate(self, V_oc: Q_, I_arc: Q_) -> Q_:
+        if self.c.vlevel == "LV":
+            return None
+        return intermediate_E(self.c, V_oc, I_arc, self.I_bf, self._T())
+
+    def _AFB_intermediate(self, V_oc: Q_, E: Q_) -> Q_:
+        if self.c.vlevel == "LV":
+            return None
+        return intermediate_AFB_from_E(self.c, V_oc, E)
+
+    @_lazy()
+    def I_arc_600(self) -> Q_:
+        return self._I_arc_intermediate(0.600 * kV)
+
+    @_lazy()
+    def I_arc_2700(self) -> Q_:
+        return self._I_arc_intermediate(2.700 * kV)
+
+    @_lazy()
+    def I_arc_14300(self) -> Q_:
+        return self._I_arc_intermediate(14.300 * kV)
+
+    @_lazy("I_arc_600", "I_arc_2700", "I_arc_14300")
+    def I_arc(self) -> Q_:
+        if self.c.vlevel == "HV":
+            return interpolate(self.c, self.I_arc_600, self.I_arc_2700, self.I_arc_14300)
+        I_arc = I_arc_final_LV(self.c, self.I_arc_600, self.I_bf)
+        return I_arc if self.full_or_reduced == "full" else I_arc_min(self.c, I_arc)
+
+    @_lazy("I_arc_600", "T_arc")
+    def E_600(self) -> Q_:
+        return self._E_intermediate(0.600 * kV, self.I_arc_600)
+
+    @_lazy("I_arc_2700", "T_arc")
+    def E_2700(self) -> Q_:
+        return self._E_intermediate(2.700 * kV, self.I_arc_2700)
+
+    @_lazy("I_arc_14300", "T_arc")
+    def E_14300(self) -> Q_:
+        return self._E_intermediate(14.300 * kV, self.I_arc_14300)
+
+    @_lazy("E_600", "E_2700", "E_14300", "I_arc", "I_arc_600", "T_arc")
+    def E(self) -> Q_:
+        if self.c.vlevel == "HV":
+            return interpolate(self.c, self.E_600, self.E_2700, self.E_14300)
+        # Note I_arc_600_max, **not** I_arc_600_min, even in a "min" calculation.
+        return intermediate_E(self.c, self.c.V_oc, self.I_arc, self.I_bf, self._T(), self.I_arc_600)
+
+    @_lazy("E_600")
+    def AFB_600(self) -> Q_:
+        return self._AFB_intermediate(0.600 * kV, self.E_600)
+
+    @_lazy("E_2700")
+    def AFB_2700(self) -> Q_:
+        return self._AFB_intermediate(2.700 * kV, self.E_2700)
+
+    @_lazy("E_14300")
+    def AFB_14300(self) -> Q_:
+        return self._AFB_intermediate(14.300 * kV, self.E_14300)
+
+    @_lazy("AFB_600", "AFB_2700", "AFB_14300", "E")
+    def AFB(self) -> Q_:
+        if self.c.vlevel == "HV":
+            return interpolate(self.c, self.AFB_600, self.AFB_2700, self.AFB_14300)
+        return intermediate_AFB_from_E(self.c, self.c.V_oc, self.E)
+
+    def calculate_I_arc(self) -> None:
+        # Refer Calculation.calculate_I_arc(). Calculates all the arcing currents now.
+        for name in ("I_arc_600", "I_arc_2700", "I_arc_14300", "I_arc",):
+            getattr(self, name)
+
+    def calculate_E_AFB(self, T_arc: Q_) -> None:
+        # Refer Calculation.calculate_E_AFB(). Sets T_arc, and calculates all the incident energies and arc flash
+        # boundaries now.
+        self.T_arc = T_arc
+        for name in ("E_600", "E_2700", "E_14300", "E", "AFB_600", "AFB_2700", "AFB_14300", "AFB",):
+            getattr(self, name)
+
+    pretty_print = Calculation.pretty_print
@@ -1,7 +1,9 @@
+import numpy as np
+
 from arcflash.ieee_1584.calculation import Calculation
 from arcflash.ieee_1584.cubicle import Cubicle
 from arcflash.ieee_1584.equations import intermediate_AFB_from_E, interpolate
-from arcflash.ieee_1584.units import kV, Q_
+from arcflash.ieee_1584.units import kV, mm, Q_, J_per_sq_cm
 
 
 def multistep_E_and_AFB(c: Cubicle, calc_steps: list[Calculation]) -> (Q_, Q_):
@@ -24,20 +26,55 @@ def multistep_E_and_AFB(c: Cubicle, calc_steps: list[Calculation]) -> (Q_, Q_):
     #
     # For LV, there are no intermediate values / interpolation so we can just work out the AFB based on total_E.
 
-    total_E = sum([c.E for c in calc_steps])
+    acc = MultistepAccumulator(c)
+    for step in calc_steps:
+        acc.add(step)
+    return acc.E, acc.AFB
+
 
-    if c.vlevel == "HV":
-        total_E_600 = sum([c.E_600 for c in calc_steps])
-        total_E_2700 = sum([c.E_2700 for c in calc_steps])
-        total_E_14300 = sum([c.E_14300 for c in calc_steps])
+class MultistepAccumulator:
+    # Incremental version of multistep_E_and_AFB(): the calculation steps are added one at a time, and only the running
+    # totals are kept. Use this when there are too many steps to keep them all, e.g. for a long fault recording (refer
+    # comtrade.py).
+    def __init__(self, c: Cubicle):
+        self.c = c
+        self.n_steps = 0
+        self.E = 0 * J_per_sq_cm
+        self.E_600 = 0 * J_per_sq_cm
+        self.E_2700 = 0 * J_per_sq_cm
+        self.E_14300 = 0 * J_per_sq_cm
 
-        AFB_600 = intermediate_AFB_from_E(c, 0.600 * kV, total_E_600)
-        AFB_2700 = intermediate_AFB_from_E(c, 2.700 * kV, total_E_2700)
-        AFB_14300 = intermediate_AFB_from_E(c, 14.300 * kV, total_E_14300)
+    def add(self, calc: Calculation) -> None:
+        # Adds one step. `calc` must have been calculated (calculate_I_arc() and calculate_E_AFB()) for this cubicle.
+        self.E = self.E + calc.E
+        if self.c.vlevel == "HV":
+            self.E_600 = self.E_600 + calc.E_600
+            self.E_2700 = self.E_2700 + calc.E_2700
+            self.E_14300 = self.E_14300 + calc.E_14300
+        self.n_steps += 1
 
-        total_AFB = interpolate(c, AFB_600, AFB_2700, AFB_14300)
+    def add_values(self, E, E_600=None, E_2700=None, E_14300=None) -> None:
+        # Adds a batch of steps, given as arrays of plain floats (J/cm², as in vectorized.py) rather than Calculations:
+        # E for each step, and (for HV) the intermediate E_600, E_2700 and E_14300 for each step.
+        E = np.asarray(E, dtype=float)
+        self.E = self.E + E.sum() * J_per_sq_cm
+        if self.c.vlevel == "HV":
+            self.E_600 = self.E_600 + np.sum(E_600) * J_per_sq_cm
+            self.E_2700 = self.E_2700 + np.sum(E_2700) * J_per_sq_cm
+            self.E_14300 = self.E_14300 + np.sum(E_14300) * J_per_sq_cm
+        self.n_steps += E.size
 
-    else:
-        total_AFB = intermediate_AFB_from_E(c, c.V_oc, total_E)
+    @property
+    def AFB(self) -> Q_:
+        # Arc flash boundary for the total energy so far. Refer multistep_E_and_AFB().
+        if self.n_steps == 0:
+            return 0 * mm
 
-    return total_E, total_AFB
+        c = self.c
+        if c.vlevel == "HV":
+            AFB_600 = intermediate_AFB_from_E(c, 0.600 * kV, self.E_600)
+            AFB_2700 = intermediate_AFB_from_E(c, 2.700 * kV, self.E_2700)
+            AFB_14300 = intermediate_AFB_from_E(c, 14.300 * kV, self.E_14300)
+            return interpolate(c, AFB_600, AFB_2700, AFB_14300)
+        else:
+            return intermediate_AFB_from_E(c, c.V_oc, self.E)
@@ -0,0 +1,192 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Finds the fault levels (I_bf) and clearing times at which a bus's PPE category changes.
+#
+# Fault level:
+# ============
+#
+# The clearing time T depends on the current seen by the protective device - during an arcing fault, that is the
+# arcing current. So for a bus protected by a device with time-current curve T_curve, the incident energy as a function
+# of the bolted fault current is:
+#
+#       E(I_bf) = T_curve(I_arc(I_bf)) * e(I_bf)
+#
+# where e(I_bf) is the incident energy per millisecond (E is exactly proportional to T). E(I_bf) is not monotonic: e
+# has polynomial terms in I_bf (Eq 1, Eqs 3-6), and the clearing time drops steeply (or in steps) as the current
+# increases. So E can cross a PPE category threshold several times, in both directions.
+#
+# To find every crossing safely, E is first evaluated on a log-spaced grid of I_bf covering the model's range, for all
+# buses at once with the vectorised calculation. Each grid cell where E is on different sides of a threshold at its two
+# ends brackets a crossing, which is then refined by bisection - again vectorised, over every bracket of every bus at
+# once. (A crossing and re-crossing within a single grid cell would be missed; the default grid of 1024 points makes
+# the cells about 0.5% wide in I_bf.) Where the time-current curve has a step, e.g. at an instantaneous pickup, the
+# "crossing" found is at the step.
+#
+# Clearing time:
+# ==============
+#
+# For a fixed I_bf, E is proportional to T, so the clearing time at which E reaches a threshold is simply
+# threshold / e(I_bf).
+#
+# Buses are given either as a list of Cubicles, or as a dict of columns: V_oc, EC, G, D, height, width, depth, in the
+# units used by vectorized.py.
+# Thresholds are in cal/cm², and default to the PPE category ratings in labels.py.
+#
+#     curve = tabulated_curve([1, 5, 10, 20, 40], [2000, 600, 250, 80, 50])     # kA, ms
+#     crossings = I_bf_breakpoints(buses, curve)
+#     crossings["bus"], crossings["rating"], crossings["I_bf"], crossings["direction"]
+
+from functools import partial
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.executor import Executor, get_executor
+from arcflash.ieee_1584.labels import PPE_CATEGORY_RATINGS
+from arcflash.ieee_1584.units import cal_per_sq_cm, J_per_sq_cm, kV, mm
+from arcflash.ieee_1584.validation import I_BF_RANGE
+
+_J_per_cal = (1 * cal_per_sq_cm).m_as(J_per_sq_cm)
+
+
+def tabulated_curve(I: list, T: list):
+    # A time-current curve from a table of points: current I (kA) against clearing time T (ms), interpolated on log-log
+    # axes. Currents outside the table use the clearing time at the nearest end of the table.
+    # Returns a function T_curve(I_arc, bus) -> T, usable as `T_curve` below (the same curve for every bus). It can be
+    # pickled, e.g. to send it to a ProcessExecutor.
+    log_I = np.log(np.asarray(I, dtype=float))
+    log_T = np.log(np.asarray(T, dtype=float))
+    assert np.all(np.diff(log_I) > 0)
+    return partial(_tabulated_T, log_I, log_T)
+
+
+def _tabulated_T(log_I: np.ndarray, log_T: np.ndarray, I_arc, bus=None):
+    return np.exp(np.interp(np.log(I_arc), log_I, log_T))
+
+
+def cubicle_columns(cubicles: list) -> dict:
+    # Converts a list of Cubicles to a dict of columns.
+    columns = {"V_oc": [c.V_oc.m_as(kV) for c in cubicles], "EC": [c.EC for c in cubicles]}
+    for name in ("G", "D", "height", "width", "depth",):
+        columns[name] = [getattr(c, name).m_as(mm) for c in cubicles]
+    return {k: np.asarray(v) for k, v in columns.items()}
+
+
+class _Buses:
+    # Per-bus values for the vectorised calculation.
+    def __init__(self, buses):
+        if not isinstance(buses, dict):
+            buses = cubicle_columns(buses)
+        self.V_oc = np.asarray(buses["V_oc"], dtype=float)
+        self.ec = vectorized.ec_index(buses["EC"])
+        self.G = np.asarray(buses["G"], dtype=float)
+        self.D = np.asarray(buses["D"], dtype=float)
+        self.CF, self.VarCF = vectorized.cubicle_factors(self.V_oc, buses["EC"], buses["height"], buses["width"],
+                                                         buses["depth"])
+        LV = self.V_oc <= 0.6
+        self.I_lo = np.where(LV, I_BF_RANGE["LV"][0], I_BF_RANGE["HV"][0])
+        self.I_hi = np.where(LV, I_BF_RANGE["LV"][1], I_BF_RANGE["HV"][1])
+
+    def __len__(self):
+        return len(self.V_oc)
+
+    def energy_per_ms(self, bus: np.ndarray, I_bf: np.ndarray, full_or_reduced: str) -> dict:
+        # I_arc (kA) and E (J/cm²) for T = 1 ms.
+        return vectorized.calculate_from_factors(
+            self.V_oc[bus], self.ec[bus], self.G[bus], self.D[bus], self.CF[bus], self.VarCF[bus], I_bf, 1.0,
+            full_or_reduced)
+
+    def energy(self, bus: np.ndarray, I_bf: np.ndarray, T_curve, full_or_reduced: str) -> np.ndarray:
+        # E (J/cm²), with the clearing time from the time-current curve. For "worst", the higher of the full and
+        # reduced arcing current cases.
+        if full_or_reduced == "worst":
+            both = vectorized.calculate_full_and_reduced_from_factors(
+                self.V_oc[bus], self.ec[bus], self.G[bus], self.D[bus], self.CF[bus], self.VarCF[bus], I_bf, 1.0)
+            return np.maximum(*(r["E"] * T_curve(r["I_arc"], bus) for r in both.values()))
+        r = self.energy_per_ms(bus, I_bf, full_or_reduced)
+        return r["E"] * T_curve(r["I_arc"], bus)
+
+
+def _energy(columns: dict, buses: _Buses, T_curve, full_or_reduced: str) -> dict:
+    # _Buses.energy(), for a chunk of (bus, I_bf) rows.
+    return {"E": buses.energy(columns["bus"], columns["I_bf"], T_curve, full_or_reduced)}
+
+
+def _energy_per_ms(columns: dict, buses: _Buses, full_or_reduced: str) -> dict:
+    # _Buses.energy_per_ms(), for a chunk of (bus, I_bf) rows.
+    return buses.energy_per_ms(columns["bus"], columns["I_bf"], full_or_reduced)
+
+
+def I_bf_breakpoints(buses, T_curve, ratings=PPE_CATEGORY_RATINGS, full_or_reduced: str = "worst",
+                     n_grid: int = 1024, iterations: int = 40, executor: Executor = None) -> dict:
+    # Finds every I_bf at which E crosses one of the `ratings` (cal/cm²), for every bus.
+    #
+    # T_curve(I_arc, bus) returns the clearing time (ms) for arcing currents I_arc (kA) at the given buses (indices
+    # into `buses`); both are arrays of the same shape. Refer tabulated_curve().
+    # `full_or_reduced`: "full", "reduced", or "worst" (the higher E of the two cases, as used for labelling).
+    # `executor`: the grid, and each step of the bisection, are evaluated in chunks on `executor` (refer executor.py).
+    # For a ProcessExecutor, T_curve must be picklable, e.g. from tabulated_curve().
+    #
+    # Returns a dict of columns, one row per crossing, sorted by bus and then I_bf:
+    #   bus         index of the bus
+    #   rating      the threshold crossed (cal/cm²)
+    #   I_bf        I_bf at the crossing (kA)
+    #   direction   +1 if E rises above the rating as I_bf increases, -1 if it falls below it
+    #
+    # The result can miss breakpoints: only crossings bracketed by the grid of `n_grid` points are found, so a crossing
+    # and re-crossing of the same rating within one grid cell (about 0.5% of I_bf wide, by default) is not reported.
+    # (E is not certified monotonic within a cell - T_curve is an arbitrary function, so it can't be bounded.) Increase
+    # n_grid to narrow the cells.
+    assert full_or_reduced in ("full", "reduced", "worst",)
+    b = _Buses(buses)
+    thresholds = np.asarray(ratings, dtype=float) * _J_per_cal
+    run = get_executor(executor).map_chunks
+    energy = partial(_energy, buses=b, T_curve=T_curve, full_or_reduced=full_or_reduced)
+
+    # Grid of log(I_bf), one row per bus.
+    t = np.linspace(0, 1, n_grid)
+    log_I = np.log(b.I_lo)[:, np.newaxis] + t * (np.log(b.I_hi) - np.log(b.I_lo))[:, np.newaxis]
+    bus = np.repeat(np.arange(len(b)), n_grid).reshape(len(b), n_grid)
+    E = run(energy, {"bus": bus.ravel(), "I_bf": np.exp(log_I.ravel())})["E"].reshape(len(b), n_grid)
+
+    # Brackets: (bus, cell, threshold) where E is above the threshold at one end of the cell and not the other.
+    above = E[:, :, np.newaxis] > thresholds
+    br_bus, br_cell, br_thr = np.nonzero(above[:, :-1] != above[:, 1:])
+    lo = log_I[br_bus, br_cell]
+    hi = log_I[br_bus, br_cell + 1]
+    lo_above = above[br_bus, br_cell, br_thr]
+
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        mid_above = run(energy, {"bus": br_bus, "I_bf": np.exp(mid)})["E"] > thresholds[br_thr]
+        same = mid_above == lo_above
+        lo = np.where(same, mid, lo)
+        hi = np.where(same, hi, mid)
+
+    I_bf = np.exp((lo + hi) / 2)
+    order = np.lexsort((I_bf, br_bus))
+    return {
+        "bus": br_bus[order],
+        "rating": np.asarray(ratings, dtype=float)[br_thr][order],
+        "I_bf": I_bf[order],
+        "direction": np.where(lo_above, -1, 1)[order],
+    }
+
+
+def clearing_time_breakpoints(buses, I_bf, ratings=PPE_CATEGORY_RATINGS, full_or_reduced: str = "full",
+                              executor: Executor = None):
+    # The clearing time (ms) at which E reaches each of the `ratings` (cal/cm²), for each bus at a fault level I_bf (kA,
+    # one per bus). Returns an array of shape (number of buses, number of ratings). `executor`: refer executor.py.
+    # Raises ValueError if any I_bf is outside the model's range (refer validation.py).
+    assert full_or_reduced in ("full", "reduced",)
+    b = _Buses(buses)
+    I_bf = np.broadcast_to(np.asarray(I_bf, dtype=float), (len(b),))
+    outside = np.flatnonzero(~((I_bf >= b.I_lo) & (I_bf <= b.I_hi)))  # (including NaN)
+    if len(outside):
+        raise ValueError(f"I_bf out of range for bus(es) {outside.tolist()}. I_bf must be within 500 A to 106 kA (LV) "
+                         f"or 200 A to 65 kA (HV).")
+    columns = {"bus": np.arange(len(b)), "I_bf": I_bf}
+    e = get_executor(executor).map_chunks(partial(_energy_per_ms, buses=b, full_or_reduced=full_or_reduced),
+                                          columns)["E"]
+    return np.asarray(ratings, dtype=float) * _J_per_cal / e[:, np.newaxis]
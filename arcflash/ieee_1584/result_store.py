@@ -0,0 +1,241 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Columnar on-disk storage for large batches of calculation results.
+#
+# A "result store" is a directory containing:
+#   * manifest.json - the format, the column names and dtypes, and the number of committed rows,
+#   * one file per column (for the "npy" format) or a single data.parquet file (for the "parquet" format).
+#
+# The "npy" format is the default. Each column is a standard NumPy .npy file, so it can be memory-mapped by
+# `numpy.load(..., mmap_mode="r")` and opened instantly regardless of size. Chunks are appended to the end of each
+# column file and the .npy header is rewritten in place with the new row count. The header is always written with a
+# fixed length (see _HEADER_LEN below) so that rewriting it never moves the data.
+#
+# The manifest is only updated (atomically, via os.replace) after the data for a chunk has been written, so the row
+# count in the manifest is always the number of complete rows. A reader never looks past that row count, so a crash
+# part way through writing a chunk cannot produce a torn read.
+#
+# The "parquet" format requires pyarrow. Each chunk becomes one row group.
+#
+# Columns must be plain fixed-size dtypes (floats, ints, bools, or fixed-width strings like "<U4"). Values are stored
+# as plain magnitudes, not pint Quantities - record the units in the column name (e.g. "E_J_per_sq_cm") or in the
+# `units` dict, which is saved in the manifest.
+
+import json
+import os
+import struct
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+FORMATS = ("npy", "parquet",)
+
+# Total length of the .npy preamble (magic string + version + header length + header), in bytes.
+# Must be a multiple of 64 to keep the data aligned, as required by the .npy format specification.
+_HEADER_LEN = 128
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def _write_npy_header(fh, dtype: np.dtype, n_rows: int) -> None:
+    header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (n_rows,), }
+    text = repr(header)
+    pad = _HEADER_LEN - len(_NPY_MAGIC) - 2 - len(text) - 1
+    assert pad >= 0
+    text = text + " " * pad + "\n"
+    fh.seek(0)
+    fh.write(_NPY_MAGIC)
+    fh.write(struct.pack("<H", len(text)))
+    fh.write(text.encode("latin1"))
+
+
+def _write_manifest(path: str, manifest: dict) -> None:
+    tmp = os.path.join(path, MANIFEST + ".tmp")
+    with open(tmp, mode="w") as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp, os.path.join(path, MANIFEST))
+
+
+def _read_manifest(path: str) -> dict:
+    with open(os.path.join(path, MANIFEST)) as fh:
+        return json.load(fh)
+
+
+class ResultWriter:
+    # Append-only writer for a result store.
+    #
+    #     with ResultWriter("study_results") as w:
+    #         for chunk in chunks:
+    #             w.append({"I_bf": ..., "E": ..., "AFB": ...})
+    #
+    # The column names and dtypes are fixed by the first chunk written. Every later chunk must have the same columns.
+    # Reopen an existing "npy" store with append=True to add more rows to it.
+
+    def __init__(self, path: str, format: str = "npy", append: bool = False, units: dict = None):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown result store format {format!r}. Must be one of {FORMATS}.")
+
+        self.path = path
+        self.format = format
+        self.units = dict(units) if units else dict()
+        self.columns = None  # dict of column name -> np.dtype, set by first chunk.
+        self.n_rows = 0
+
+        self._parquet_writer = None
+
+        if append and os.path.exists(os.path.join(path, MANIFEST)):
+            manifest = _read_manifest(path)
+            if manifest["format"] != "npy":
+                raise ValueError("Only 'npy' result stores can be reopened for appending.")
+            self.format = manifest["format"]
+            self.columns = {k: np.dtype(v) for k, v in manifest["columns"].items()} or None
+            self.n_rows = manifest["n_rows"]
+            self.units.update(manifest.get("units", dict()))
+            # Discard any partly-written chunk left over from an interrupted write.
+            for name, dtype in (self.columns or dict()).items():
+                with open(self._column_path(name), mode="r+b") as fh:
+                    fh.truncate(_HEADER_LEN + self.n_rows * dtype.itemsize)
+                    _write_npy_header(fh, dtype, self.n_rows)
+        else:
+            if os.path.exists(os.path.join(path, MANIFEST)):
+                raise FileExistsError(f"Result store already exists at {path}. Use append=True to add rows to it.")
+            os.makedirs(path, exist_ok=True)
+            self._save_manifest()
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.path, name + ".npy")
+
+    def _save_manifest(self) -> None:
+        manifest = {
+            "version": 1,
+            "format": self.format,
+            "n_rows": self.n_rows,
+            "columns": {k: np.lib.format.dtype_to_descr(v) for k, v in (self.columns or dict()).items()},
+            "units": self.units,
+        }
+        _write_manifest(self.path, manifest)
+
+    def _start(self, chunk: dict) -> None:
+        self.columns = dict()
+        for name, values in chunk.items():
+            dtype = values.dtype
+            if dtype.hasobject or dtype.fields is not None or values.ndim != 1:
+                raise TypeError(f"Column {name!r} must be a 1-D array of a plain fixed-size dtype, not {dtype}.")
+            self.columns[name] = dtype
+
+        if self.format == "npy":
+            for name, dtype in self.columns.items():
+                with open(self._column_path(name), mode="wb") as fh:
+                    _write_npy_header(fh, dtype, 0)
+        else:
+            import pyarrow
+            import pyarrow.parquet
+
+            schema = pyarrow.schema([(name, pyarrow.from_numpy_dtype(dtype)) for name, dtype in self.columns.items()])
+            self._parquet_writer = pyarrow.parquet.ParquetWriter(os.path.join(self.path, "data.parquet"), schema)
+
+    def append(self, chunk: dict) -> None:
+        # Appends a chunk of rows. `chunk` is a dict of column name -> 1-D array; all arrays must be the same length.
+        chunk = {name: np.asarray(values) for name, values in chunk.items()}
+
+        lengths = {len(v) for v in chunk.values()}
+        if len(lengths) != 1:
+            raise ValueError(f"All columns in a chunk must be the same length. Got lengths {sorted(lengths)}.")
+        (n,) = lengths
+
+        if self.columns is None:
+            self._start(chunk)
+        elif set(chunk) != set(self.columns):
+            raise ValueError(f"Chunk columns {sorted(chunk)} do not match store columns {sorted(self.columns)}.")
+
+        for name, dtype in self.columns.items():
+            if chunk[name].dtype.kind in "SU" and chunk[name].dtype.itemsize > dtype.itemsize:
+                # Casting would silently truncate the strings.
+                raise ValueError(f"Column {name!r} is {dtype}, too narrow for a chunk of {chunk[name].dtype}. "
+                                 f"Give the first chunk an explicit, wide enough string dtype.")
+
+        if self.format == "npy":
+            for name, dtype in self.columns.items():
+                values = np.ascontiguousarray(chunk[name], dtype=dtype)
+                with open(self._column_path(name), mode="r+b") as fh:
+                    fh.seek(_HEADER_LEN + self.n_rows * dtype.itemsize)
+                    fh.write(values.tobytes())
+                    _write_npy_header(fh, dtype, self.n_rows + n)
+        else:
+            import pyarrow
+
+            arrays = [pyarrow.array(np.asarray(chunk[name], dtype=dtype)) for name, dtype in self.columns.items()]
+            table = pyarrow.Table.from_arrays(arrays, names=list(self.columns))
+            self._parquet_writer.write_table(table)
+
+        self.n_rows += n
+        if self.format == "npy":
+            self._save_manifest()
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        self._save_manifest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ResultReader:
+    # Read-only view of a result store.
+    #
+    # For the "npy" format, columns are memory-mapped: opening a store is instant regardless of size, and only the
+    # pages actually touched are read from disk.
+    #
+    #     r = ResultReader("study_results")
+    #     E = r["E"]                              # one column, memory-mapped
+    #     cols = r.read(columns=("I_bf", "E"))    # column projection
+
+    def __init__(self, path: str):
+        self.path = path
+        manifest = _read_manifest(path)
+        self.format = manifest["format"]
+        self.n_rows = manifest["n_rows"]
+        self.columns = {k: np.dtype(v) for k, v in manifest["columns"].items()}
+        self.units = manifest.get("units", dict())
+        self._table = None
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self.columns:
+            raise KeyError(name)
+
+        if self.format == "npy":
+            if self.n_rows == 0:
+                return np.empty(0, dtype=self.columns[name])
+            column = np.load(os.path.join(self.path, name + ".npy"), mmap_mode="r")
+            return column[:self.n_rows]
+        else:
+            import pyarrow.parquet
+
+            if self._table is None:
+                self._table = pyarrow.parquet.read_table(os.path.join(self.path, "data.parquet"), memory_map=True)
+            return self._table.column(name).to_numpy()
+
+    def read(self, columns=None) -> dict:
+        # Returns a dict of column name -> array, for the requested columns only (default: all columns).
+        if columns is None:
+            columns = tuple(self.columns)
+
+        if self.format == "parquet" and self._table is None:
+            import pyarrow.parquet
+
+            table = pyarrow.parquet.read_table(os.path.join(self.path, "data.parquet"), columns=list(columns),
+                                               memory_map=True)
+            return {name: table.column(name).to_numpy() for name in columns}
+
+        return {name: self[name] for name in columns}
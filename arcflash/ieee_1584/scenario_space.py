@@ -0,0 +1,214 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# A lazy, randomly indexable Cartesian grid of calculation scenarios.
+#
+# `itertools.product` can only be consumed once, in order, and creates a tuple of pint Quantities for every scenario.
+# A ScenarioSpace instead stores only the values along each axis. Any scenario can be computed from its index in O(1),
+# so a grid of billions of scenarios can be counted, sliced, chunked, sampled, or split between worker processes
+# without ever being materialised.
+#
+#     lv = ScenarioSpace(EC=("VCB", "HCB"), V_oc=(0.208 * kV, 0.6 * kV), I_bf=(0.5 * kA, 20 * kA), ...)
+#     len(lv)           # number of scenarios
+#     lv[123]           # one scenario, as a tuple of plain values
+#     lv[1000:2000]     # dict of column name -> NumPy array
+#
+# Values are stored as plain floats in fixed units (see UNITS below), which are the units used by the vectorised
+# calculation code. Axes can be given as pint Quantities (which are converted) or as plain floats (which are assumed
+# to already be in these units). Axes with no entry in UNITS (e.g. EC) are stored as-is.
+#
+# Scenarios are numbered in the same order as itertools.product, i.e. the last axis varies fastest.
+
+import bisect
+from math import prod
+
+import numpy as np
+
+from arcflash.ieee_1584.units import Q_, kA, kV, ms, mm
+
+UNITS = {
+    "V_oc": kV,
+    "I_bf": kA,
+    "G": mm,
+    "D": mm,
+    "T": ms,
+    "width": mm,
+    "height": mm,
+    "depth": mm,
+}
+
+
+def _axis_values(name: str, values) -> np.ndarray:
+    unit = UNITS.get(name)
+
+    if isinstance(values, Q_):  # a single array Quantity
+        values = values.m_as(unit)
+    elif unit is not None:
+        values = [v.m_as(unit) if isinstance(v, Q_) else v for v in values]
+    elif any(isinstance(v, Q_) for v in values):
+        raise ValueError(f"Axis {name!r} has no fixed unit in UNITS, so it can't be given as Quantities.")
+
+    values = np.asarray(values)
+    if values.ndim != 1:
+        raise ValueError(f"Axis {name!r} must be one-dimensional.")
+    if values.dtype.kind in "iu":
+        values = values.astype(float)
+    return values
+
+
+class _Factor:
+    # One factor of a Cartesian product: either a single axis, or several axes that have been merged by filter() and
+    # so vary together. `columns` is a dict of axis name -> array; all arrays have the same length.
+    def __init__(self, columns: dict):
+        self.columns = columns
+        self.length = len(next(iter(columns.values())))
+
+
+class _Grid:
+    # A Cartesian product of factors.
+    def __init__(self, factors: list):
+        self.factors = factors
+        self.length = prod(f.length for f in factors)
+
+    def decode(self, local: np.ndarray) -> dict:
+        # Maps an array of indices (within this grid) to a dict of column arrays.
+        out = dict()
+        local = local.copy()
+        for f in reversed(self.factors):
+            i = local % f.length
+            local //= f.length
+            for name, col in f.columns.items():
+                out[name] = col[i]
+        return out
+
+    def decode_one(self, local: int) -> dict:
+        out = dict()
+        for f in reversed(self.factors):
+            local, i = divmod(local, f.length)
+            for name, col in f.columns.items():
+                out[name] = col[i].item()
+        return out
+
+
+class ScenarioSpace:
+    def __init__(self, **axes):
+        if not axes:
+            raise ValueError("A ScenarioSpace needs at least one axis.")
+        factors = [_Factor({name: _axis_values(name, values)}) for name, values in axes.items()]
+        self._init(tuple(axes), [_Grid(factors)])
+
+    def _init(self, names: tuple, grids: list) -> None:
+        self.names = names
+        self._grids = grids
+        self._offsets = [0]
+        for g in grids:
+            self._offsets.append(self._offsets[-1] + g.length)
+
+        self.dtypes = dict()
+        for name in names:
+            self.dtypes[name] = np.result_type(*(f.columns[name].dtype for g in grids for f in g.factors
+                                                 if name in f.columns))
+
+    @classmethod
+    def _from_grids(cls, names: tuple, grids: list) -> "ScenarioSpace":
+        space = cls.__new__(cls)
+        space._init(names, grids)
+        return space
+
+    def __len__(self) -> int:
+        return self._offsets[-1]
+
+    def __repr__(self) -> str:
+        return f"<ScenarioSpace of {len(self)} scenarios: {', '.join(self.names)}>"
+
+    def __add__(self, other: "ScenarioSpace") -> "ScenarioSpace":
+        # Concatenation, like itertools.chain(). Both spaces must have the same axes.
+        if set(self.names) != set(other.names):
+            raise ValueError(f"Can't concatenate spaces with different axes: {self.names} and {other.names}.")
+        return ScenarioSpace._from_grids(self.names, self._grids + other._grids)
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            columns = [chunk[name].tolist() for name in self.names]
+            yield from zip(*columns)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.take(np.arange(*item.indices(len(self))))
+
+        n = len(self)
+        i = int(item)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(f"Scenario index {item} out of range for ScenarioSpace of length {n}.")
+
+        g = bisect.bisect_right(self._offsets, i) - 1
+        row = self._grids[g].decode_one(i - self._offsets[g])
+        return tuple(row[name] for name in self.names)
+
+    def take(self, indices) -> dict:
+        # Returns the scenarios at the given indices, as a dict of column name -> NumPy array.
+        indices = np.asarray(indices, dtype=np.int64)
+        n = len(self)
+        if indices.size and (indices.min() < -n or indices.max() >= n):
+            raise IndexError(f"Scenario index out of range for ScenarioSpace of length {n}.")
+        indices = np.where(indices < 0, indices + n, indices)
+
+        if len(self._grids) == 1:
+            return self._grids[0].decode(indices)
+
+        out = {name: np.empty(len(indices), dtype=self.dtypes[name]) for name in self.names}
+        which = np.searchsorted(self._offsets, indices, side="right") - 1
+        for g, grid in enumerate(self._grids):
+            mask = which == g
+            if mask.any():
+                for name, col in grid.decode(indices[mask] - self._offsets[g]).items():
+                    out[name][mask] = col
+        return out
+
+    def chunks(self, size: int = 65536, start: int = 0, stop: int = None):
+        # Yields dicts of column arrays, covering scenarios [start, stop) in order, `size` scenarios at a time.
+        if stop is None:
+            stop = len(self)
+        for i in range(start, stop, size):
+            yield self.take(np.arange(i, min(i + size, stop)))
+
+    def sample(self, n: int, seed=None, replace: bool = False) -> dict:
+        # Returns a random sample of `n` scenarios (in index order), as a dict of column arrays.
+        rng = np.random.default_rng(seed)
+        indices = rng.choice(len(self), size=n, replace=replace)
+        return self.take(np.sort(indices))
+
+    def filter(self, names: tuple, predicate) -> "ScenarioSpace":
+        # Returns a new space without the scenarios for which `predicate` is false.
+        #
+        # `predicate` is called once per grid, with the named axes as keyword arguments, as arrays covering every
+        # combination of those axes. E.g. to discard enclosures narrower than four times the busbar gap:
+        #
+        #     space.filter(("width", "G"), lambda width, G: width >= 4 * G)
+        #
+        # Only the named axes are combined - the rest of the grid is never generated - so the result is still a lazy,
+        # randomly indexable space. The combined axes become a single factor of the product, in the position of the
+        # first of them, which changes the order in which the remaining scenarios are numbered.
+        for name in names:
+            if name not in self.names:
+                raise KeyError(name)
+
+        grids = list()
+        for grid in self._grids:
+            involved = [f for f in grid.factors if set(f.columns) & set(names)]
+            joint = _Grid(involved)
+            columns = joint.decode(np.arange(joint.length))
+            keep = np.asarray(predicate(**{name: columns[name] for name in names}), dtype=bool)
+            merged = _Factor({name: col[keep] for name, col in columns.items()})
+
+            factors = list()
+            for f in grid.factors:
+                if f is involved[0]:
+                    factors.append(merged)
+                elif f not in involved:
+                    factors.append(f)
+            grids.append(_Grid(factors))
+
+        return ScenarioSpace._from_grids(self.names, grids)
@@ -0,0 +1,178 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Compact serialisation of Cubicle and Calculation objects, e.g. for sending them to process pool workers or caching
+# them on disk.
+#
+# Pickling these objects pickles every pint Quantity they hold, which is slow and bulky - and a Quantity is unpickled
+# into pint's *application* registry, which is not necessarily the registry `ureg` in units.py. Instead, objects are
+# encoded here as fixed-size binary records (a NumPy structured array), holding plain float magnitudes in fixed units:
+#
+#   V_oc                kV
+#   G, D                mm
+#   height, width, depth    mm
+#   I_bf, I_arc*        kA
+#   T_arc               s (as stored by Calculation.calculate_E_AFB())
+#   E*                  J/cm²
+#   AFB*                mm
+#
+# These are the units the scalar code works in, so a round trip is exact. (Values given in other units, e.g. a gap in
+# inches, are converted once, when encoded.) Values that have not been calculated yet (None) are stored as NaN.
+#
+# Only the inputs of a Cubicle are stored. The values calculated from them (CF, VarCF, EES, ...) are recalculated on
+# decoding, for all cubicles at once, by vectorized.enclosure_factors() - which matches Cubicle exactly. Calculations
+# that share a Cubicle still share one Cubicle after decoding.
+#
+# A structured array can be sent to another process as is (it pickles as a single buffer), or converted to bytes with
+# dumps(), which adds a header with the format version.
+#
+#     records = encode_calculations(calcs)      # or encode_cubicles()
+#     data = dumps(records)
+#     calcs = decode_calculations(loads(data))  # or decode_cubicles()
+
+import struct
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.units import ureg, dimensionless, inch, mm, sec, kV, kA, J_per_sq_cm
+
+VERSION = 1
+
+CUBICLE_FIELDS = {
+    "V_oc": kV,
+    "G": mm,
+    "D": mm,
+    "height": mm,
+    "width": mm,
+    "depth": mm,
+}
+
+CALCULATION_FIELDS = {
+    "I_bf": kA,
+    "T_arc": sec,
+    "I_arc": kA,
+    "I_arc_600": kA,
+    "I_arc_2700": kA,
+    "I_arc_14300": kA,
+    "E": J_per_sq_cm,
+    "E_600": J_per_sq_cm,
+    "E_2700": J_per_sq_cm,
+    "E_14300": J_per_sq_cm,
+    "AFB": mm,
+    "AFB_600": mm,
+    "AFB_2700": mm,
+    "AFB_14300": mm,
+}
+
+FULL_OR_REDUCED = ("full", "reduced",)
+
+CUBICLE_DTYPE = np.dtype([("EC", np.uint8)] + [(name, np.float64) for name in CUBICLE_FIELDS])
+CALCULATION_DTYPE = np.dtype([("c", CUBICLE_DTYPE), ("full_or_reduced", np.uint8)] + [
+    (name, np.float64) for name in CALCULATION_FIELDS])
+
+_MAGIC = b"A1584"
+_HEADER = struct.Struct("<5sHB")  # magic, version, kind
+_KINDS = (CUBICLE_DTYPE, CALCULATION_DTYPE,)
+
+
+def _magnitudes(objects: list, name: str, units) -> list:
+    # [getattr(o, name).m_as(units) for o in objects], with None -> NaN.
+    return [np.nan if q is None else q.m_as(units) for q in (getattr(o, name) for o in objects)]
+
+
+def _quantities(magnitudes: np.ndarray, units) -> list:
+    # [m * units for m in magnitudes], in the registry `ureg`, with NaN -> None. Each value gets its own Quantity:
+    # Quantities can be changed in place (e.g. q.ito(inch)), so sharing one between objects would let a change to one
+    # object change others.
+    quantity = ureg.Quantity
+    return [quantity(m, units) if m == m else None for m in magnitudes.tolist()]
+
+
+def encode_cubicles(cubicles: list) -> np.ndarray:
+    records = np.empty(len(cubicles), dtype=CUBICLE_DTYPE)
+    records["EC"] = vectorized.ec_index([c.EC for c in cubicles])
+    for name, units in CUBICLE_FIELDS.items():
+        records[name] = _magnitudes(cubicles, name, units)
+    return records
+
+
+def decode_cubicles(records: np.ndarray) -> list:
+    # Returns a list of Cubicles, one per record. The Cubicles are not bounds-checked again - they were checked when
+    # they were first created.
+    if records.dtype != CUBICLE_DTYPE:
+        raise ValueError(f"Expected records of dtype {CUBICLE_DTYPE}, not {records.dtype}.")
+    f = vectorized.enclosure_factors(records["V_oc"], records["EC"], records["height"], records["width"],
+                                     records["depth"])
+
+    values = {name: _quantities(records[name], units) for name, units in CUBICLE_FIELDS.items()}
+    for name, units in (("CF", dimensionless), ("VarCF", dimensionless), ("EES", inch), ("height_1", inch),
+                        ("width_1", inch),):
+        values[name] = _quantities(f[name], units)
+    values["EC"] = [vectorized.EC_NAMES[i] for i in records["EC"].tolist()]
+    values["enclosure_type"] = [t or None for t in f["enclosure_type"].tolist()]
+    values["vlevel"] = np.where(records["V_oc"] <= 0.6, "LV", "HV").tolist()
+
+    names = tuple(values)
+    cubicles = []
+    for row in zip(*values.values()):
+        c = Cubicle.__new__(Cubicle)
+        c.__dict__.update(zip(names, row))
+        cubicles.append(c)
+    return cubicles
+
+
+def encode_calculations(calcs: list) -> np.ndarray:
+    records = np.empty(len(calcs), dtype=CALCULATION_DTYPE)
+    # Encode each Cubicle once, however many calculations share it.
+    index = {}
+    for calc in calcs:
+        index.setdefault(id(calc.c), (len(index), calc.c))
+    cubicles = encode_cubicles([c for _, c in index.values()])
+    records["c"] = cubicles[[index[id(calc.c)][0] for calc in calcs]]
+    records["full_or_reduced"] = [FULL_OR_REDUCED.index(calc.full_or_reduced) for calc in calcs]
+    for name, units in CALCULATION_FIELDS.items():
+        records[name] = _magnitudes(calcs, name, units)
+    return records
+
+
+def decode_calculations(records: np.ndarray) -> list:
+    # Returns a list of Calculations, one per record. Calculations with identical cubicles share one Cubicle object.
+    if records.dtype != CALCULATION_DTYPE:
+        raise ValueError(f"Expected records of dtype {CALCULATION_DTYPE}, not {records.dtype}.")
+    unique, inverse = np.unique(records["c"], return_inverse=True)
+    cubicles = decode_cubicles(unique)
+
+    values = {name: _quantities(records[name], units) for name, units in CALCULATION_FIELDS.items()}
+    values["full_or_reduced"] = [FULL_OR_REDUCED[i] for i in records["full_or_reduced"].tolist()]
+
+    values["c"] = [cubicles[j] for j in inverse.reshape(-1).tolist()]
+    values["vlevel"] = ["DEPRECATED"] * len(records)
+
+    names = tuple(values)
+    calcs = []
+    for row in zip(*values.values()):
+        calc = Calculation.__new__(Calculation)
+        calc.__dict__.update(zip(names, row))
+        calcs.append(calc)
+    return calcs
+
+
+def dumps(records: np.ndarray) -> bytes:
+    # Encoded records (from encode_cubicles() or encode_calculations()) as bytes, with a versioned header.
+    kind = next((i for i, dtype in enumerate(_KINDS) if records.dtype == dtype), None)
+    if kind is None:
+        raise ValueError(f"Can't serialise records of dtype {records.dtype}.")
+    return _HEADER.pack(_MAGIC, VERSION, kind) + np.ascontiguousarray(records).tobytes()
+
+
+def loads(data: bytes) -> np.ndarray:
+    # The inverse of dumps().
+    magic, version, kind = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("Not a serialised Cubicle or Calculation array.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported serialisation format version {version}. Expected version {VERSION}.")
+    return np.frombuffer(data, dtype=_KINDS[kind], offset=_HEADER.size).copy()
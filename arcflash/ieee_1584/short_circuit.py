@@ -0,0 +1,321 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Balanced three-phase bolted fault currents for every bus in a network, for use as I_bf in IEEE 1584 calculations.
+#
+# A Network is made of buses, sources (utility supplies, generators, motors - anything that contributes fault current),
+# transformers and cables. All impedances are converted to per-unit on a common base (S_base, and the nominal voltage
+# of each bus) and assembled into the bus admittance matrix Ybus, which is sparse.
+#
+# The bolted fault current at bus i is V_prefault / |Z_ii|, where Z_ii is the i'th diagonal element of the bus
+# impedance matrix Zbus = inverse(Ybus). Zbus is dense, so it is never formed for large networks: Ybus is factorised
+# once (sparse LU), and the diagonal of Zbus is recovered by solving against blocks of unit vectors.
+#
+# The usual simplifications for arc flash studies apply:
+#
+#   * The pre-fault voltage is V_prefault (default 1.0 pu) at every bus. Loads and cable charging are ignored.
+#   * Transformers are rated at the nominal voltages of the buses they connect (no off-nominal taps). Phase shift is
+#     ignored - it does not affect the magnitude of a balanced fault current.
+#   * Source impedances are constant (no AC or DC decrement).
+#
+# Buses that are not connected to any source (through closed branches) are de-energised, and have no fault current.
+#
+# Sparse factorisation needs scipy (the "sparse" extra). Without scipy, Zbus is calculated with dense NumPy, which is
+# fine for networks of up to a few thousand buses.
+#
+#     n = Network()
+#     n.add_bus("MV", 11 * kV)
+#     n.add_bus("LV", 0.415 * kV)
+#     n.add_source("MV", I_sc=25 * kA, X_R=10)
+#     n.add_transformer("TX1", "MV", "LV", S_rated=1.5 * MVA, Z_percent=6, X_R=8)
+#     n.add_cable("C1", "LV", "MCC1", R=0.1 * ohm / km * 50 * m, X=0.08 * ohm / km * 50 * m)
+#     I_bf = n.fault_currents()     # kA, one per bus, in the order the buses were added
+#     results = arc_flash_study(n, equipment)
+
+from math import sqrt
+
+import numpy as np
+
+from arcflash.ieee_1584.executor import Executor
+from arcflash.ieee_1584.sweep import evaluate_scenarios
+from arcflash.ieee_1584.units import Q_, kV, kA, ohm, MVA
+from arcflash.ieee_1584.validation import evaluate_valid
+
+
+def _impedance(Z_magnitude, X_R):
+    # Complex impedance with the given magnitude and X/R ratio. Also works on arrays, element by element.
+    R = Z_magnitude / np.sqrt(1 + np.square(X_R))
+    return R + 1j * R * X_R
+
+
+class Branch:
+    # A transformer or cable between two buses. Only closed branches are part of the network.
+    def __init__(self, name: str, kind: str, from_bus: int, to_bus: int, z: complex, closed: bool):
+        self.name = name
+        self.kind = kind
+        self.from_bus = from_bus
+        self.to_bus = to_bus
+        self.z = z  # per-unit, on the system base
+        self.closed = closed
+
+
+class Network:
+    def __init__(self, S_base: Q_ = 100 * MVA):
+        assert S_base.check('[power]')
+        self.S_base = S_base
+        self._S_base = S_base.m_as(MVA)
+
+        self.bus_names = list()
+        self._bus_lookup = dict()
+        self._V_nom = list()  # kV
+
+        self.sources = list()  # (bus index, per-unit impedance)
+        self.branches = list()
+        self._branch_lookup = dict()
+
+    # --- Building the network -----------------------------------------------------------------------------------------
+
+    def add_bus(self, name: str, V_nom: Q_) -> int:
+        assert V_nom.check('[electric_potential]')
+        if name in self._bus_lookup:
+            raise ValueError(f"Duplicate bus {name!r}.")
+        self._bus_lookup[name] = len(self.bus_names)
+        self.bus_names.append(name)
+        self._V_nom.append(V_nom.m_as(kV))
+        return self._bus_lookup[name]
+
+    def add_source(self, bus: str, I_sc: Q_, X_R: float) -> None:
+        # A source (e.g. utility supply) with a fault level of I_sc at `bus`, and the given X/R ratio.
+        # Several sources may be connected to the same bus.
+        assert I_sc.check('[current]')
+        i = self._bus(bus)
+        # S_sc = sqrt(3) * V_nom * I_sc, and Z = S_base / S_sc in per-unit.
+        S_sc = sqrt(3) * self._V_nom[i] * I_sc.m_as(kA)
+        self.sources.append((i, _impedance(self._S_base / S_sc, X_R)))
+
+    def add_transformer(self, name: str, from_bus: str, to_bus: str, S_rated: Q_, Z_percent: float, X_R: float,
+                        closed: bool = True) -> None:
+        # A two-winding transformer, with impedance Z_percent on its own rating S_rated.
+        assert S_rated.check('[power]')
+        z = Z_percent / 100 * self._S_base / S_rated.m_as(MVA)
+        self._add_branch(name, "transformer", from_bus, to_bus, _impedance(z, X_R), closed)
+
+    def add_cable(self, name: str, from_bus: str, to_bus: str, R: Q_, X: Q_, closed: bool = True) -> None:
+        # A cable, busway, or any other series impedance (R + jX ohms, per phase) between two buses of the same nominal
+        # voltage. For a cable, multiply the per-length impedance by the length, e.g. R = 0.1 * ohm / km * 50 * m.
+        assert R.check('[resistance]')
+        assert X.check('[resistance]')
+        V_from = self._V_nom[self._bus(from_bus)]
+        V_to = self._V_nom[self._bus(to_bus)]
+        if V_from != V_to:
+            raise ValueError(f"Cable {name!r} connects buses of different nominal voltages ({V_from} kV and "
+                             f"{V_to} kV).")
+        Z_base = V_from ** 2 / self._S_base  # ohms
+        z = complex(R.m_as(ohm), X.m_as(ohm)) / Z_base
+        self._add_branch(name, "cable", from_bus, to_bus, z, closed)
+
+    def set_closed(self, branch: str, closed: bool) -> None:
+        # Opens or closes a branch (e.g. to model a tie breaker or an alternate feed).
+        self.branches[self._branch_index(branch)].closed = closed
+
+    def _add_branch(self, name: str, kind: str, from_bus: str, to_bus: str, z: complex, closed: bool) -> None:
+        if name in self._branch_lookup:
+            raise ValueError(f"Duplicate branch {name!r}.")
+        f = self._bus(from_bus)
+        t = self._bus(to_bus)
+        if f == t:
+            raise ValueError(f"Branch {name!r} connects bus {from_bus!r} to itself.")
+        self._branch_lookup[name] = len(self.branches)
+        self.branches.append(Branch(name, kind, f, t, z, closed))
+
+    def _bus(self, name: str) -> int:
+        try:
+            return self._bus_lookup[name]
+        except KeyError:
+            raise ValueError(f"Unknown bus {name!r}.") from None
+
+    def _branch_index(self, name: str) -> int:
+        try:
+            return self._branch_lookup[name]
+        except KeyError:
+            raise ValueError(f"Unknown branch {name!r}.") from None
+
+    # --- Results ------------------------------------------------------------------------------------------------------
+
+    @property
+    def V_nom(self) -> np.ndarray:
+        # Nominal voltage of each bus, kV.
+        return np.array(self._V_nom, dtype=float)
+
+    def bus_index(self, names) -> np.ndarray:
+        # Converts an array of bus names to an array of bus indices.
+        index = [self._bus(name) for name in np.asarray(names).ravel().tolist()]
+        return np.array(index, dtype=np.intp).reshape(np.shape(names))
+
+    def energised(self) -> np.ndarray:
+        # True for each bus that is connected to a source through closed branches.
+        return _energised(len(self.bus_names), [i for i, _ in self.sources],
+                          [(b.from_bus, b.to_bus) for b in self.branches if b.closed])
+
+    def factorise(self, sparse: bool = None) -> "FactorisedNetwork":
+        # Builds and factorises Ybus for the current switching state.
+        # `sparse`: use scipy's sparse LU (True), dense NumPy (False), or scipy if it is installed (None).
+        return FactorisedNetwork(self, sparse)
+
+    def fault_currents(self, V_prefault: float = 1.0, sparse: bool = None) -> np.ndarray:
+        # Bolted three-phase fault current at each bus (kA). De-energised buses have a fault current of 0.
+        return self.factorise(sparse).fault_currents(V_prefault)
+
+
+def _components(n_nodes: int, edges: list) -> np.ndarray:
+    # Connected components, by union-find. Returns a component label for each node (0 ... n_components - 1).
+    parent = list(range(n_nodes))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for f, t in edges:
+        rf, rt = root(f), root(t)
+        if rf != rt:
+            parent[rf] = rt
+
+    return np.unique([root(i) for i in range(n_nodes)], return_inverse=True)[1].reshape(n_nodes)
+
+
+def _energised(n_nodes: int, source_nodes: list, edges: list) -> np.ndarray:
+    # True for every node in a connected component that contains a source.
+    labels = _components(n_nodes, edges)
+    return np.isin(labels, labels[source_nodes])
+
+
+class _SparseFactor:
+    def __init__(self, n: int, rows: np.ndarray, cols: np.ndarray, values: np.ndarray):
+        import scipy.sparse
+        import scipy.sparse.linalg
+
+        Y = scipy.sparse.csc_matrix((values, (rows, cols)), shape=(n, n))
+        self.n = n
+        self._lu = scipy.sparse.linalg.splu(Y)
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        # Returns Zbus @ rhs.
+        return self._lu.solve(np.asarray(rhs, dtype=complex))
+
+    def diagonal(self, block: int = 256) -> np.ndarray:
+        # Diagonal of Zbus, by solving against blocks of columns of the identity matrix.
+        d = np.empty(self.n, dtype=complex)
+        for start in range(0, self.n, block):
+            stop = min(start + block, self.n)
+            rows = np.arange(start, stop)
+            cols = np.arange(stop - start)
+            rhs = np.zeros((self.n, stop - start), dtype=complex)
+            rhs[rows, cols] = 1
+            d[start:stop] = self._lu.solve(rhs)[rows, cols]
+        return d
+
+
+class _DenseFactor:
+    def __init__(self, n: int, rows: np.ndarray, cols: np.ndarray, values: np.ndarray):
+        Y = np.zeros((n, n), dtype=complex)
+        np.add.at(Y, (rows, cols), values)
+        self.n = n
+        self._Z = np.linalg.inv(Y)
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        return self._Z @ rhs
+
+    def diagonal(self) -> np.ndarray:
+        return np.diag(self._Z).copy()
+
+
+def _have_scipy() -> bool:
+    try:
+        import scipy.sparse.linalg  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class FactorisedNetwork:
+    # Ybus of the energised part of a network, factorised, for one switching state.
+    def __init__(self, network: Network, sparse: bool = None):
+        if sparse is None:
+            sparse = _have_scipy()
+
+        self.network = network
+        n_buses = len(network.bus_names)
+
+        # Only energised buses are included in Ybus (otherwise it would be singular). `index` maps each bus to its row
+        # of Ybus, or -1 if it is de-energised.
+        self.energised = network.energised()
+        self.index = np.full(n_buses, -1, dtype=np.intp)
+        self.index[self.energised] = np.arange(np.count_nonzero(self.energised))
+        self.n = int(np.count_nonzero(self.energised))
+
+        rows, cols, values = self.ybus_entries()
+        self.factor = (_SparseFactor if sparse else _DenseFactor)(self.n, rows, cols, values)
+
+    def ybus_entries(self) -> (np.ndarray, np.ndarray, np.ndarray):
+        # Ybus in coordinate form (duplicate entries are summed).
+        rows, cols, values = list(), list(), list()
+        for i, z in self.network.sources:
+            if self.energised[i]:
+                rows.append(self.index[i])
+                cols.append(self.index[i])
+                values.append(1 / z)
+        for b in self.network.branches:
+            if b.closed and self.energised[b.from_bus]:
+                f, t, y = self.index[b.from_bus], self.index[b.to_bus], 1 / b.z
+                rows += [f, t, f, t]
+                cols += [f, t, t, f]
+                values += [y, y, -y, -y]
+        return np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp), np.array(values, dtype=complex)
+
+    def Z_diagonal(self) -> np.ndarray:
+        # Diagonal of Zbus (per-unit) for every bus; NaN for de-energised buses.
+        d = np.full(len(self.index), np.nan, dtype=complex)
+        d[self.energised] = self.factor.diagonal()
+        return d
+
+    def fault_currents(self, V_prefault: float = 1.0) -> np.ndarray:
+        # Bolted three-phase fault current at each bus (kA). De-energised buses have a fault current of 0.
+        return fault_currents_from_Z(self.network, self.Z_diagonal(), V_prefault)
+
+
+def fault_currents_from_Z(network: Network, Z_diagonal: np.ndarray, V_prefault: float = 1.0) -> np.ndarray:
+    # Converts the diagonal of Zbus (per-unit, NaN for de-energised buses) to fault currents in kA.
+    I_base = network._S_base / (sqrt(3) * network.V_nom)
+    with np.errstate(invalid="ignore"):
+        I_bf = V_prefault / np.abs(Z_diagonal) * I_base
+    return np.where(np.isnan(I_bf), 0.0, I_bf)
+
+
+def arc_flash_study(network: Network, equipment: dict, V_prefault: float = 1.0, I_bf: np.ndarray = None,
+                    evaluate=evaluate_scenarios, executor: Executor = None) -> dict:
+    # Evaluates IEEE 1584 for every item of equipment, using the network's bolted fault currents as I_bf.
+    #
+    # `equipment` is a dict of columns (as for ScenarioSpace and evaluate_scenarios()): "bus" (the bus name), "EC", "G",
+    # "D", "height", "width", "depth" and "T". V_oc defaults to the nominal voltage of the bus, unless a "V_oc" column is
+    # given. Pass `I_bf` (kA, one per bus) to use fault currents calculated elsewhere, e.g. for a contingency.
+    #
+    # Returns the equipment columns plus V_oc, I_bf, and the results of `evaluate`. Equipment on de-energised buses, and
+    # equipment whose inputs (including the network's I_bf and V_oc) are outside the model's range, has NaN results.
+    # The "invalid" column gives the reason code for each row (refer validation.py). `executor`: refer executor.py.
+    if I_bf is None:
+        I_bf = network.fault_currents(V_prefault)
+    bus = network.bus_index(equipment["bus"])
+
+    columns = dict(equipment)
+    columns.setdefault("V_oc", network.V_nom[bus])
+    columns["I_bf"] = I_bf[bus]
+    return evaluate_energised(columns, columns["I_bf"] > 0, evaluate, executor)
+
+
+def evaluate_energised(columns: dict, energised: np.ndarray, evaluate=evaluate_scenarios,
+                       executor: Executor = None) -> dict:
+    # Runs `evaluate` on the energised rows with valid inputs only. Results for the other rows are NaN. Refer
+    # validation.evaluate_valid().
+    return evaluate_valid(columns, evaluate, executor, mask=energised)
@@ -0,0 +1,233 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Precomputed lookup tables ("surrogates") for very fast approximate arc flash estimates.
+#
+# A SurrogateTable covers one electrode configuration and one voltage band (LV or HV). It tabulates I_arc and E on a
+# grid over V_oc, I_bf, G and D, and answers queries by multilinear interpolation - linear in V_oc, and in log space
+# for everything else, as E and I_arc are close to power laws in I_bf, G and D.
+#
+# T and CF are not axes of the table. In Eqs 3-6, E is exactly proportional to T and to 1 / CF (the factor
+# 12.552 / 50 * T is outside the power of 10, and CF only appears as log10(1 / CF) inside it), and the interpolation
+# between 0.6, 2.7 and 14.3 kV preserves that. So the table holds E for T = 1 ms and CF = 1, and queries scale it
+# exactly. Likewise the reduced arcing current is exactly I_arc * (1 - 0.5 * VarCF), and VarCF is cheap to compute.
+#
+# Each table carries its measured maximum relative error against the exact calculation, `max_rel_error`. This is
+# measured at the centre of every grid cell (where multilinear interpolation error is usually largest) plus a set of
+# random points. Queries outside the region covered by the table raise ValueError.
+#
+# Units are as in vectorized.py: V_oc kV, I_bf kA, G and D mm, T ms, I_arc kA, E J/cm².
+#
+#     table = build_surrogate("VCB", "HV")
+#     table.save("VCB_HV.npz")
+#     ...
+#     table = SurrogateTable.load("VCB_HV.npz")
+#     I_arc, E = table.query_one(V_oc=4.16, I_bf=15.0, G=104, D=914.4, CF=1.284, T=197, full_or_reduced="full")
+
+import bisect
+from functools import partial
+from math import log10
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.executor import Executor, get_executor
+
+OUTPUTS = ("I_arc", "E_full", "E_reduced",)
+AXES = ("V_oc", "I_bf", "G", "D",)
+LOG_AXES = ("I_bf", "G", "D",)
+
+# The corners of a grid cell, as (0 or 1) offsets along each axis.
+_CORNERS = tuple(np.ndindex(*(2,) * len(AXES)))
+
+
+def default_axes(band: str) -> dict:
+    # Grid nodes for each axis. The HV V_oc axis has a node at 2.7 kV, where the interpolation in Eqs 16-24 has a kink.
+    if band == "LV":
+        return {
+            "V_oc": np.linspace(0.208, 0.6, 9),
+            "I_bf": np.geomspace(0.5, 106.0, 48),
+            "G": np.geomspace(6.35, 76.2, 12),
+            "D": np.geomspace(305.0, 3048.0, 12),
+        }
+    elif band == "HV":
+        return {
+            "V_oc": np.concatenate([np.linspace(0.601, 2.7, 8), np.linspace(2.7, 15.0, 13)[1:]]),
+            "I_bf": np.geomspace(0.2, 65.0, 48),
+            "G": np.geomspace(19.05, 254.0, 12),
+            "D": np.geomspace(305.0, 3048.0, 12),
+        }
+    else:
+        raise ValueError(f"Unknown voltage band {band!r}. Must be 'LV' or 'HV'.")
+
+
+def _exact(EC: str, V_oc, I_bf, G, D, executor: Executor = None) -> dict:
+    # Exact log10 of the tabulated outputs, for T = 1 ms and CF = 1. Inputs are arrays of any (common) shape. The points
+    # are evaluated in chunks, on `executor` (refer executor.py).
+    shape = np.shape(V_oc)
+    columns = {name: np.ravel(x) for name, x in zip(AXES, (V_oc, I_bf, G, D))}
+    out = get_executor(executor).map_chunks(partial(_exact_chunk, EC=EC), columns)
+    return {name: values.reshape(shape) for name, values in out.items()}
+
+
+def _exact_chunk(columns: dict, EC: str) -> dict:
+    V_oc, I_bf, G, D = (columns[name] for name in AXES)
+    ec = vectorized.ec_index(np.full(V_oc.shape, EC))
+    VarCF = vectorized.VarCF(ec, V_oc)
+    out = dict()
+    for full_or_reduced in ("full", "reduced",):
+        r = vectorized.calculate_from_factors(V_oc, ec, G, D, 1.0, VarCF, I_bf, 1.0, full_or_reduced)
+        out[f"E_{full_or_reduced}"] = np.log10(r["E"])
+        if full_or_reduced == "full":
+            out["I_arc"] = np.log10(r["I_arc"])
+    return out
+
+
+class SurrogateTable:
+    def __init__(self, EC: str, band: str, axes: dict, values: dict, max_rel_error: dict):
+        self.EC = EC
+        self.band = band
+        # Axis nodes, in the units above. (Not logs.)
+        self.axes = {name: np.asarray(axes[name], dtype=float) for name in AXES}
+        # log10 of each output at every grid node, as float32 arrays of shape (n_V_oc, n_I_bf, n_G, n_D).
+        self.values = {name: np.asarray(values[name], dtype=np.float32) for name in OUTPUTS}
+        # Measured maximum relative error of each output.
+        self.max_rel_error = dict(max_rel_error)
+
+        # Interpolation coordinates for each axis: linear for V_oc, log10 for the rest.
+        self._coords = {name: (np.log10(a) if name in LOG_AXES else a) for name, a in self.axes.items()}
+        self._coord_lists = {name: c.tolist() for name, c in self._coords.items()}
+        self._strides = np.array(self.values["I_arc"].strides) // self.values["I_arc"].itemsize
+        self._stride_list = self._strides.tolist()
+        self._flat = {name: v.ravel() for name, v in self.values.items()}
+        self._flat_lists = {name: v.tolist() for name, v in self._flat.items()}
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path, EC=self.EC, band=self.band,
+            **{f"axis_{name}": a for name, a in self.axes.items()},
+            **{f"value_{name}": v for name, v in self.values.items()},
+            max_rel_error=np.array([self.max_rel_error[name] for name in OUTPUTS]))
+
+    @classmethod
+    def load(cls, path: str) -> "SurrogateTable":
+        with np.load(path) as f:
+            return cls(
+                str(f["EC"]), str(f["band"]),
+                {name: f[f"axis_{name}"] for name in AXES},
+                {name: f[f"value_{name}"] for name in OUTPUTS},
+                dict(zip(OUTPUTS, f["max_rel_error"].tolist())))
+
+    def _check_region(self, **inputs) -> None:
+        for name, x in inputs.items():
+            a = self.axes[name]
+            x = np.asarray(x)
+            if x.size and (x.min() < a[0] or x.max() > a[-1]):
+                raise ValueError(f"{name} outside the region covered by the {self.EC} {self.band} surrogate table "
+                                 f"({a[0]:g} to {a[-1]:g}).")
+
+    def _interpolate(self, inputs: dict) -> dict:
+        # Multilinear interpolation of every output, for arrays of inputs.
+        index = 0
+        cells = list()
+        for d, name in enumerate(AXES):
+            c = self._coords[name]
+            x = np.log10(inputs[name]) if name in LOG_AXES else np.asarray(inputs[name], dtype=float)
+            i = np.clip(np.searchsorted(c, x, side="right") - 1, 0, len(c) - 2)
+            t = (x - c[i]) / (c[i + 1] - c[i])
+            index = index + i * self._strides[d]
+            cells.append(t)
+
+        out = {name: 0.0 for name in OUTPUTS}
+        for corner in _CORNERS:
+            w = 1.0
+            offset = 0
+            for d, bit in enumerate(corner):
+                w = w * (cells[d] if bit else 1 - cells[d])
+                offset += bit * self._strides[d]
+            for name in OUTPUTS:
+                out[name] = out[name] + w * self._flat[name][index + offset]
+        return out
+
+    def query(self, V_oc, I_bf, G, D, CF, T, full_or_reduced: str) -> (np.ndarray, np.ndarray):
+        # Returns (I_arc, E) for scalars or arrays of inputs.
+        assert full_or_reduced in ("full", "reduced",)
+        self._check_region(V_oc=V_oc, I_bf=I_bf, G=G, D=D)
+
+        logs = self._interpolate({"V_oc": V_oc, "I_bf": I_bf, "G": G, "D": D})
+        I_arc = 10 ** logs["I_arc"]
+        if full_or_reduced == "reduced":
+            ec = vectorized.ec_index(np.full(np.shape(V_oc), self.EC))
+            I_arc = vectorized.I_arc_min(I_arc, vectorized.VarCF(ec, np.asarray(V_oc, dtype=float)))
+        E = 10 ** logs[f"E_{full_or_reduced}"] * np.asarray(T) / np.asarray(CF)
+        return I_arc, E
+
+    def query_one(self, V_oc: float, I_bf: float, G: float, D: float, CF: float, T: float,
+                  full_or_reduced: str) -> (float, float):
+        # As query(), for a single point, using plain Python floats. This is much faster than query() for one point.
+        assert full_or_reduced in ("full", "reduced",)
+        raw = {"V_oc": V_oc, "I_bf": I_bf, "G": G, "D": D}
+        for name, x in raw.items():
+            if not self.axes[name][0] <= x <= self.axes[name][-1]:
+                self._check_region(**{name: x})  # raises ValueError
+
+        index = 0
+        cells = list()
+        for d, name in enumerate(AXES):
+            c = self._coord_lists[name]
+            x = log10(raw[name]) if name in LOG_AXES else raw[name]
+            i = min(max(bisect.bisect_right(c, x) - 1, 0), len(c) - 2)
+            index += i * self._stride_list[d]
+            cells.append((x - c[i]) / (c[i + 1] - c[i]))
+
+        log_I_arc = 0.0
+        log_E = 0.0
+        E_values = self._flat_lists[f"E_{full_or_reduced}"]
+        I_arc_values = self._flat_lists["I_arc"]
+        for corner in _CORNERS:
+            w = 1.0
+            offset = index
+            for d, bit in enumerate(corner):
+                if bit:
+                    w *= cells[d]
+                    offset += self._stride_list[d]
+                else:
+                    w *= 1 - cells[d]
+            log_I_arc += w * I_arc_values[offset]
+            log_E += w * E_values[offset]
+
+        I_arc = 10 ** log_I_arc
+        if full_or_reduced == "reduced":
+            I_arc = float(vectorized.I_arc_min(I_arc, vectorized.VarCF(vectorized.EC_NAMES.index(self.EC), V_oc)))
+        return I_arc, 10 ** log_E * T / CF
+
+
+def build_surrogate(EC: str, band: str, axes: dict = None, n_random: int = 20000, seed: int = 0,
+                    executor: Executor = None) -> SurrogateTable:
+    # Builds and certifies a surrogate table for one electrode configuration and voltage band. The exact calculation
+    # (at the grid nodes and the certification points) is run on `executor` (refer executor.py).
+    if axes is None:
+        axes = default_axes(band)
+    axes = {name: np.asarray(axes[name], dtype=float) for name in AXES}
+
+    grid = np.meshgrid(*(axes[name] for name in AXES), indexing="ij")
+    values = _exact(EC, *grid, executor=executor)
+    table = SurrogateTable(EC, band, axes, values, {name: np.inf for name in OUTPUTS})
+
+    # Certification points: the centre of every grid cell, plus random points. (Centres are taken in the
+    # interpolation coordinates, i.e. geometric means for the log axes.)
+    centres = [np.sqrt(a[1:] * a[:-1]) if name in LOG_AXES else (a[1:] + a[:-1]) / 2 for name, a in axes.items()]
+    points = [g.ravel() for g in np.meshgrid(*centres, indexing="ij")]
+
+    rng = np.random.default_rng(seed)
+    for d, (name, a) in enumerate(axes.items()):
+        if name in LOG_AXES:
+            random = 10 ** rng.uniform(np.log10(a[0]), np.log10(a[-1]), n_random)
+        else:
+            random = rng.uniform(a[0], a[-1], n_random)
+        points[d] = np.concatenate([points[d], random])
+
+    exact = _exact(EC, *points, executor=executor)
+    approx = table._interpolate(dict(zip(AXES, points)))
+    table.max_rel_error = {name: float(np.max(np.abs(10 ** (approx[name] - exact[name]) - 1))) for name in OUTPUTS}
+    return table
@@ -0,0 +1,166 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Sharded, resumable parameter sweeps over a ScenarioSpace.
+#
+# The scenario space is split into `n_shards` contiguous, deterministic ranges of scenario indices. Each shard is
+# evaluated (full and reduced arcing current) with the vectorised calculation and written to its own result store
+# under `out_dir/shards/`. A shard is written to a ".partial" directory and only renamed to its final name once it is
+# complete, so the presence of the final directory is the checkpoint.
+#
+# If a sweep is interrupted, calling run_sweep() again with the same arguments skips the completed shards and carries
+# on. Once every shard is done, merge_shards() concatenates them (in scenario order) into a single result store.
+#
+# Shards are run on a pool of local worker processes, or on any executor (refer executor.py). To split a sweep across
+# several machines sharing a filesystem, run the same sweep on each machine with a different `machine` index
+# (0 ... n_machines - 1); each machine then runs every n_machines'th shard.
+#
+#     space = ScenarioSpace(EC=..., V_oc=..., ...)
+#     run_sweep(space, "sweep_out", n_shards=1000)
+#     merge_shards("sweep_out")
+#     results = ResultReader("sweep_out/results")
+
+import json
+import os
+import shutil
+from functools import partial
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.executor import Executor, SerialExecutor, ProcessExecutor, get_executor
+from arcflash.ieee_1584.result_store import ResultWriter, ResultReader
+from arcflash.ieee_1584.scenario_space import ScenarioSpace
+
+SWEEP_FILE = "sweep.json"
+
+
+def shard_bounds(n_rows: int, n_shards: int, shard: int) -> (int, int):
+    # Returns the range [start, stop) of scenario indices in a shard.
+    assert 0 <= shard < n_shards
+    return shard * n_rows // n_shards, (shard + 1) * n_rows // n_shards
+
+
+def shard_path(out_dir: str, shard: int) -> str:
+    return os.path.join(out_dir, "shards", f"shard_{shard:06d}")
+
+
+def evaluate_scenarios(columns: dict) -> dict:
+    # Evaluates a chunk of scenarios, as produced by ScenarioSpace.take(). Returns the input columns plus the full and
+    # reduced arcing current, incident energy and arc flash boundary. The scenario axis T is used for both the full and
+    # reduced cases.
+    out = dict(columns)
+    both = vectorized.calculate_full_and_reduced(
+        columns["V_oc"], columns["EC"], columns["G"], columns["D"], columns["height"], columns["width"],
+        columns["depth"], columns["I_bf"], columns["T"])
+    for full_or_reduced, results in both.items():
+        for name, values in results.items():
+            out[f"{name}_{full_or_reduced}"] = values
+    return out
+
+
+def evaluate_rows(columns: dict, mask: np.ndarray, evaluate=evaluate_scenarios, executor: Executor = None) -> dict:
+    # Runs `evaluate` on the rows where `mask` is True only. Results for the other rows are NaN.
+    # The rows are evaluated in chunks, on `executor` (refer executor.py).
+    mask = np.asarray(mask, dtype=bool)
+    run = get_executor(executor).map_chunks
+    if mask.all():
+        return run(evaluate, columns)
+
+    # (Scalar columns apply to every row, and are passed on as they are.)
+    results = run(evaluate, {name: values if np.ndim(values) == 0 else np.asarray(values)[mask]
+                             for name, values in columns.items()})
+    out = dict(columns)
+    for name, values in results.items():
+        if name not in columns:
+            full = np.full(len(mask), np.nan, dtype=float)
+            full[mask] = values
+            out[name] = full
+    return out
+
+
+def run_shard(space: ScenarioSpace, out_dir: str, n_shards: int, shard: int, chunk_size: int = 65536,
+              evaluate=evaluate_scenarios) -> str:
+    # Evaluates one shard, unless it has already been completed. Returns the path of the shard's result store.
+    final = shard_path(out_dir, shard)
+    if os.path.exists(final):
+        return final
+
+    partial_dir = final + ".partial"
+    shutil.rmtree(partial_dir, ignore_errors=True)
+
+    start, stop = shard_bounds(len(space), n_shards, shard)
+    with ResultWriter(partial_dir) as w:
+        for chunk in space.chunks(chunk_size, start, stop):
+            w.append(evaluate(chunk))
+
+    os.replace(partial_dir, final)
+    return final
+
+
+def completed_shards(out_dir: str, n_shards: int) -> list:
+    return [s for s in range(n_shards) if os.path.exists(shard_path(out_dir, s))]
+
+
+def run_sweep(space: ScenarioSpace, out_dir: str, n_shards: int, workers: int = None, machine: int = 0,
+              n_machines: int = 1, chunk_size: int = 65536, evaluate=evaluate_scenarios,
+              executor: Executor = None) -> list:
+    # Runs all outstanding shards belonging to this machine. Returns the list of shards that were run.
+    #
+    # The shards are run on `executor`, one task per shard (refer executor.py). If no executor is given, a pool of
+    # `workers` processes (default: one per CPU) is started for this call. Use workers=0 to run in this process.
+    # `evaluate` must be a module-level function (so that it can be sent to worker processes).
+    assert 0 <= machine < n_machines
+
+    os.makedirs(os.path.join(out_dir, "shards"), exist_ok=True)
+
+    # Record the sweep's layout, and refuse to resume a different sweep in the same directory - otherwise the shard
+    # boundaries would not line up.
+    sweep = {"n_rows": len(space), "n_shards": n_shards, "columns": list(space.names)}
+    sweep_file = os.path.join(out_dir, SWEEP_FILE)
+    if os.path.exists(sweep_file):
+        with open(sweep_file) as fh:
+            existing = json.load(fh)
+        if existing != sweep:
+            raise ValueError(f"{out_dir} contains a different sweep ({existing}). Use a new output directory.")
+    else:
+        with open(sweep_file, mode="w") as fh:
+            json.dump(sweep, fh, indent=2)
+
+    done = set(completed_shards(out_dir, n_shards))
+    todo = [s for s in range(machine, n_shards, n_machines) if s not in done]
+
+    run = partial(run_shard, space, out_dir, n_shards, chunk_size=chunk_size, evaluate=evaluate)
+    if executor is not None:
+        executor.map(run, todo)
+    else:
+        with (SerialExecutor() if workers == 0 else ProcessExecutor(workers)) as executor:
+            executor.map(run, todo)
+
+    return todo
+
+
+def merge_shards(out_dir: str, dest: str = None, chunk_size: int = 1048576) -> str:
+    # Concatenates all shards of a completed sweep, in order, into a single result store (default: out_dir/results).
+    # Returns the path of the merged result store.
+    with open(os.path.join(out_dir, SWEEP_FILE)) as fh:
+        n_shards = json.load(fh)["n_shards"]
+
+    missing = sorted(set(range(n_shards)) - set(completed_shards(out_dir, n_shards)))
+    if missing:
+        raise ValueError(f"Can't merge an incomplete sweep. {len(missing)} shard(s) are missing, e.g. {missing[:5]}.")
+
+    if dest is None:
+        dest = os.path.join(out_dir, "results")
+    partial_dir = dest + ".partial"
+    shutil.rmtree(partial_dir, ignore_errors=True)
+
+    with ResultWriter(partial_dir) as w:
+        for s in range(n_shards):
+            r = ResultReader(shard_path(out_dir, s))
+            for start in range(0, len(r), chunk_size):
+                w.append({name: np.asarray(r[name][start:start + chunk_size]) for name in r.columns})
+
+    shutil.rmtree(dest, ignore_errors=True)
+    os.replace(partial_dir, dest)
+    return dest
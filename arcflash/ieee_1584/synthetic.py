@@ -0,0 +1,224 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Seeded generator of synthetic sites (plants), for testing the bulk calculation code at realistic scale.
+#
+# The "additional test cases" (refer additional_test_cases/test_case_generator.py) are a uniform Cartesian grid over
+# the model's inputs. Real studies look nothing like that:
+#   * The mix of equipment is skewed - a site has far more LV panelboards and MCCs than 15 kV switchgear.
+#   * The same few enclosure designs are repeated many times over.
+#   * LV and HV buses are mixed together.
+#   * Some buses have a fault current that decays while the arc burns (e.g. motor contribution, generator decrement),
+#     and are calculated in several steps (refer multistep.py).
+#
+# A site is built from a catalogue of enclosure designs, each based on one of the typical equipment classes of
+# IEEE 1584-2018 Tables 8 and 10 (tables.table_8_10), with the enclosure dimensions varied a little. Each bus is one of
+# the designs, chosen with a Zipf-like popularity so that a few designs account for most buses. I_bf and T are drawn
+# from log-normal distributions, clipped to the model's range.
+#
+# Buses are generated in blocks of BLOCK_SIZE, each from its own seed derived from the site seed and the block number.
+# So any range of buses can be generated on its own (e.g. by different workers), and a site of 10M buses never has to
+# be held in memory at once. The output only depends on the seed and the SiteProfile - not on how it is read.
+#
+# Columns (one row per bus) - the same columns as the scenario chunks used by sweep.py, in the same units:
+#
+#   bus                 bus number, 0 ... n_buses - 1
+#   equipment_class     index into EQUIPMENT_CLASSES
+#   design              index into the site's catalogue of enclosure designs
+#   V_oc, EC, G, D, height, width, depth
+#   I_bf                bolted fault current (kA), at the start of the arc
+#   T                   total clearing time (ms)
+#   n_steps             number of steps in the bus's fault decrement profile (1 if the fault current doesn't decay)
+#
+# Fault decrement steps (one row per step, for buses with n_steps > 1):
+#
+#   bus, step           step = 0 ... n_steps - 1
+#   I_bf                bolted fault current during the step (kA). Step 0 has the bus's I_bf.
+#   T                   duration of the step (ms). The steps of a bus add up to its T.
+#
+#     site = SyntheticSite(n_buses=1_000_000, seed=1)
+#     for buses, steps in site.blocks():
+#         ...
+#     site.write("site_1M")   # result stores "site_1M/buses" and "site_1M/steps"
+
+import os
+
+import numpy as np
+
+from arcflash.ieee_1584.result_store import ResultWriter
+from arcflash.ieee_1584.tables import table_8_10
+from arcflash.ieee_1584.validation import I_BF_RANGE
+from arcflash.ieee_1584.vectorized import EC_NAMES
+
+BLOCK_SIZE = 65536
+
+EQUIPMENT_CLASSES = tuple(table_8_10)
+
+UNITS = {"V_oc": "kV", "G": "mm", "D": "mm", "height": "mm", "width": "mm", "depth": "mm", "I_bf": "kA", "T": "ms"}
+
+
+def _voltages(equipment_class: str) -> tuple:
+    # Typical nominal voltages (kV) for an equipment class, from its name in Tables 8 and 10.
+    if equipment_class.startswith("15kV"):
+        return 11.0, 13.8, 15.0,
+    if equipment_class.startswith("5kV"):
+        return 2.4, 3.3, 4.16, 6.6,
+    return 0.208, 0.4, 0.415, 0.48, 0.6,
+
+
+class SiteProfile:
+    # The distributions a synthetic site is drawn from. Every argument is optional.
+    #
+    #   class_weights   relative number of designs of each equipment class (keys from EQUIPMENT_CLASSES)
+    #   EC_weights      relative frequency of each electrode configuration
+    #   voltages        dict of equipment class -> nominal voltages (kV) to choose from. Default: refer _voltages().
+    #   buses_per_design    average number of buses per enclosure design
+    #   popularity      Zipf exponent of the popularity of designs. 0 is uniform, higher is more skewed.
+    #   size_spread     relative spread (standard deviation) of the enclosure dimensions about the typical values
+    #   I_bf_median, I_bf_sigma     log-normal distribution of I_bf (kA), for "LV" and "HV" buses
+    #   T_median, T_sigma           log-normal distribution of T (ms)
+    #   multistep_fraction          fraction of buses with a fault decrement profile
+    #   n_steps, decrement          steps in a fault decrement profile, and the ratio of I_bf in each step to the last
+    def __init__(self, class_weights: dict = None, EC_weights: dict = None, voltages: dict = None,
+                 buses_per_design: float = 50, popularity: float = 1.1, size_spread: float = 0.05,
+                 I_bf_median: dict = None, I_bf_sigma: float = 0.8, T_median: float = 150, T_sigma: float = 1.0,
+                 multistep_fraction: float = 0.1, n_steps: int = 3, decrement: float = 0.6):
+        if class_weights is None:
+            class_weights = {
+                "15kV Switchgear": 1, "15kV MCC": 1, "5kV Switchgear": 2, "5kV Switchgear (2)": 2, "5kV MCC": 3,
+                "LV Switchgear": 8, "LV MCC (Shallow)": 5, "LV Panelboard (Shallow)": 15, "LV MCC": 20,
+                "LV Panelboard": 30, "Cable Junction Box (Shallow)": 4, "Cable Junction Box": 8,
+            }
+        if EC_weights is None:
+            EC_weights = {"VCB": 50, "VCBB": 25, "HCB": 15, "VOA": 5, "HOA": 5}
+        unknown = (set(class_weights) - set(EQUIPMENT_CLASSES)) | (set(voltages or ()) - set(EQUIPMENT_CLASSES))
+        if unknown:
+            raise ValueError(f"Unknown equipment class(es) {sorted(unknown)}. Must be one of {EQUIPMENT_CLASSES}.")
+        if set(EC_weights) - set(EC_NAMES):
+            raise ValueError(f"Unknown electrode configuration(s) {sorted(set(EC_weights) - set(EC_NAMES))}.")
+        assert n_steps >= 2
+        assert 0 < decrement <= 1
+
+        self.class_weights = class_weights
+        self.EC_weights = EC_weights
+        self.voltages = {k: (voltages or dict()).get(k, _voltages(k)) for k in EQUIPMENT_CLASSES}
+        self.buses_per_design = buses_per_design
+        self.popularity = popularity
+        self.size_spread = size_spread
+        self.I_bf_median = I_bf_median if I_bf_median is not None else {"LV": 20.0, "HV": 10.0}
+        self.I_bf_sigma = I_bf_sigma
+        self.T_median = T_median
+        self.T_sigma = T_sigma
+        self.multistep_fraction = multistep_fraction
+        self.n_steps = n_steps
+        self.decrement = decrement
+
+
+def _choice(rng: np.random.Generator, weights: dict, n: int) -> np.ndarray:
+    # n random keys of `weights`, with probabilities proportional to the weights.
+    keys = list(weights)
+    p = np.array([weights[k] for k in keys], dtype=float)
+    return np.array(keys)[rng.choice(len(keys), size=n, p=p / p.sum())]
+
+
+class SyntheticSite:
+    def __init__(self, n_buses: int, seed: int = 0, profile: SiteProfile = None):
+        self.n_buses = n_buses
+        self.seed = seed
+        self.profile = profile if profile is not None else SiteProfile()
+        self.designs = self._catalogue()
+
+    def _catalogue(self) -> dict:
+        # The site's enclosure designs, as a dict of columns. Design 0 is the most popular.
+        p = self.profile
+        rng = np.random.default_rng([self.seed, 0])
+        n = max(1, int(np.ceil(self.n_buses / p.buses_per_design)))
+
+        keys = list(p.class_weights)
+        weights = np.array([p.class_weights[k] for k in keys], dtype=float)
+        chosen = rng.choice(len(keys), size=n, p=weights / weights.sum())
+        equipment_class = np.array([EQUIPMENT_CLASSES.index(k) for k in keys])[chosen]
+
+        def typical(key: str) -> np.ndarray:
+            return np.array([table_8_10[k][key] for k in EQUIPMENT_CLASSES])[equipment_class]
+
+        V_oc = np.empty(n)
+        for i, k in enumerate(EQUIPMENT_CLASSES):
+            rows = equipment_class == i
+            V_oc[rows] = rng.choice(p.voltages[k], size=np.count_nonzero(rows))
+
+        designs = {
+            "equipment_class": equipment_class,
+            "V_oc": V_oc,
+            "EC": _choice(rng, p.EC_weights, n).astype("<U4"),
+            "G": typical("G"),
+            "D": typical("D"),
+        }
+        for name, key in (("height", "bh"), ("width", "bw"), ("depth", "bd"),):
+            designs[name] = np.round(typical(key) * rng.lognormal(0, p.size_spread, n), 1)
+        # Every design must be a valid cubicle. Refer Cubicle.check_model_bounds().
+        designs["width"] = np.maximum(designs["width"], 4 * designs["G"])
+
+        # Zipf-like popularity: design i is chosen with probability proportional to 1 / (i + 1) ** popularity.
+        weights = 1 / np.arange(1, n + 1) ** p.popularity
+        self._cdf = np.cumsum(weights) / weights.sum()
+        return designs
+
+    @property
+    def n_blocks(self) -> int:
+        return -(-self.n_buses // BLOCK_SIZE)
+
+    def block(self, i: int) -> (dict, dict):
+        # The buses in block i (buses i * BLOCK_SIZE ... up to (i + 1) * BLOCK_SIZE), and their fault decrement steps.
+        assert 0 <= i < self.n_blocks
+        p = self.profile
+        rng = np.random.default_rng([self.seed, 1, i])
+        start = i * BLOCK_SIZE
+        n = min(BLOCK_SIZE, self.n_buses - start)
+
+        design = np.minimum(np.searchsorted(self._cdf, rng.random(n), side="right"), len(self._cdf) - 1)
+        buses = {"bus": np.arange(start, start + n), "design": design}
+        for name, column in self.designs.items():
+            buses[name] = column[design]
+
+        LV = buses["V_oc"] <= 0.6
+        median = np.where(LV, p.I_bf_median["LV"], p.I_bf_median["HV"])
+        lo = np.where(LV, I_BF_RANGE["LV"][0], I_BF_RANGE["HV"][0])
+        hi = np.where(LV, I_BF_RANGE["LV"][1], I_BF_RANGE["HV"][1])
+        buses["I_bf"] = np.clip(np.round(median * rng.lognormal(0, p.I_bf_sigma, n), 3), lo, hi)
+        buses["T"] = np.round(np.clip(p.T_median * rng.lognormal(0, p.T_sigma, n), 10, 5000), 1)
+
+        multistep = rng.random(n) < p.multistep_fraction
+        buses["n_steps"] = np.where(multistep, p.n_steps, 1)
+
+        # Steps: I_bf decays by `decrement` in each step (but not below the model's range), and the step durations
+        # are random fractions of T.
+        rows = np.flatnonzero(multistep)
+        k = p.n_steps
+        fractions = rng.dirichlet(np.ones(k), size=len(rows))
+        T_steps = fractions * buses["T"][rows, np.newaxis]
+        T_steps[:, -1] = np.maximum(buses["T"][rows] - T_steps[:, :-1].sum(axis=1), 0)
+        I_steps = np.maximum(buses["I_bf"][rows, np.newaxis] * p.decrement ** np.arange(k), lo[rows, np.newaxis])
+        steps = {
+            "bus": np.repeat(buses["bus"][rows], k),
+            "step": np.tile(np.arange(k), len(rows)),
+            "I_bf": I_steps.ravel(),
+            "T": T_steps.ravel(),
+        }
+        return buses, steps
+
+    def blocks(self, start: int = 0, stop: int = None):
+        # Yields (buses, steps) for blocks start ... stop - 1.
+        for i in range(start, self.n_blocks if stop is None else stop):
+            yield self.block(i)
+
+    def write(self, path: str, format: str = "npy") -> (str, str):
+        # Writes the site to two result stores (refer result_store.py), path/buses and path/steps, for use as input to
+        # the bulk calculation code. Returns their paths.
+        paths = os.path.join(path, "buses"), os.path.join(path, "steps")
+        with ResultWriter(paths[0], format, units=UNITS) as bus_writer, \
+                ResultWriter(paths[1], format, units=UNITS) as step_writer:
+            for buses, steps in self.blocks():
+                bus_writer.append(buses)
+                step_writer.append(steps)
+        return paths
@@ -0,0 +1,78 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.adaptive_sweep import adaptive_sweep, sweep_parameter
+
+BASE = dict(V_oc=4.16, EC="VCBB", G=104, D=914.4, height=1143, width=762, depth=508, I_bf=15.0, T=197.0)
+
+
+def features_of(result, output: str, kind: str) -> np.ndarray:
+    f = result.features
+    return f["x"][(f["output"] == output) & (f["kind"] == kind)]
+
+
+def curve(x: np.ndarray) -> np.ndarray:
+    # A smooth curve with a jump at x = 0.3 and a kink at x = 0.7.
+    return np.sin(3 * x) + np.where(x > 0.3, 0.5, 0.0) + 2 * np.maximum(x - 0.7, 0)
+
+
+class AdaptiveSweepTest(unittest.TestCase):
+    def test_known_features(self):
+        # z changes sign at x = 0.55.
+        r = adaptive_sweep(lambda x: {"y": curve(x), "z": x - 0.55}, 0.0, 1.0, x_tol=1e-6, crossings=("z",))
+        f = r.features
+        self.assertEqual(len(f["x"]), 3)
+        self.assertEqual(list(f["kind"]), ["jump", "crossing", "kink"])
+        for x, x_lo, x_hi, expected in zip(f["x"], f["x_lo"], f["x_hi"], (0.3, 0.55, 0.7)):
+            self.assertAlmostEqual(x, expected, 5)
+            self.assertLessEqual(x_hi - x_lo, 4e-6)
+        self.assertAlmostEqual(f["size"][0], 0.5, 4)
+        self.assertAlmostEqual(f["size"][2], 2.0, 3)
+
+        self.assertTrue(np.all(np.diff(r.x) > 0))
+        np.testing.assert_array_equal(r.values["y"], curve(r.x))
+        self.assertLess(r.n_evaluations * 1000, r.uniform_equivalent)
+
+    def test_smooth_not_refined(self):
+        # Strongly curved parts get a few extra points, but the refinement stops well short of x_tol.
+        r = adaptive_sweep(lambda x: {"y": np.exp(x)}, 0.0, 2.0, n_initial=65)
+        self.assertLess(r.n_evaluations, 2 * 65)
+        self.assertEqual(len(r.features["x"]), 0)
+
+        r = adaptive_sweep(lambda x: {"y": 2 * x}, 0.0, 2.0, n_initial=65)
+        self.assertEqual(r.n_evaluations, 65)
+        self.assertEqual(r.n_calls, 1)
+
+    def test_max_evaluations(self):
+        r = adaptive_sweep(lambda x: {"y": np.floor(10 * x)}, 0.0, 1.0, max_evaluations=200)
+        self.assertLessEqual(r.n_evaluations, 200)
+
+    def test_table_6_breakpoints(self):
+        r = sweep_parameter(BASE, "width", 200, 1500, x_tol=1e-3)
+        self.assertEqual(sorted(np.round(features_of(r, "E_full", "kink"), 2)), [508.0, 1244.6])
+        self.assertEqual(list(np.round(features_of(r, "E_full", "jump"), 2)), [660.4])
+        self.assertLess(r.n_evaluations * 1000, r.uniform_equivalent)
+
+    def test_voltage_sweep(self):
+        # LV model joins the HV model at 0.6 kV. I_arc is continuous there, but the reduced E is not: the LV model
+        # uses the full I_arc_600 in Eq 6. The reduced case gives a higher E than the full case above about 1.3 kV.
+        r = sweep_parameter(BASE, "V_oc", 0.208, 15.0, x_tol=1e-4)
+        self.assertAlmostEqual(features_of(r, "I_arc_full", "kink")[0], 0.6, 3)
+        self.assertAlmostEqual(features_of(r, "E_reduced", "jump")[0], 0.6, 3)
+        crossing = features_of(r, "E_margin", "crossing")
+        self.assertEqual(len(crossing), 1)
+        self.assertLess(r.n_evaluations * 50, r.uniform_equivalent)
+
+    def test_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            sweep_parameter(BASE, "EC", 0, 1)
+        with self.assertRaises(ValueError):
+            sweep_parameter(BASE, "V_oc", 0.208, 15.0, crossings=("E_max",))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.cable_profile import cable_profile, fault_currents_along
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.ppe_breakpoints import tabulated_curve
+from arcflash.ieee_1584.short_circuit import Network
+from arcflash.ieee_1584.units import kA, kV, ms, m, mm, ohm, J_per_sq_cm
+
+c = Cubicle(V_oc=0.48 * kV, EC="VCB", G=32 * mm, D=609.6 * mm, height=610 * mm, width=610 * mm, depth=254 * mm)
+R = 0.2 * ohm / (1000 * m)
+X = 0.09 * ohm / (1000 * m)
+curve = tabulated_curve([0.5, 2, 4, 10, 100], [5000, 600, 150, 40, 40])
+
+
+class CableProfileTest(unittest.TestCase):
+    def test_fault_currents_match_network(self):
+        for length in (1 * m, 250 * m, 3000 * m,):
+            n = Network()
+            n.add_bus("A", 0.48 * kV)
+            n.add_bus("B", 0.48 * kV)
+            n.add_source("A", I_sc=20 * kA, X_R=8)
+            n.add_cable("C", "A", "B", R=R * length, X=X * length)
+            expected = n.fault_currents()[1]
+            I_bf = fault_currents_along(0.48 * kV, 20 * kA, 8, R, X, [length.m_as(m)])
+            self.assertAlmostEqual(I_bf[0] / expected, 1.0, 12)
+
+    def test_matches_scalar_calculation(self):
+        profile = cable_profile(c, 20 * kA, 8, R, X, 2000 * m, curve, n_points=301)
+        for i in (0, 57, 150, 300,):
+            E = []
+            for full_or_reduced in ("full", "reduced",):
+                calc = Calculation(c, profile.I_bf[i] * kA, full_or_reduced)
+                calc.calculate_I_arc()
+                calc.calculate_E_AFB(float(curve(calc.I_arc.m_as(kA))) * ms)
+                E.append(calc.E.m_as(J_per_sq_cm))
+            self.assertAlmostEqual(profile.E[i] / max(E), 1.0, 10)
+            self.assertEqual(profile.reduced[i], E[1] > E[0])
+
+    def test_worst_point_inside_cable(self):
+        # With an inverse-time curve, the worst point is neither end of the cable.
+        profile = cable_profile(c, 20 * kA, 8, R, X, 2000 * m, curve)
+        self.assertTrue(0 < profile.worst < len(profile.x) - 1)
+        self.assertEqual(profile.E_max.m_as(J_per_sq_cm), profile.E[profile.worst])
+        self.assertGreater(profile.E[profile.worst], max(profile.E[0], profile.E[-1]))
+
+    def test_fixed_clearing_time(self):
+        profile = cable_profile(c, 20 * kA, 8, R, X, 100 * m, 100 * ms, full_or_reduced="full", n_points=11)
+        np.testing.assert_array_equal(profile.T, 100.0)
+        self.assertFalse(profile.reduced.any())
+
+    def test_out_of_range(self):
+        # Far enough along the cable, I_bf drops below 500 A, and the model no longer applies.
+        profile = cable_profile(c, 20 * kA, 8, R, X, 20000 * m, curve)
+        far = profile.I_bf < 0.5
+        self.assertTrue(far.any())
+        self.assertTrue(np.all(np.isnan(profile.E[far])))
+        self.assertTrue(np.all(profile.invalid[far] != 0))
+        self.assertFalse(np.isnan(profile.E[~far]).any())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.additional_test_cases.test_case_generator import valid_space
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.units import kA, kV, ms, mm, J_per_sq_cm
+
+
+class CompiledCubicleTest(unittest.TestCase):
+    def test_annex_D1(self):
+        cubicle = Cubicle(V_oc=4.16 * kV, EC="VCB", G=104 * mm, D=914.4 * mm, height=1143 * mm, width=762 * mm,
+                          depth=508 * mm)
+        compiled = cubicle.compile()
+
+        I_arc, E, AFB = compiled(15.0 * kA, 197 * ms, "full")
+        self.assertAlmostEqual(I_arc, 12.979 * kA, 3)  # D.17
+        self.assertAlmostEqual(E, 12.152 * J_per_sq_cm, 3)  # D.32
+        self.assertAlmostEqual(AFB, 1606 * mm, 0)  # D.42
+
+        I_arc, E, AFB = compiled(15.0 * kA, 223 * ms, "reduced")
+        self.assertAlmostEqual(I_arc, 12.675 * kA, 3)  # D.51
+        self.assertAlmostEqual(E, 13.343 * J_per_sq_cm, 3)  # D.62
+        self.assertAlmostEqual(AFB, 1704 * mm, 0)  # D.72
+
+    def test_annex_D2(self):
+        cubicle = Cubicle(V_oc=0.48 * kV, EC="VCB", G=32 * mm, D=609.6 * mm, height=610 * mm, width=610 * mm,
+                          depth=254 * mm)
+        compiled = cubicle.compile()
+
+        I_arc, E, AFB = compiled(45.0 * kA, 61.3 * ms, "full")
+        self.assertAlmostEqual(I_arc, 28.793 * kA, 3)  # D.84
+        self.assertAlmostEqual(E, 11.585 * J_per_sq_cm, 3)  # D.91
+        self.assertAlmostEqual(AFB, 1029 * mm, 0)  # D.95
+
+        I_arc, E, AFB = compiled(45.0 * kA, 319 * ms, "reduced")
+        self.assertAlmostEqual(I_arc, 25.244 * kA, 3)  # D.99
+        self.assertAlmostEqual(E, 53.156 * J_per_sq_cm, 3)  # D.103
+        self.assertAlmostEqual(AFB, 2669 * mm, 0)  # D.106
+
+    def test_matches_calculation(self):
+        # For a spread of the "additional test cases" cubicles, evaluate all of that cubicle's I_bf / T combinations in
+        # one call, and compare each against Calculation.
+        I_bf_all = np.array([0.2, 0.5, 1.0, 5.0, 20.0, 65.0, 106.0])
+        T = np.array([10.0, 100.0, 1000.0])
+
+        cols = valid_space.take(np.arange(0, len(valid_space), 4999))
+        for i in range(len(cols["EC"])):
+            c = Cubicle(cols["V_oc"][i] * kV, cols["EC"][i], cols["G"][i] * mm, cols["D"][i] * mm,
+                        cols["height"][i] * mm, cols["width"][i] * mm, cols["depth"][i] * mm)
+            compiled = c.compile()
+
+            if c.vlevel == "LV":
+                I_bf = I_bf_all[I_bf_all >= 0.5]
+            else:
+                I_bf = I_bf_all[I_bf_all <= 65.0]
+            I_bf_grid, T_grid = np.meshgrid(I_bf, T)
+
+            for full_or_reduced in ("full", "reduced",):
+                results = compiled.evaluate(I_bf_grid, T_grid, full_or_reduced)
+                for j, k in np.ndindex(I_bf_grid.shape):
+                    calc = Calculation(c, I_bf_grid[j, k] * kA, full_or_reduced)
+                    calc.calculate_I_arc()
+                    calc.calculate_E_AFB(T_grid[j, k] * ms)
+
+                    self.assertAlmostEqual(results["I_arc"][j, k] / calc.I_arc.m_as(kA), 1.0, 12)
+                    self.assertAlmostEqual(results["E"][j, k] / calc.E.m_as(J_per_sq_cm), 1.0, 12)
+                    self.assertAlmostEqual(results["AFB"][j, k] / calc.AFB.m_as(mm), 1.0, 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
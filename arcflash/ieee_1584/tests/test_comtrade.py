@@ -0,0 +1,138 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.comtrade import ComtradeConfig, write_sample, rms_windows, recorded_E_and_AFB, \
+    I_bf_from_I_arc, _step_energies
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.multistep import MultistepAccumulator, multistep_E_and_AFB
+from arcflash.ieee_1584.units import kA, kV, ms, mm, sec, J_per_sq_cm
+from arcflash.ieee_1584.validation import I_BF_RANGE
+
+HV_cubicle = Cubicle(V_oc=4.16 * kV, EC="VCB", G=104 * mm, D=914.4 * mm, height=1143 * mm, width=762 * mm,
+                     depth=508 * mm)
+LV_cubicle = Cubicle(V_oc=0.48 * kV, EC="VCBB", G=32 * mm, D=609.6 * mm, height=610 * mm, width=610 * mm,
+                     depth=254 * mm)
+
+
+def calculate(c, I_bf, T_arc, full_or_reduced="full"):
+    calc = Calculation(c, I_bf, full_or_reduced)
+    calc.calculate_I_arc()
+    calc.calculate_E_AFB(T_arc)
+    return calc
+
+
+class ComtradeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sample_file(self):
+        path = write_sample(os.path.join(self.tmp.name, "event"), I_fault=10 * kA, fault_start=100 * ms,
+                            fault_duration=200 * ms, total_duration=1 * sec, fmt="BINARY")
+        cfg = ComtradeConfig(path)
+        self.assertEqual([ch.name for ch in cfg.analog], ["IA", "IB", "IC"])
+        self.assertEqual((cfg.frequency, cfg.sample_rate, cfg.n_samples, cfg.format), (50, 4000, 4000, "BINARY"))
+
+        windows = list(rms_windows(cfg, ("IA", "IB", "IC")))
+        self.assertEqual(len(windows), 50)
+        I = np.array([w[2] for w in windows])
+        np.testing.assert_allclose(I[:5], 0.1, rtol=0.02)  # load current
+        np.testing.assert_allclose(I[9:15], 10, rtol=0.02)  # fault current, after the DC offset has decayed
+        self.assertGreater(I[5], I[9])
+        np.testing.assert_allclose(I[15:], 0, atol=0.02)  # cleared
+
+    def test_matches_calculation(self):
+        # A recording of the arcing current for D.1 (15 kA bolted fault current) for 200 ms, with no DC offset, gives
+        # the same result as a calculation for 200 ms.
+        expected = calculate(HV_cubicle, 15 * kA, 200 * ms)
+        results = list()
+        for fmt in ("ASCII", "BINARY",):
+            for chunk_size in (333, 65536):
+                path = write_sample(os.path.join(self.tmp.name, f"event_{fmt}"), I_fault=expected.I_arc,
+                                    fault_start=100 * ms, fault_duration=200 * ms, total_duration=1 * sec, fmt=fmt,
+                                    X_R=0.01)
+                E, AFB, n = recorded_E_and_AFB(HV_cubicle, path, chunk_size=chunk_size)
+                self.assertEqual(n, 10)
+                self.assertAlmostEqual(E.m_as(J_per_sq_cm), expected.E.m_as(J_per_sq_cm), delta=0.002 * expected.E.m)
+                self.assertAlmostEqual(AFB.m_as(mm), expected.AFB.m_as(mm), delta=0.002 * expected.AFB.m)
+                results.append((E, AFB))
+
+        # Independent of file format and chunk size.
+        for r in results[1:]:
+            self.assertEqual(r, results[0])
+
+        # Treating the recorded current as I_bf gives a lower current, so a lower E.
+        E_bolted, _, _ = recorded_E_and_AFB(HV_cubicle, path, measured="bolted")
+        self.assertLess(E_bolted, results[0][0])
+
+    def test_bolted_outside_range(self):
+        # Windows with a recorded current outside the model's range of I_bf are clipped to it, rather than raising.
+        for I_fault, I_clipped in ((0.3 * kA, 0.5 * kA), (150 * kA, 106 * kA),):
+            path = write_sample(os.path.join(self.tmp.name, "event"), I_fault=I_fault, fault_start=100 * ms,
+                                fault_duration=200 * ms, total_duration=400 * ms, I_load=0.01 * kA, X_R=0.01)
+            E, AFB, n = recorded_E_and_AFB(LV_cubicle, path, measured="bolted")
+            self.assertEqual(n, 10)
+            expected = calculate(LV_cubicle, I_clipped, 200 * ms)
+            self.assertAlmostEqual(E.m_as(J_per_sq_cm), expected.E.m_as(J_per_sq_cm), delta=0.01 * expected.E.m)
+
+    def test_step_energies(self):
+        I_bf = np.array([0.6, 5.0, 15.0, 40.0])
+        T = np.array([10.0, 50.0, 200.0, 1000.0])
+        for c in (HV_cubicle, LV_cubicle):
+            for full_or_reduced in ("full", "reduced",):
+                steps = [calculate(c, I * kA, t * ms, full_or_reduced) for I, t in zip(I_bf, T)]
+                r = _step_energies(c, I_bf, T, full_or_reduced)
+                for name in r:
+                    np.testing.assert_allclose(r[name], [getattr(s, name).m_as(J_per_sq_cm) for s in steps],
+                                               rtol=1e-12)
+
+                acc = MultistepAccumulator(c)
+                acc.add_values(**r)
+                E, AFB = multistep_E_and_AFB(c, steps)
+                self.assertEqual(acc.n_steps, 4)
+                self.assertAlmostEqual(acc.E.m_as(J_per_sq_cm), E.m_as(J_per_sq_cm), 9)
+                self.assertAlmostEqual(acc.AFB.m_as(mm), AFB.m_as(mm), 6)
+
+    def test_I_bf_from_I_arc(self):
+        for c in (HV_cubicle,
+                  Cubicle(V_oc=0.48 * kV, EC="VCBB", G=32 * mm, D=609.6 * mm, height=610 * mm, width=610 * mm,
+                          depth=254 * mm)):
+            compiled = c.compile()
+            I_bf = np.geomspace(*I_BF_RANGE[c.vlevel], 50)
+            for full_or_reduced in ("full", "reduced",):
+                I_arc = compiled.evaluate(I_bf, 1.0, full_or_reduced)["I_arc"]
+                np.testing.assert_allclose(I_bf_from_I_arc(c, I_arc, full_or_reduced), I_bf, rtol=1e-9)
+
+        # I_arc is not monotonic in I_bf near the top of the range for this cubicle, so some arcing currents have two
+        # solutions. The higher one is used.
+        c = Cubicle(V_oc=0.208 * kV, EC="HCB", G=6.35 * mm, D=914.4 * mm, height=1143 * mm, width=1143 * mm,
+                    depth=508 * mm)
+        compiled = c.compile()
+        I_bf = np.geomspace(*I_BF_RANGE[c.vlevel], 50)
+        I_arc = compiled.evaluate(I_bf, 1.0, "full")["I_arc"]
+        solution = I_bf_from_I_arc(c, I_arc)
+        np.testing.assert_allclose(compiled.evaluate(solution, 1.0, "full")["I_arc"], I_arc, rtol=1e-9)
+        self.assertTrue(np.all(solution >= I_bf * (1 - 1e-9)))
+        self.assertTrue(np.any(solution > I_bf * 1.1))
+
+    def test_accumulator(self):
+        steps = [calculate(HV_cubicle, I * kA, T * ms) for I, T in ((15, 50), (12, 80), (8, 300))]
+        acc = MultistepAccumulator(HV_cubicle)
+        self.assertEqual(acc.AFB, 0 * mm)
+        for s in steps:
+            acc.add(s)
+        self.assertEqual((acc.E, acc.AFB), multistep_E_and_AFB(HV_cubicle, steps))
+        self.assertEqual(acc.n_steps, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
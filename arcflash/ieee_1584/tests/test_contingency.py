@@ -0,0 +1,103 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.contingency import ContingencyAnalysis, all_switching_states, contingency_study
+from arcflash.ieee_1584.short_circuit import Network
+from arcflash.ieee_1584.units import kV, kA, ohm, MVA
+from arcflash.ieee_1584.validation import Reason
+
+SWITCHABLE = ["Tie", "Feeder A", "Feeder B", "Standby", "Ring"]
+
+
+def example_network() -> Network:
+    # Two LV switchboards, each fed from its own transformer, with a bus tie; a standby generator; and a ring of MCCs.
+    n = Network()
+    n.add_bus("Utility", 11 * kV)
+    n.add_bus("Gen", 0.415 * kV)
+    for name in ("SB-A", "SB-B", "MCC-1", "MCC-2", "MCC-3"):
+        n.add_bus(name, 0.415 * kV)
+    n.add_source("Utility", I_sc=20 * kA, X_R=10)
+    n.add_source("Gen", I_sc=8 * kA, X_R=15)
+    n.add_transformer("Feeder A", "Utility", "SB-A", S_rated=2 * MVA, Z_percent=6, X_R=8)
+    n.add_transformer("Feeder B", "Utility", "SB-B", S_rated=1.5 * MVA, Z_percent=5, X_R=7, closed=False)
+    n.add_cable("Tie", "SB-A", "SB-B", R=0.0005 * ohm, X=0.0004 * ohm)
+    n.add_cable("Standby", "Gen", "SB-B", R=0.002 * ohm, X=0.001 * ohm, closed=False)
+    n.add_cable("C1", "SB-A", "MCC-1", R=0.01 * ohm, X=0.005 * ohm)
+    n.add_cable("C2", "SB-B", "MCC-2", R=0.012 * ohm, X=0.006 * ohm)
+    n.add_cable("C3", "MCC-1", "MCC-3", R=0.008 * ohm, X=0.004 * ohm)
+    n.add_cable("Ring", "MCC-2", "MCC-3", R=0.008 * ohm, X=0.004 * ohm, closed=False)
+    return n
+
+
+class ContingencyTest(unittest.TestCase):
+    def test_matches_refactorisation(self):
+        n = example_network()
+        analysis = ContingencyAnalysis(n, SWITCHABLE)
+        states = all_switching_states(len(SWITCHABLE))
+        self.assertEqual(states.shape, (32, 5))
+
+        results = [analysis.fault_currents(s) for s in states]
+        # Some states isolate buses (or the whole site from the utility), which needs a new base case.
+        self.assertGreater(analysis.n_factorised, 1)
+        self.assertGreater(analysis.n_updated, analysis.n_factorised)
+
+        # The analysis must not change the network.
+        self.assertEqual([n.branches[n._branch_index(b)].closed for b in SWITCHABLE], [True, True, False, False, False])
+
+        reference = example_network()
+        for s, I_bf in zip(states, results):
+            for name, closed in zip(SWITCHABLE, s.tolist()):
+                reference.set_closed(name, closed)
+            np.testing.assert_allclose(I_bf, reference.fault_currents(), rtol=1e-9, atol=1e-12)
+
+    def test_contingency_study(self):
+        n = example_network()
+        analysis = ContingencyAnalysis(n, SWITCHABLE)
+        states = all_switching_states(len(SWITCHABLE))
+        equipment = {
+            "bus": np.array(["SB-B", "MCC-3"]),
+            "EC": np.array(["VCB", "VCBB"]),
+            "G": np.array([32.0, 25.0]),
+            "D": np.array([609.6, 457.2]),
+            "height": np.array([1000.0, 600.0]),
+            "width": np.array([800.0, 500.0]),
+            "depth": np.array([600.0, 300.0]),
+            "T": np.array([100.0, 50.0]),
+        }
+        results = contingency_study(analysis, states, equipment)
+        self.assertEqual(len(results["E_full"]), 64)
+        np.testing.assert_array_equal(results["state"][:4], [0, 0, 1, 1])
+        np.testing.assert_array_equal(results["bus"][:4], ["SB-B", "MCC-3", "SB-B", "MCC-3"])
+
+        # State 0 has every switchable branch open, so SB-B is de-energised.
+        self.assertEqual(results["I_bf"][0], 0)
+        self.assertTrue(np.isnan(results["E_full"][0]))
+
+        energised = results["I_bf"] > 0
+        self.assertTrue(np.all(results["E_full"][energised] > 0))
+        np.testing.assert_array_equal(results["invalid"], 0)
+
+    def test_contingency_study_out_of_range(self):
+        # Two 70 kA switchboards. With the tie closed, the fault current is above the LV limit of 106 kA.
+        n = Network()
+        for name in ("SB-A", "SB-B"):
+            n.add_bus(name, 0.415 * kV)
+            n.add_source(name, I_sc=70 * kA, X_R=10)
+        n.add_cable("Tie", "SB-A", "SB-B", R=0.0001 * ohm, X=0.0001 * ohm)
+        analysis = ContingencyAnalysis(n, ["Tie"])
+        equipment = {"bus": np.array(["SB-A", "SB-B"]), "EC": "VCB", "G": 32.0, "D": 609.6, "height": 1000.0,
+                     "width": 800.0, "depth": 600.0, "T": 100.0}
+        results = contingency_study(analysis, all_switching_states(1), equipment)
+
+        closed = results["state"] == 1
+        self.assertTrue(np.all(results["I_bf"][closed] > 106))
+        np.testing.assert_array_equal(results["invalid"], np.where(closed, Reason.I_BF, 0))
+        np.testing.assert_array_equal(np.isnan(results["E_full"]), closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
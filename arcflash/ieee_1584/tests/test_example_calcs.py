@@ -4,7 +4,7 @@
 
 import unittest
 
-from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.calculation import Calculation, calculate_full_and_reduced
 from arcflash.ieee_1584.cubicle import Cubicle
 from arcflash.ieee_1584.units import ureg, kA, kV, ms, mm, inch, dimensionless, J_per_sq_cm
 
@@ -290,6 +290,33 @@ class TestExampleCalcs(unittest.TestCase):
         # Step 12 / Step 13
         self.assertAlmostEqual(calc_min.AFB, 2669 * mm, 0)  # D.106
 
+    def test_full_and_reduced(self):
+        # calculate_full_and_reduced() gives the same results as two separate calculations, for D.1 (HV) and D.2 (LV).
+        names = ("I_arc", "I_arc_600", "I_arc_2700", "I_arc_14300", "E", "E_600", "E_2700", "E_14300", "AFB",
+                 "AFB_600", "AFB_2700", "AFB_14300", "T_arc",)
+        for V_oc, G, D, height, width, depth, I_bf, T_arc_max, T_arc_min in (
+                (4.16 * kV, 104 * mm, 914.4 * mm, 1143 * mm, 762 * mm, 508 * mm, 15.0 * kA, 197 * ms, 223 * ms),
+                (0.48 * kV, 32 * mm, 609.6 * mm, 610 * mm, 610 * mm, 254 * mm, 45.0 * kA, 61.3 * ms, 319 * ms),):
+            cubicle = Cubicle(V_oc, "VCB", G, D, height, width, depth)
+            full, reduced = calculate_full_and_reduced(cubicle, I_bf, T_arc_max, T_arc_min)
+            for calc, full_or_reduced, T_arc in ((full, "full", T_arc_max), (reduced, "reduced", T_arc_min),):
+                expected = Calculation(cubicle, I_bf, full_or_reduced)
+                expected.calculate_I_arc()
+                expected.calculate_E_AFB(T_arc)
+                self.assertEqual(calc.full_or_reduced, full_or_reduced)
+                for name in names:
+                    self.assertEqual(getattr(calc, name), getattr(expected, name), name)
+
+        # Without clearing times, only the arcing currents are calculated.
+        full, reduced = calculate_full_and_reduced(cubicle, I_bf)
+        self.assertAlmostEqual(reduced.I_arc, 25.244 * kA, 3)  # D.99
+        self.assertIsNone(reduced.E)
+        reduced.calculate_E_AFB(T_arc_min)
+        self.assertAlmostEqual(reduced.E, 53.156 * J_per_sq_cm, 3)  # D.103
+
+        with self.assertRaises(ValueError):
+            calculate_full_and_reduced(cubicle, 200 * kA)
+
 
 if __name__ == '__main__':
     unittest.main()
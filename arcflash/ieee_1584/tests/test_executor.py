@@ -0,0 +1,199 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.cable_profile import cable_profile
+from arcflash.ieee_1584.executor import SerialExecutor, ThreadExecutor, ProcessExecutor, MIN_CHUNK, MAX_CHUNK, \
+    set_default_executor, get_executor
+from arcflash.ieee_1584.interval import Interval, bounds
+from arcflash.ieee_1584.labels import SVG_LABEL, write_label_files
+from arcflash.ieee_1584.ppe_breakpoints import I_bf_breakpoints, clearing_time_breakpoints
+from arcflash.ieee_1584.result_store import ResultReader
+from arcflash.ieee_1584.scheduler import Schedule, INPUTS
+from arcflash.ieee_1584.surrogate import build_surrogate
+from arcflash.ieee_1584.sweep import evaluate_rows, evaluate_scenarios, run_sweep, merge_shards
+from arcflash.ieee_1584.synthetic import SyntheticSite
+from arcflash.ieee_1584.tests.test_cable_profile import c, R, X, curve
+from arcflash.ieee_1584.tests.test_labels import site_results
+from arcflash.ieee_1584.tests.test_ppe_breakpoints import curve as breaker_curve
+from arcflash.ieee_1584.tests.test_sweep import space
+from arcflash.ieee_1584.units import kA, m
+
+_initialized = []
+
+
+def _record_initializer(value: str) -> None:
+    _initialized.append(value)
+
+
+def _initializer_state(_) -> tuple:
+    return os.getpid(), tuple(_initialized), type(get_executor()).__name__, "arcflash.ieee_1584.vectorized" in \
+        sys.modules
+
+
+def _pid(_) -> int:
+    return os.getpid()
+
+
+def _double(chunk: dict) -> dict:
+    return {"x": chunk["x"] * chunk["scale"], "n": np.full(len(chunk["x"]), len(chunk["x"]))}
+
+
+class ExecutorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.buses, _ = SyntheticSite(3000, seed=5).block(0)
+        cls.executors = (SerialExecutor(chunk_size=500), ThreadExecutor(2, chunk_size=500),
+                         ProcessExecutor(2, chunk_size=500),)
+
+    @classmethod
+    def tearDownClass(cls):
+        for executor in cls.executors:
+            executor.shutdown()
+
+    def test_map_chunks(self):
+        columns = {"x": np.arange(1234.0), "scale": 2.0}
+        for executor in self.executors:
+            results = executor.map_chunks(_double, columns)
+            np.testing.assert_array_equal(results["x"], np.arange(1234.0) * 2)
+            # Chunks of 500, 500 and 234 rows, in order.
+            np.testing.assert_array_equal(results["n"], np.repeat([500, 500, 234], [500, 500, 234]))
+
+    def test_chunk_size(self):
+        self.assertEqual(SerialExecutor().chunk_size(10 ** 6), 10 ** 6)
+        self.assertEqual(SerialExecutor(chunk_size=1000).chunk_size(10 ** 6), 1000)
+        self.assertEqual(ThreadExecutor(4).chunk_size(100), MIN_CHUNK)
+        self.assertEqual(ThreadExecutor(4).chunk_size(160_000), 10_000)
+        self.assertEqual(ThreadExecutor(4).chunk_size(10 ** 7), MAX_CHUNK)
+        self.assertEqual(ProcessExecutor(4, chunk_size=123).chunk_size(10 ** 7), 123)
+
+    def test_scalar_columns(self):
+        # More rows than MAX_CHUNK, with the equipment columns given as scalars.
+        n = MAX_CHUNK + 4464
+        columns = {"V_oc": np.full(n, 0.48), "EC": "VCB", "G": 32.0, "D": 609.6, "height": 508.0, "width": 508.0,
+                   "depth": 508.0, "I_bf": np.linspace(1, 100, n), "T": 100.0}
+        expected = evaluate_scenarios(columns)
+        for executor in (SerialExecutor(), ThreadExecutor(2), SerialExecutor(chunk_size=MAX_CHUNK),):
+            with executor:
+                results = evaluate_rows(columns, np.ones(n, dtype=bool), executor=executor)
+            self.assertEqual(results["EC"], "VCB")
+            for name, values in expected.items():
+                np.testing.assert_array_equal(results[name], values)
+
+        results = ThreadExecutor(2, chunk_size=1000).map_chunks(lambda c: {"x": c["x"] * 2, "k": 1.0},
+                                                                {"x": np.arange(2500.0)})
+        np.testing.assert_array_equal(results["k"], np.ones(2500))
+
+    def test_evaluate_rows(self):
+        b = self.buses
+        mask = b["I_bf"] > 5
+        expected = evaluate_rows(b, mask)
+        for executor in self.executors:
+            results = evaluate_rows(b, mask, executor=executor)
+            for name, values in expected.items():
+                np.testing.assert_array_equal(results[name], values)
+
+    def test_schedule(self):
+        b = self.buses
+        schedule = Schedule(b["V_oc"], b["EC"], cubicle=b["design"], block_size=256)
+        expected = schedule.calculate_full_and_reduced(b)
+        for executor in self.executors:
+            results = schedule.calculate_full_and_reduced(b, executor=executor)
+            for case in ("full", "reduced",):
+                for name, values in expected[case].items():
+                    np.testing.assert_array_equal(results[case][name], values)
+
+        # And the same as the unscheduled calculation.
+        schedule = Schedule(b["V_oc"], b["EC"])
+        results = schedule.calculate_full_and_reduced({name: b[name] for name in INPUTS + ("T",)},
+                                                      executor=self.executors[2])
+        for name, values in expected["full"].items():
+            np.testing.assert_array_equal(results["full"][name], values)
+
+    def test_run_sweep(self):
+        merged = []
+        for executor in self.executors:
+            with tempfile.TemporaryDirectory() as out_dir:
+                self.assertEqual(run_sweep(space, out_dir, n_shards=5, executor=executor), list(range(5)))
+                reader = ResultReader(merge_shards(out_dir))
+                merged.append(reader.read())
+        for results in merged[1:]:
+            for name, values in merged[0].items():
+                np.testing.assert_array_equal(results[name], values)
+
+    def test_entry_points(self):
+        # Every entry point that takes an executor gives the same results, however the work is split up.
+        b = {name: self.buses[name][:1200] for name in INPUTS}
+        buses = {name: b[name] for name in ("V_oc", "EC", "G", "D", "height", "width", "depth",)}
+
+        def run(executor) -> dict:
+            out = dict()
+            r = bounds(**dict(b, G=Interval.plus_minus(b["G"], 2), I_bf=Interval.relative(b["I_bf"], 0.1)),
+                       T=100.0, full_or_reduced="full", max_splits=2, executor=executor)
+            out.update({f"bounds_{name}": np.concatenate((v.lo, v.hi)) for name, v in r.items()})
+            profile = cable_profile(c, 20 * kA, 8, R, X, 2000 * m, curve, n_points=1201, executor=executor)
+            out.update({f"profile_{name}": getattr(profile, name) for name in ("I_arc", "T", "E", "AFB", "reduced",)})
+            table = build_surrogate("VCB", "LV", n_random=2000, executor=executor)
+            out.update({f"surrogate_{name}": values for name, values in table.values.items()})
+            out["max_rel_error"] = np.array(list(table.max_rel_error.values()))
+            out.update({f"breakpoints_{name}": values
+                        for name, values in I_bf_breakpoints({k: v[:3] for k, v in buses.items()}, breaker_curve,
+                                                             executor=executor).items()})
+            out["clearing_times"] = clearing_time_breakpoints(buses, b["I_bf"], executor=executor)
+            with tempfile.TemporaryDirectory() as tmp:
+                self.assertEqual(write_label_files(site_results(1200), SVG_LABEL, tmp, executor=executor), 1200)
+                for name in ("MCC-00000.svg", "MCC-00600.svg", "MCC-01199.svg",):
+                    with open(os.path.join(tmp, name), encoding="utf-8") as fh:
+                        out[f"label_{name}"] = np.array([fh.read()])
+                out["n_labels"] = np.array([len(os.listdir(tmp))])
+            return out
+
+        expected = run(SerialExecutor())
+        self.assertGreater(len(expected["breakpoints_I_bf"]), 0)
+        for executor in self.executors:
+            results = run(executor)
+            self.assertEqual(results.keys(), expected.keys())
+            for name, values in expected.items():
+                np.testing.assert_array_equal(results[name], values, err_msg=name)
+
+    def test_pool_reused(self):
+        with ProcessExecutor(2) as executor:
+            first = set(executor.map(_pid, range(20)))
+            pool = executor.pool
+            second = set(executor.map(_pid, range(20)))
+            # The same pool, and so the same (at most 2) worker processes, for both calls.
+            self.assertIs(executor.pool, pool)
+            self.assertLessEqual(len(first | second), 2)
+            self.assertNotIn(os.getpid(), first | second)
+        self.assertIsNone(executor._pool)
+
+    def test_initializer(self):
+        with ProcessExecutor(2, initializer=_record_initializer, initargs=("ready",)) as executor:
+            for pid, initialized, default, preloaded in executor.map(_initializer_state, range(4)):
+                self.assertNotEqual(pid, os.getpid())
+                self.assertEqual(initialized, ("ready",))
+                self.assertEqual(default, "SerialExecutor")
+                self.assertTrue(preloaded)
+
+    def test_default_executor(self):
+        executor = ThreadExecutor(2, chunk_size=700)
+        previous = set_default_executor(executor)
+        try:
+            self.assertIs(get_executor(), executor)
+            self.assertIs(get_executor(self.executors[0]), self.executors[0])
+            results = evaluate_rows({"x": np.arange(2000.0), "scale": 3.0}, np.ones(2000, dtype=bool), _double)
+            np.testing.assert_array_equal(results["n"], np.repeat([700, 700, 600], [700, 700, 600]))
+        finally:
+            self.assertIs(set_default_executor(previous), executor)
+            executor.shutdown()
+        self.assertIsInstance(get_executor(), SerialExecutor)
+
+
+if __name__ == '__main__':
+    unittest.main()
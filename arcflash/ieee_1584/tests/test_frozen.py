@@ -0,0 +1,69 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import dataclasses
+import unittest
+
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.frozen import FrozenCubicle, ArcFlashResult
+from arcflash.ieee_1584.units import kA, kV, ms, mm, J_per_sq_cm
+
+HV = dict(V_oc=4.16 * kV, EC="VCB", G=104 * mm, D=914.4 * mm, height=1143 * mm, width=762 * mm, depth=508 * mm)
+LV = dict(V_oc=0.48 * kV, EC="VCBB", G=32 * mm, D=609.6 * mm, height=610 * mm, width=610 * mm, depth=254 * mm)
+
+
+class FrozenTest(unittest.TestCase):
+    def test_matches_calculation(self):
+        for params, I_bf, T_arc in ((HV, 15 * kA, 197 * ms), (LV, 45 * kA, 61.3 * ms),):
+            c = Cubicle(**params)
+            fc = FrozenCubicle(**params)
+            self.assertEqual(fc.CF, c.CF)
+            self.assertEqual(fc.VarCF, c.VarCF)
+            self.assertEqual(fc.EES, c.EES)
+            self.assertEqual(fc.vlevel, c.vlevel)
+
+            for full_or_reduced in ("full", "reduced",):
+                calc = Calculation(c, I_bf, full_or_reduced)
+                calc.calculate_I_arc()
+                calc.calculate_E_AFB(T_arc)
+                r = ArcFlashResult.calculate(fc, I_bf, T_arc, full_or_reduced)
+                self.assertEqual(r.I_arc, calc.I_arc)
+                self.assertEqual(r.E, calc.E)
+                self.assertEqual(r.AFB, calc.AFB)
+                self.assertEqual(r.I_arc_600, calc.I_arc_600)
+                self.assertEqual(r.E_2700, calc.E_2700)
+
+        # D.1: E = 12.152 J/cm²
+        r = ArcFlashResult.calculate(Cubicle(**HV), 15 * kA, 197 * ms, "full")
+        self.assertAlmostEqual(r.E.m_as(J_per_sq_cm), 12.152, 3)
+        self.assertIsInstance(r.cubicle, FrozenCubicle)
+
+    def test_immutable(self):
+        fc = FrozenCubicle(**HV)
+        r = ArcFlashResult.calculate(fc, 15 * kA, 197 * ms, "full")
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            fc.G = 50 * mm
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            r.E = None
+
+    def test_value_semantics(self):
+        # Equal inputs (in any units) give equal, hashable objects.
+        a = FrozenCubicle(**HV)
+        b = FrozenCubicle(**dict(HV, V_oc=4160 * kV / 1000, G=0.104 * mm * 1000))
+        self.assertEqual(a, b)
+        self.assertEqual(len({a, b, FrozenCubicle(**LV)}), 2)
+
+        r1 = ArcFlashResult.calculate(a, 15 * kA, 197 * ms, "full")
+        r2 = ArcFlashResult.calculate(b, 15 * kA, 197 * ms, "full")
+        self.assertEqual(hash(r1), hash(r2))
+
+    def test_checks_inputs(self):
+        with self.assertRaises(AssertionError):
+            FrozenCubicle(**dict(HV, D=100 * mm))
+        with self.assertRaises(ValueError):
+            ArcFlashResult.calculate(FrozenCubicle(**HV), 100 * kA, 197 * ms, "full")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.interval import Interval, bounds, CF_interval
+
+
+def random_buses(n: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    V_oc = rng.choice([0.208, 0.48, 0.6, 2.4, 4.16, 13.8, 15.0], n)
+    LV = V_oc <= 0.6
+    G = np.where(LV, rng.uniform(10, 70, n), np.where(V_oc < 5, rng.uniform(30, 200, n), rng.uniform(80, 240, n)))
+    return {
+        "V_oc": V_oc,
+        "EC": rng.choice(["VCB", "VCBB", "HCB", "VOA", "HOA"], n),
+        "G": G,
+        "D": rng.uniform(400, 1200, n),
+        "height": rng.uniform(300, 1400, n),
+        "width": np.maximum(rng.uniform(300, 1400, n), 4 * G),
+        "depth": rng.uniform(150, 500, n),
+        "I_bf": np.where(LV, rng.uniform(1, 90, n), rng.uniform(1, 55, n)),
+        "T": rng.uniform(20, 500, n),
+    }
+
+
+def grid(buses: dict, G_tol: float, I_bf_tol: float, full_or_reduced: str, n_G: int = 9, n_I_bf: int = 41) -> dict:
+    # Point results on an (I_bf, G) grid covering the tolerances, for every bus. One row per bus.
+    n = len(buses["V_oc"])
+    G = buses["G"][:, np.newaxis, np.newaxis] + np.linspace(-G_tol, G_tol, n_G)[:, np.newaxis]
+    I_bf = buses["I_bf"][:, np.newaxis, np.newaxis] * (1 + np.linspace(-I_bf_tol, I_bf_tol, n_I_bf))
+    G, I_bf = np.broadcast_arrays(G, I_bf)
+    m = n_G * n_I_bf
+    r = vectorized.calculate(*(np.repeat(buses[k], m) for k in ("V_oc", "EC",)), G.ravel(),
+                             *(np.repeat(buses[k], m) for k in ("D", "height", "width", "depth",)), I_bf.ravel(),
+                             np.repeat(buses["T"], m), full_or_reduced)
+    return {name: r[name].reshape(n, m) for name in ("I_arc", "E", "AFB",)}
+
+
+class IntervalTest(unittest.TestCase):
+    def test_arithmetic(self):
+        a = Interval([1.0, -2.0], [2.0, 3.0])
+        b = Interval([-1.0, 4.0], [3.0, 5.0])
+        for x, lo, hi in (
+                (a + b, [0, 2], [5, 8]),
+                (a - b, [-2, -7], [3, -1]),
+                (a * b, [-2, -10], [6, 15]),
+                (b / Interval([2.0, 2.0], [4.0, 4.0]), [-0.5, 1], [1.5, 2.5]),
+                (2 - a, [0, -1], [1, 4]),
+                (a.square(), [1, 0], [4, 9]),
+        ):
+            np.testing.assert_array_equal(x.lo, lo)
+            np.testing.assert_array_equal(x.hi, hi)
+
+        # Division by an interval containing 0 is unbounded.
+        x = Interval(1.0) / Interval(-1.0, 1.0)
+        self.assertEqual((x.lo, x.hi), (-np.inf, np.inf))
+
+    def test_exact_inputs(self):
+        # With exact inputs, the bounds are the point results (to within the rounding margin).
+        buses = random_buses(200, seed=1)
+        for full_or_reduced in ("full", "reduced",):
+            b = bounds(**buses, full_or_reduced=full_or_reduced)
+            r = vectorized.calculate(**buses, full_or_reduced=full_or_reduced)
+            for name in ("I_arc", "E", "AFB",):
+                np.testing.assert_allclose(b[name].lo, r[name], rtol=1e-8)
+                np.testing.assert_allclose(b[name].hi, r[name], rtol=1e-8)
+                self.assertTrue(b[name].contains(r[name]).all())
+
+    def test_contains_point_results(self):
+        # I_bf +/- 10%, G +/- 2 mm: the bounds contain the results at every point of a grid over the tolerances, and
+        # are close to the highest and lowest of them.
+        buses = random_buses(300, seed=2)
+        for full_or_reduced in ("full", "reduced",):
+            b = bounds(**dict(buses, G=Interval.plus_minus(buses["G"], 2), I_bf=Interval.relative(buses["I_bf"], 0.1)),
+                       full_or_reduced=full_or_reduced)
+            points = grid(buses, 2, 0.1, full_or_reduced)
+            for name, r in points.items():
+                self.assertTrue(b[name].contains(r.T).all(), name)
+                self.assertLess(np.median(b[name].hi / r.max(axis=1)), 1.001)
+                self.assertLess(np.quantile(b[name].hi / r.max(axis=1), 0.95), 1.02)
+                self.assertGreater(np.quantile(b[name].lo / r.min(axis=1), 0.05), 0.98)
+
+    def test_clearing_time_range(self):
+        # E is proportional to T, so its bounds over a range of clearing times are those at the two ends.
+        buses = random_buses(100, seed=3)
+        T_min, T_max = buses["T"], 2 * buses["T"]
+        b = bounds(**dict(buses, T=Interval(T_min, T_max)), full_or_reduced="full")
+        E_min = vectorized.calculate(**dict(buses, T=T_min), full_or_reduced="full")["E"]
+        E_max = vectorized.calculate(**dict(buses, T=T_max), full_or_reduced="full")["E"]
+        np.testing.assert_allclose(b["E"].lo, E_min, rtol=1e-8)
+        np.testing.assert_allclose(b["E"].hi, E_max, rtol=1e-8)
+
+    def test_CF_interval(self):
+        # The CF bounds contain CF for enclosure dimensions across the intervals - including dimensions either side of
+        # the Table 6 breakpoints, and boxes that can be either "Typical" or "Shallow".
+        rng = np.random.default_rng(4)
+        n = 500
+        V_oc = rng.choice([0.208, 0.48, 4.16, 13.8], n)
+        EC = rng.choice(["VCB", "VCBB", "HCB", "VOA"], n)
+        dims = [rng.choice([400.0, 500.0, 508.0, 600.0, 660.4, 900.0, 1244.6, 1400.0], n) for _ in range(2)]
+        depth = rng.choice([150.0, 200.0, 203.2, 300.0], n)
+        height, width = (Interval(d - 20, d + 20) for d in dims)
+        depth = Interval(depth - 10, depth + 10)
+        b = CF_interval(V_oc, EC, height, width, depth)
+
+        t = np.linspace(0, 1, 11)
+        for th in t:
+            for tw in t:
+                for td in (0, 0.5, 1,):
+                    h = height.lo + th * (height.hi - height.lo)
+                    w = width.lo + tw * (width.hi - width.lo)
+                    d = depth.lo + td * (depth.hi - depth.lo)
+                    CF = vectorized.enclosure_factors(V_oc, EC, h, w, d)["CF"]
+                    self.assertTrue(((b.lo - 1e-12 <= CF) & (CF <= b.hi + 1e-12)).all())
+
+    def test_scalar_and_array_inputs(self):
+        # Scalars and arrays can be mixed.
+        b = bounds(0.48, "VCB", Interval(30.0, 34.0), 609.6, 610, 610, 254, Interval([10.0, 20.0], [11.0, 22.0]),
+                   Interval(100.0, 200.0), "full")
+        self.assertEqual(b["E"].lo.shape, (2,))
+        self.assertTrue((b["E"].lo < b["E"].hi).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.labels import LabelTemplate, TEXT_LABEL, HTML_LABEL, HTML_HEADER, HTML_FOOTER, SVG_LABEL, \
+    ppe_category, write_labels, write_label_files
+
+
+def site_results(n: int) -> dict:
+    E = np.linspace(0.5, 60.0, n)
+    return {
+        "bus": np.array([f"MCC-{i:05d}" for i in range(n)]),
+        "V_oc": np.full(n, 0.415),
+        "E": E,
+        "AFB": np.linspace(300.0, 5000.0, n),
+        "D": np.full(n, 457.2),
+        "PPE": ppe_category(E),
+        "D_cat_1": np.full(n, 1000.0),
+        "D_cat_2": np.full(n, 800.0),
+        "D_cat_3": np.full(n, 500.0),
+        "D_cat_4": np.full(n, 400.0),
+    }
+
+
+class LabelTest(unittest.TestCase):
+    def test_template_matches_str_format(self):
+        template = "{bus}: {E:.1f} cal/cm², AFB {AFB:.0f} mm ({bus})"
+        row = {"bus": "SWBD-1", "E": 12.345, "AFB": 1234.5}
+        self.assertEqual(LabelTemplate(template).render(row), template.format(**row))
+        self.assertEqual(LabelTemplate(template).fields, ("bus", "E", "AFB",))
+
+        with self.assertRaises(ValueError):
+            LabelTemplate("{row[0]}")
+
+    def test_escaping(self):
+        row = {"bus": "<Tie & Bus>", "E": 1.0}
+        self.assertEqual(LabelTemplate("{bus}", escape=True).render(row), "&lt;Tie &amp; Bus&gt;")
+        self.assertEqual(LabelTemplate("{bus}").render(row), "<Tie & Bus>")
+
+    def test_ppe_category(self):
+        self.assertEqual(ppe_category([1.0, 4.0, 4.1, 8.0, 25.0, 40.0, 40.1]).tolist(),
+                         ["1", "1", "2", "2", "3", "4", "DANGER"])
+        # Rows that were not evaluated (NaN E) are not given a category.
+        self.assertEqual(ppe_category([np.nan, 1.0, np.inf]).tolist(), ["N/A", "1", "N/A"])
+
+    def test_no_fields(self):
+        # A template with no fields still writes one label per row.
+        results = site_results(3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "labels.txt")
+            self.assertEqual(write_labels(results, LabelTemplate("DANGER\n"), path), 3)
+            with open(path, encoding="utf-8") as fh:
+                self.assertEqual(fh.read(), "DANGER\n" * 3)
+            out = os.path.join(tmp, "svg")
+            self.assertEqual(write_label_files(results, LabelTemplate("<svg/>"), out), 3)
+            self.assertEqual(len(os.listdir(out)), 3)
+
+    def test_write_labels(self):
+        results = site_results(2000)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "labels.txt")
+            self.assertEqual(write_labels(results, TEXT_LABEL, path), 2000)
+            with open(path, encoding="utf-8") as fh:
+                text = fh.read()
+            self.assertEqual(text.count("ARC FLASH HAZARD"), 2000)
+            self.assertIn("Equipment:          MCC-01999\n", text)
+            self.assertIn("Incident energy:    60.0 cal/cm² at 457 mm\n", text)
+
+            path = os.path.join(tmp, "labels.html")
+            write_labels(results, HTML_LABEL, path, header=HTML_HEADER, footer=HTML_FOOTER)
+            with open(path, encoding="utf-8") as fh:
+                self.assertEqual(fh.read().count("<tr><td>"), 2000)
+
+            self.assertEqual(write_label_files(results, SVG_LABEL, os.path.join(tmp, "svg")), 2000)
+            with open(os.path.join(tmp, "svg", "MCC-00000.svg"), encoding="utf-8") as fh:
+                svg = fh.read()
+            self.assertIn("PPE category: 1", svg)
+            self.assertIn("Cat 4: 400 mm", svg)
+
+    def test_label_filenames(self):
+        results = site_results(3)
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "svg")
+            results["bus"] = np.array(["../../MCC 1", "C:\\MCC/2", "MCC:3"])
+            self.assertEqual(write_label_files(results, SVG_LABEL, out), 3)
+            self.assertEqual(sorted(os.listdir(tmp)), ["svg"])
+            self.assertEqual(sorted(os.listdir(out)), [".._.._MCC 1.svg", "C__MCC_2.svg", "MCC_3.svg"])
+
+            for bus in (["MCC-1", "MCC-2", "mcc-1"], ["MCC-1", "MCC/2", "MCC:2"], ["MCC-1", "..", "MCC-3"],):
+                results["bus"] = np.array(bus)
+                with self.assertRaises(ValueError):
+                    write_label_files(results, SVG_LABEL, os.path.join(tmp, "bad"), filename="{bus}")
+            self.assertFalse(os.path.exists(os.path.join(tmp, "bad")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.lazy import LazyCalculation
+from arcflash.ieee_1584.multistep import multistep_E_and_AFB
+from arcflash.ieee_1584.units import kA, kV, ms, mm
+
+HV = Cubicle(4.16 * kV, "VCB", 104 * mm, 914.4 * mm, 1143 * mm, 762 * mm, 508 * mm)
+HV_2 = Cubicle(14.3 * kV, "HCB", 152 * mm, 914.4 * mm, 1143 * mm, 762 * mm, 508 * mm)
+LV = Cubicle(0.48 * kV, "VCBB", 32 * mm, 609.6 * mm, 610 * mm, 610 * mm, 254 * mm)
+
+NAMES = ("I_arc", "I_arc_600", "I_arc_2700", "I_arc_14300", "E", "E_600", "E_2700", "E_14300", "AFB", "AFB_600",
+         "AFB_2700", "AFB_14300",)
+
+
+class LazyCalculationTest(unittest.TestCase):
+    def test_matches_calculation(self):
+        for c, I_bf, T_arc in ((HV, 15 * kA, 197 * ms), (HV_2, 30 * kA, 500 * ms), (LV, 45 * kA, 61.3 * ms),):
+            for full_or_reduced in ("full", "reduced",):
+                calc = Calculation(c, I_bf, full_or_reduced)
+                calc.calculate_I_arc()
+                calc.calculate_E_AFB(T_arc)
+                lazy = LazyCalculation(c, I_bf, full_or_reduced, T_arc)
+                for name in NAMES + ("T_arc",):
+                    with self.subTest(V_oc=c.V_oc, full_or_reduced=full_or_reduced, name=name):
+                        self.assertEqual(getattr(lazy, name), getattr(calc, name))
+                self.assertEqual(lazy.pretty_print(), calc.pretty_print())
+
+    def test_only_dependencies_calculated(self):
+        lazy = LazyCalculation(HV, 15 * kA, "full", 197 * ms)
+        self.assertEqual(lazy.calculated, ())
+        lazy.E
+        self.assertEqual(set(lazy.calculated), {"I_arc_600", "I_arc_2700", "I_arc_14300", "E_600", "E_2700",
+                                                "E_14300", "E"})
+
+        lazy = LazyCalculation(HV, 15 * kA, "full")
+        lazy.I_arc
+        self.assertEqual(set(lazy.calculated), {"I_arc_600", "I_arc_2700", "I_arc_14300", "I_arc"})
+
+        lazy = LazyCalculation(LV, 45 * kA, "reduced", 61.3 * ms)
+        lazy.E
+        self.assertEqual(set(lazy.calculated), {"I_arc_600", "I_arc", "E"})
+
+    def test_T_arc(self):
+        lazy = LazyCalculation(HV, 15 * kA, "full")
+        self.assertIsNone(lazy.T_arc)
+        with self.assertRaises(ValueError):
+            lazy.E
+
+        # Setting T_arc after I_arc is known, e.g. from a time-current curve.
+        I_arc = lazy.I_arc
+        lazy.T_arc = 100 * ms
+        E_100, AFB_100 = lazy.E, lazy.AFB
+        lazy.T_arc = 200 * ms
+        self.assertEqual(set(lazy.calculated), {"I_arc_600", "I_arc_2700", "I_arc_14300", "I_arc"})
+        self.assertIs(lazy.I_arc, I_arc)
+        self.assertAlmostEqual(lazy.E.m, 2 * E_100.m, 9)
+        self.assertGreater(lazy.AFB, AFB_100)
+
+    def test_as_calculation(self):
+        # Usable in place of a Calculation.
+        steps = []
+        lazy_steps = []
+        for I_bf, T_arc in ((20 * kA, 50 * ms), (10 * kA, 150 * ms),):
+            calc = Calculation(HV, I_bf, "full")
+            calc.calculate_I_arc()
+            calc.calculate_E_AFB(T_arc)
+            steps.append(calc)
+            lazy = LazyCalculation(HV, I_bf, "full")
+            lazy.calculate_I_arc()
+            lazy.calculate_E_AFB(T_arc)
+            lazy_steps.append(lazy)
+        self.assertEqual(multistep_E_and_AFB(HV, lazy_steps), multistep_E_and_AFB(HV, steps))
+
+    def test_input_checks(self):
+        with self.assertRaises(ValueError):
+            LazyCalculation(LV, 200 * kA, "full")
+        LazyCalculation(LV, 200 * kA, "full", check=False)
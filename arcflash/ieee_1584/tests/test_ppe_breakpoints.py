@@ -0,0 +1,93 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.labels import PPE_CATEGORY_RATINGS
+from arcflash.ieee_1584.ppe_breakpoints import I_bf_breakpoints, clearing_time_breakpoints, tabulated_curve
+from arcflash.ieee_1584.units import kA, kV, ms, mm, cal_per_sq_cm
+
+HV_cubicle = Cubicle(V_oc=4.16 * kV, EC="VCB", G=104 * mm, D=914.4 * mm, height=1143 * mm, width=762 * mm,
+                     depth=508 * mm)
+LV_cubicle = Cubicle(V_oc=0.48 * kV, EC="HCB", G=25 * mm, D=457.2 * mm, height=508 * mm, width=508 * mm,
+                     depth=508 * mm)
+
+# An inverse-time curve with an instantaneous element: E rises and falls through the thresholds as I_bf increases.
+curve = tabulated_curve([0.1, 1, 4, 8, 8.01, 200], [20000, 2000, 800, 500, 50, 50])
+
+
+def E(c, I_bf, T_arc, full_or_reduced):
+    calc = Calculation(c, I_bf * kA, full_or_reduced)
+    calc.calculate_I_arc()
+    calc.calculate_E_AFB(T_arc * ms)
+    return calc
+
+
+def label_E(c, I_bf):
+    # The higher E of the full and reduced cases, with the clearing time from the curve.
+    values = []
+    for full_or_reduced in ("full", "reduced",):
+        calc = E(c, I_bf, 1, full_or_reduced)
+        T = curve(calc.I_arc.m_as(kA))
+        values.append(calc.E.m_as(cal_per_sq_cm) * T)
+    return max(values)
+
+
+class PPEBreakpointsTest(unittest.TestCase):
+    def test_crossings_match_scalar_calculation(self):
+        cubicles = [HV_cubicle, LV_cubicle]
+        crossings = I_bf_breakpoints(cubicles, curve)
+        self.assertGreater(len(crossings["bus"]), 0)
+
+        for bus in (0, 1,):
+            c = cubicles[bus]
+            rows = crossings["bus"] == bus
+            # E rises and then drops at the instantaneous pickup, so both directions appear.
+            self.assertEqual(set(crossings["direction"][rows]), {-1, 1})
+            for rating, I_bf, direction in zip(crossings["rating"][rows], crossings["I_bf"][rows],
+                                               crossings["direction"][rows]):
+                below = label_E(c, I_bf * (1 - 1e-6))
+                above = label_E(c, I_bf * (1 + 1e-6))
+                if direction > 0:
+                    self.assertLessEqual(below, rating)
+                    self.assertGreater(above, rating)
+                else:
+                    self.assertGreater(below, rating)
+                    self.assertLessEqual(above, rating)
+
+    def test_no_missed_crossings(self):
+        # Compare against a brute-force sweep.
+        crossings = I_bf_breakpoints([LV_cubicle], curve)
+        I_bf = np.geomspace(0.5, 106, 3000)
+        above = np.array([label_E(LV_cubicle, i) for i in I_bf])[:, np.newaxis] > np.array(PPE_CATEGORY_RATINGS)
+        expected = np.count_nonzero(above[1:] != above[:-1])
+        self.assertEqual(len(crossings["bus"]), expected)
+
+    def test_columns(self):
+        columns = {"V_oc": [4.16], "EC": ["VCB"], "G": [104], "D": [914.4], "height": [1143], "width": [762],
+                   "depth": [508]}
+        a = I_bf_breakpoints(columns, curve, full_or_reduced="full")
+        b = I_bf_breakpoints([HV_cubicle], curve, full_or_reduced="full")
+        np.testing.assert_array_equal(a["I_bf"], b["I_bf"])
+
+    def test_clearing_time(self):
+        T = clearing_time_breakpoints([HV_cubicle, LV_cubicle], [15, 30])
+        self.assertEqual(T.shape, (2, len(PPE_CATEGORY_RATINGS)))
+        for bus, (c, I_bf) in enumerate(((HV_cubicle, 15), (LV_cubicle, 30),)):
+            for j, rating in enumerate(PPE_CATEGORY_RATINGS):
+                calc = E(c, I_bf, T[bus, j], "full")
+                self.assertAlmostEqual(calc.E.m_as(cal_per_sq_cm), rating, places=6)
+
+        # 80 kA is within the LV range, but not the HV range.
+        clearing_time_breakpoints([LV_cubicle], [80])
+        for I_bf in ([80, 30], [15, 0.1], [15, np.nan],):
+            with self.assertRaises(ValueError):
+                clearing_time_breakpoints([HV_cubicle, LV_cubicle], I_bf)
+
+
+if __name__ == "__main__":
+    unittest.main()
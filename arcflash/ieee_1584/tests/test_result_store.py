@@ -0,0 +1,118 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.result_store import ResultWriter, ResultReader
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class ResultStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "results")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def chunks(self):
+        for n in range(3):
+            I_bf = np.linspace(1.0, 10.0, 1000) + n
+            yield {
+                "EC": np.full(1000, ("VCB", "VCBB", "HCB")[n], dtype="<U4"),
+                "I_bf": I_bf,
+                "E": I_bf * 2.5,
+                "valid": I_bf > 5.0,
+            }
+
+    def test_round_trip_npy(self):
+        chunks = list(self.chunks())
+        with ResultWriter(self.path, units={"I_bf": "kA"}) as w:
+            for chunk in chunks:
+                w.append(chunk)
+
+        r = ResultReader(self.path)
+        self.assertEqual(len(r), 3000)
+        self.assertEqual(r.units, {"I_bf": "kA"})
+        for name in chunks[0]:
+            expected = np.concatenate([c[name] for c in chunks])
+            np.testing.assert_array_equal(r[name], expected)
+
+        # Columns are memory-mapped, not loaded.
+        self.assertIsInstance(r["E"].base, np.memmap)
+
+        # Each column is also a standard .npy file.
+        np.testing.assert_array_equal(np.load(os.path.join(self.path, "E.npy")), r["E"])
+
+    def test_projection(self):
+        with ResultWriter(self.path) as w:
+            for chunk in self.chunks():
+                w.append(chunk)
+
+        cols = ResultReader(self.path).read(columns=("I_bf",))
+        self.assertEqual(list(cols), ["I_bf"])
+
+    def test_reopen_and_append(self):
+        chunks = list(self.chunks())
+        with ResultWriter(self.path) as w:
+            w.append(chunks[0])
+
+        with self.assertRaises(FileExistsError):
+            ResultWriter(self.path)
+
+        with ResultWriter(self.path, append=True) as w:
+            w.append(chunks[1])
+            w.append(chunks[2])
+
+        r = ResultReader(self.path)
+        self.assertEqual(len(r), 3000)
+        np.testing.assert_array_equal(r["I_bf"], np.concatenate([c["I_bf"] for c in chunks]))
+
+    def test_torn_write_is_discarded(self):
+        chunks = list(self.chunks())
+        with ResultWriter(self.path) as w:
+            w.append(chunks[0])
+
+        # Simulate a crash part way through writing a second chunk: data on disk, but no manifest update.
+        with open(os.path.join(self.path, "E.npy"), mode="ab") as fh:
+            fh.write(b"\x00" * 100)
+
+        self.assertEqual(len(ResultReader(self.path)["E"]), 1000)
+
+        with ResultWriter(self.path, append=True) as w:
+            w.append(chunks[1])
+        np.testing.assert_array_equal(ResultReader(self.path)["E"], np.concatenate([chunks[0]["E"], chunks[1]["E"]]))
+
+    def test_bad_chunks(self):
+        with ResultWriter(self.path) as w:
+            with self.assertRaises(ValueError):
+                w.append({"a": np.zeros(3), "b": np.zeros(4)})
+            w.append({"a": np.zeros(3), "EC": np.array(["VCB"] * 3)})
+            with self.assertRaises(ValueError):
+                w.append({"a": np.zeros(3)})
+            with self.assertRaises(ValueError):
+                w.append({"a": np.zeros(3), "EC": np.array(["VCBB"] * 3)})
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_round_trip_parquet(self):
+        chunks = list(self.chunks())
+        with ResultWriter(self.path, format="parquet") as w:
+            for chunk in chunks:
+                w.append(chunk)
+
+        r = ResultReader(self.path)
+        self.assertEqual(len(r), 3000)
+        cols = r.read(columns=("I_bf", "E"))
+        np.testing.assert_array_equal(cols["E"], np.concatenate([c["E"] for c in chunks]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import itertools
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.scenario_space import ScenarioSpace
+from arcflash.ieee_1584.units import ureg, kA, kV, mm
+
+EC = ("VCB", "VCBB", "HCB",)
+V_oc = (0.208 * kV, 400 * ureg.volt, 0.6 * kV,)
+I_bf = (0.5 * kA, 20 * kA,)
+G = (6.35 * mm, 25 * mm, 0.0762 * ureg.metre,)
+width = (20 * mm, 100 * mm, 600 * mm,)
+
+
+class ScenarioSpaceTest(unittest.TestCase):
+    def setUp(self):
+        self.space = ScenarioSpace(EC=EC, V_oc=V_oc, I_bf=I_bf, G=G, width=width)
+        self.expected = [
+            (ec, v.m_as(kV), i.m_as(kA), g.m_as(mm), w.m_as(mm))
+            for ec, v, i, g, w in itertools.product(EC, V_oc, I_bf, G, width)
+        ]
+
+    def test_matches_itertools_product(self):
+        self.assertEqual(len(self.space), len(self.expected))
+        self.assertEqual(list(self.space), self.expected)
+        for i in (0, 1, 17, len(self.expected) - 1, -1, -5):
+            self.assertEqual(self.space[i], self.expected[i])
+
+        with self.assertRaises(IndexError):
+            _ = self.space[len(self.expected)]
+
+    def test_slicing(self):
+        cols = self.space[10:100:7]
+        expected = self.expected[10:100:7]
+        self.assertEqual(cols["EC"].tolist(), [e[0] for e in expected])
+        np.testing.assert_array_equal(cols["G"], [e[3] for e in expected])
+        self.assertEqual(cols["I_bf"].dtype, np.float64)
+
+    def test_concatenation(self):
+        both = self.space + self.space
+        self.assertEqual(len(both), 2 * len(self.expected))
+        self.assertEqual(both[len(self.expected) + 3], self.expected[3])
+        cols = both.take([0, len(self.expected)])
+        self.assertEqual(cols["EC"].tolist(), ["VCB", "VCB"])
+
+    def test_sample(self):
+        sample = self.space.sample(20, seed=1)
+        self.assertEqual(len(sample["EC"]), 20)
+        rows = set(zip(*(sample[name].tolist() for name in self.space.names)))
+        self.assertEqual(len(rows), 20)
+        self.assertTrue(rows <= set(self.expected))
+
+    def test_filter(self):
+        valid = self.space.filter(("width", "G",), lambda width, G: width >= 4 * G)
+        expected = [e for e in self.expected if e[4] >= 4 * e[3]]
+
+        self.assertEqual(len(valid), len(expected))
+        self.assertEqual(sorted(valid), sorted(expected))
+        self.assertEqual(sorted(zip(*(valid[:][n].tolist() for n in valid.names))), sorted(expected))
+
+    def test_chunks(self):
+        chunks = list(self.space.chunks(size=50))
+        self.assertEqual(sum(len(c["EC"]) for c in chunks), len(self.expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
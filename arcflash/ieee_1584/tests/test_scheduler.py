@@ -0,0 +1,76 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.scheduler import Schedule, INPUTS
+from arcflash.ieee_1584.synthetic import SyntheticSite
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.buses, _ = SyntheticSite(5000, seed=3).block(0)
+
+    def test_matches_vectorized(self):
+        b = self.buses
+        T_reduced = b["T"] * 1.2
+        expected = vectorized.calculate_full_and_reduced(*(b[name] for name in INPUTS), b["T"], T_reduced)
+        for cubicle in (None, b["design"],):
+            for block_size in (64, 100_000,):
+                schedule = Schedule(b["V_oc"], b["EC"], cubicle=cubicle, block_size=block_size)
+                results = schedule.calculate_full_and_reduced(b, T_reduced=T_reduced)
+                for case in ("full", "reduced",):
+                    for name, values in expected[case].items():
+                        np.testing.assert_array_equal(results[case][name], values)
+
+    def test_negative_cubicle_ids(self):
+        # Cubicle ids shifted to be negative (and so the key's range starts below zero) give the same results as the
+        # unscheduled calculation.
+        b = self.buses
+        expected = vectorized.calculate_full_and_reduced(*(b[name] for name in INPUTS), b["T"])
+        cubicle = b["design"] - b["design"].max() - 1000
+        schedule = Schedule(b["V_oc"], b["EC"], cubicle=cubicle, block_size=64)
+        results = schedule.calculate_full_and_reduced(b)
+        for case in ("full", "reduced",):
+            for name, values in expected[case].items():
+                np.testing.assert_array_equal(results[case][name], values)
+
+    def test_blocks(self):
+        b = self.buses
+        schedule = Schedule(b["V_oc"], b["EC"], block_size=256)
+        seen = np.zeros(len(b["V_oc"]), dtype=int)
+        for block, (EC, vlevel) in zip(schedule.blocks, schedule.block_groups):
+            rows = schedule.order[block]
+            seen[rows] += 1
+            self.assertLessEqual(len(rows), 256)
+            self.assertTrue(np.all(b["EC"][rows] == EC))
+            self.assertTrue(np.all((b["V_oc"][rows] <= 0.6) == (vlevel == "LV")))
+        self.assertTrue(np.all(seen == 1))
+        self.assertEqual(len(set(schedule.block_groups)), len(set(zip(b["EC"], b["V_oc"] <= 0.6))))
+
+    def test_run_restores_order(self):
+        b = self.buses
+        schedule = Schedule(b["V_oc"], b["EC"], cubicle=b["design"], block_size=500)
+
+        def evaluate(columns):
+            # Every block must be homogeneous.
+            self.assertEqual(len(set(columns["EC"])), 1)
+            return {"bus": columns["bus"], "V_oc": columns["V_oc"]}
+
+        r = schedule.run(evaluate, {"bus": b["bus"], "EC": b["EC"], "V_oc": b["V_oc"]})
+        np.testing.assert_array_equal(r["bus"], b["bus"])
+        np.testing.assert_array_equal(r["V_oc"], b["V_oc"])
+
+    def test_empty(self):
+        schedule = Schedule(np.array([]), np.array([], dtype=str))
+        self.assertEqual(schedule.blocks, [])
+        columns = {name: np.array([]) for name in INPUTS + ("T",)}
+        columns["EC"] = np.array([], dtype=str)
+        self.assertEqual(len(schedule.calculate_full_and_reduced(columns)["full"]["E"]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import pickle
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.serialization import encode_cubicles, decode_cubicles, encode_calculations, \
+    decode_calculations, dumps, loads, VERSION
+from arcflash.ieee_1584.units import kA, kV, ms, mm, inch
+
+cubicles = [
+    Cubicle(V_oc=4.16 * kV, EC="VCB", G=104 * mm, D=914.4 * mm, height=1143 * mm, width=762 * mm, depth=508 * mm),
+    Cubicle(V_oc=0.48 * kV, EC="VCB", G=32 * mm, D=609.6 * mm, height=610 * mm, width=610 * mm, depth=254 * mm),
+    Cubicle(V_oc=0.48 * kV, EC="HCB", G=25 * mm, D=457.2 * mm, height=400 * mm, width=400 * mm, depth=200 * mm),
+    Cubicle(V_oc=13.8 * kV, EC="VOA", G=152 * mm, D=914.4 * mm, height=1143 * mm, width=762 * mm, depth=508 * mm),
+    Cubicle(V_oc=0.208 * kV, EC="VCBB", G=1 * inch, D=18 * inch, height=20 * inch, width=20 * inch, depth=20 * inch),
+]
+
+
+def assert_same(test, a, b, names):
+    for name in names:
+        x, y = getattr(a, name), getattr(b, name)
+        if x is None or isinstance(x, str):
+            test.assertEqual(x, y, name)
+        else:
+            # Exactly the same magnitude, in the units of the decoded value. (Values are decoded in fixed units, so
+            # the inch dimensions of the last cubicle come back in mm.)
+            test.assertEqual(y.m, x.m_as(y.units), name)
+
+
+CUBICLE_ATTRIBUTES = ("V_oc", "EC", "G", "D", "height", "width", "depth", "vlevel", "enclosure_type", "VarCF", "CF",
+                      "EES", "height_1", "width_1",)
+CALCULATION_ATTRIBUTES = ("I_bf", "full_or_reduced", "T_arc", "I_arc", "I_arc_600", "I_arc_2700", "I_arc_14300", "E",
+                          "E_600", "E_2700", "E_14300", "AFB", "AFB_600", "AFB_2700", "AFB_14300",)
+
+
+class SerializationTest(unittest.TestCase):
+    def test_cubicles(self):
+        decoded = decode_cubicles(loads(dumps(encode_cubicles(cubicles))))
+        for a, b in zip(cubicles, decoded):
+            assert_same(self, a, b, CUBICLE_ATTRIBUTES)
+
+    def test_calculations(self):
+        calcs = []
+        for c in cubicles:
+            for full_or_reduced in ("full", "reduced",):
+                calc = Calculation(c, 10 * kA, full_or_reduced)
+                calcs.append(calc)
+                calc = Calculation(c, 10 * kA, full_or_reduced)
+                calc.calculate_I_arc()
+                calc.calculate_E_AFB(123.4 * ms)
+                calcs.append(calc)
+
+        decoded = decode_calculations(loads(dumps(encode_calculations(calcs))))
+        for a, b in zip(calcs, decoded):
+            assert_same(self, a, b, CALCULATION_ATTRIBUTES)
+            assert_same(self, a.c, b.c, CUBICLE_ATTRIBUTES)
+        # Calculations of the same Cubicle share it.
+        self.assertIs(decoded[0].c, decoded[3].c)
+
+        # A decoded Calculation can carry on calculating.
+        b = decoded[0]
+        b.calculate_I_arc()
+        b.calculate_E_AFB(123.4 * ms)
+        self.assertEqual(b.E, decoded[1].E)
+
+    def test_not_shared(self):
+        # Changing a decoded value in place doesn't change any other object's value.
+        decoded = decode_cubicles(encode_cubicles([cubicles[0], cubicles[0]]))
+        decoded[0].D.ito(inch)
+        self.assertEqual(decoded[1].D.m_as(mm), 914.4)
+        self.assertEqual(decoded[1].D.units, mm)
+
+    def test_version(self):
+        data = bytearray(dumps(encode_cubicles(cubicles)))
+        data[5] = VERSION + 1
+        with self.assertRaises(ValueError):
+            loads(bytes(data))
+        with self.assertRaises(ValueError):
+            decode_calculations(encode_cubicles(cubicles))
+
+    def test_size(self):
+        records = encode_cubicles(cubicles)
+        self.assertLess(len(dumps(records)), len(pickle.dumps(cubicles)) / 4)
+        np.testing.assert_array_equal(pickle.loads(pickle.dumps(records)), records)
+
+
+if __name__ == "__main__":
+    unittest.main()
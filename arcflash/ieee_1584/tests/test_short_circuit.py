@@ -0,0 +1,129 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+from math import sqrt
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.short_circuit import Network, arc_flash_study, _have_scipy, _impedance
+from arcflash.ieee_1584.units import kV, kA, ohm, MVA, m, km
+from arcflash.ieee_1584.validation import Reason
+
+
+def example_network() -> Network:
+    n = Network()
+    n.add_bus("MV", 11 * kV)
+    n.add_bus("LV", 0.415 * kV)
+    n.add_bus("MCC", 0.415 * kV)
+    n.add_bus("Spare", 0.415 * kV)
+    n.add_source("MV", I_sc=25 * kA, X_R=10)
+    n.add_transformer("TX1", "MV", "LV", S_rated=1.5 * MVA, Z_percent=6, X_R=8)
+    n.add_cable("C1", "LV", "MCC", R=0.1 * ohm / km * 50 * m, X=0.08 * ohm / km * 50 * m)
+    n.add_cable("C2", "LV", "Spare", R=0.01 * ohm, X=0.01 * ohm, closed=False)
+    return n
+
+
+class ShortCircuitTest(unittest.TestCase):
+    def test_radial_network(self):
+        # Hand calculation, in ohms referred to 415 V.
+        Z_source = _impedance(11 / (sqrt(3) * 25), 10) * (0.415 / 11) ** 2
+        Z_tx = _impedance(0.06 * 0.415 ** 2 / 1.5, 8)
+        Z_cable = complex(0.005, 0.004)
+        expected = [25.0, 0.415 / (sqrt(3) * abs(Z_source + Z_tx)), 0.415 / (sqrt(3) * abs(Z_source + Z_tx + Z_cable)),
+                    0.0]
+
+        n = example_network()
+        for sparse in (False, True) if _have_scipy() else (False,):
+            np.testing.assert_allclose(n.fault_currents(sparse=sparse), expected, rtol=1e-12)
+
+        # Closing C2 energises the spare bus.
+        n.set_closed("C2", True)
+        self.assertTrue(n.energised().all())
+        self.assertGreater(n.fault_currents()[3], 0)
+
+    def test_parallel_sources(self):
+        # Two identical transformers in parallel halve the transformer impedance.
+        n = example_network()
+        n.add_transformer("TX2", "MV", "LV", S_rated=1.5 * MVA, Z_percent=6, X_R=8)
+        Z_source = _impedance(11 / (sqrt(3) * 25), 10) * (0.415 / 11) ** 2
+        Z_tx = _impedance(0.06 * 0.415 ** 2 / 1.5, 8) / 2
+        self.assertAlmostEqual(n.fault_currents()[1], 0.415 / (sqrt(3) * abs(Z_source + Z_tx)), 9)
+
+    @unittest.skipUnless(_have_scipy(), "scipy is not installed")
+    def test_sparse_matches_dense(self):
+        rng = np.random.default_rng(1584)
+        n = Network()
+        n.add_bus("B0", 11 * kV)
+        n.add_source("B0", I_sc=25 * kA, X_R=10)
+        for i in range(1, 600):
+            n.add_bus(f"B{i}", 11 * kV)
+            n.add_cable(f"C{i}", f"B{rng.integers(0, i)}", f"B{i}", R=rng.uniform(0.01, 0.2) * ohm,
+                        X=rng.uniform(0.01, 0.2) * ohm)
+        # Some meshing, and a second source.
+        for i in range(50):
+            f, t = rng.integers(0, 600, 2)
+            if f != t:
+                n.add_cable(f"M{i}", f"B{f}", f"B{t}", R=0.1 * ohm, X=0.1 * ohm)
+        n.add_source("B300", I_sc=5 * kA, X_R=5)
+
+        np.testing.assert_allclose(n.fault_currents(sparse=True), n.fault_currents(sparse=False), rtol=1e-9)
+
+    def test_arc_flash_study(self):
+        n = example_network()
+        equipment = {
+            "bus": np.array(["LV", "MCC", "Spare"]),
+            "EC": np.array(["VCB", "VCBB", "HCB"]),
+            "G": np.array([32.0, 25.0, 25.0]),
+            "D": np.array([609.6, 457.2, 457.2]),
+            "height": np.array([1000.0, 600.0, 600.0]),
+            "width": np.array([800.0, 500.0, 500.0]),
+            "depth": np.array([600.0, 300.0, 300.0]),
+            "T": np.array([100.0, 50.0, 50.0]),
+        }
+        results = arc_flash_study(n, equipment)
+
+        I_bf = n.fault_currents()
+        np.testing.assert_array_equal(results["I_bf"], I_bf[[1, 2, 3]])
+        expected = vectorized.calculate(
+            np.array([0.415, 0.415]), equipment["EC"][:2], equipment["G"][:2], equipment["D"][:2],
+            equipment["height"][:2], equipment["width"][:2], equipment["depth"][:2], I_bf[1:3], equipment["T"][:2],
+            "full")
+        np.testing.assert_allclose(results["E_full"][:2], expected["E"], rtol=1e-12)
+        # The spare bus is de-energised.
+        self.assertTrue(np.isnan(results["E_full"][2]))
+        np.testing.assert_array_equal(results["invalid"], [0, 0, 0])
+
+    def test_arc_flash_study_out_of_range(self):
+        n = example_network()
+        n.add_bus("Big", 0.415 * kV)
+        n.add_source("Big", I_sc=150 * kA, X_R=10)  # above the LV limit of 106 kA
+        n.add_bus("HV33", 33 * kV)
+        n.add_source("HV33", I_sc=10 * kA, X_R=10)  # above the limit of 15 kV
+        equipment = {"bus": np.array(["LV", "Big", "HV33", "Spare"]), "EC": "VCB", "G": 32.0, "D": 609.6,
+                     "height": 1000.0, "width": 800.0, "depth": 600.0, "T": 100.0}
+        results = arc_flash_study(n, equipment)
+        np.testing.assert_array_equal(results["invalid"], [0, Reason.I_BF, Reason.V_OC, 0])
+        self.assertFalse(np.isnan(results["E_full"][0]))
+        self.assertTrue(np.all(np.isnan(results["E_full"][1:])))
+
+    def test_bus_index(self):
+        n = example_network()
+        self.assertEqual(n.bus_index("MCC"), 2)
+        np.testing.assert_array_equal(n.bus_index([["MV", "LV"], ["MCC", "Spare"]]), [[0, 1], [2, 3]])
+
+    def test_bad_network(self):
+        n = example_network()
+        with self.assertRaises(ValueError):
+            n.add_bus("LV", 0.415 * kV)
+        with self.assertRaises(ValueError):
+            n.add_cable("C3", "MV", "LV", R=0.01 * ohm, X=0.01 * ohm)
+        with self.assertRaises(ValueError):
+            n.set_closed("C9", False)
+        with self.assertRaises(ValueError):
+            n.add_source("Nowhere", I_sc=10 * kA, X_R=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.surrogate import build_surrogate, SurrogateTable, OUTPUTS
+
+
+class SurrogateTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.HV = build_surrogate("VCB", "HV")
+        cls.LV = build_surrogate("VCBB", "LV")
+
+    def test_within_certified_error(self):
+        # Points not used for certification.
+        rng = np.random.default_rng(1584)
+        for table in (self.HV, self.LV):
+            n = 5000
+            V_oc, I_bf, G, D = (10 ** rng.uniform(np.log10(a[0]), np.log10(a[-1]), n) for a in table.axes.values())
+            CF = rng.uniform(1.0, 2.0, n)
+            T = rng.uniform(20, 2000, n)
+            ec = vectorized.ec_index(np.full(n, table.EC))
+            VarCF = vectorized.VarCF(ec, V_oc)
+            for full_or_reduced in ("full", "reduced",):
+                exact = vectorized.calculate_from_factors(V_oc, ec, G, D, CF, VarCF, I_bf, T, full_or_reduced)
+                I_arc, E = table.query(V_oc, I_bf, G, D, CF, T, full_or_reduced)
+                # A little slack: the certificate is measured on a finite set of points.
+                self.assertLess(np.max(np.abs(I_arc / exact["I_arc"] - 1)), 1.1 * table.max_rel_error["I_arc"])
+                self.assertLess(np.max(np.abs(E / exact["E"] - 1)),
+                                1.1 * table.max_rel_error[f"E_{full_or_reduced}"])
+
+    def test_query_one_matches_query(self):
+        # Example D.1 (IEEE 1584-2018 Annex D): 4.16 kV VCB. Exact E (full) is 12.152 J/cm².
+        for full_or_reduced, T in (("full", 197), ("reduced", 223),):
+            I_arc, E = self.HV.query_one(4.16, 15.0, 104, 914.4, 1.284, T, full_or_reduced)
+            I_arc_v, E_v = self.HV.query(np.array([4.16]), np.array([15.0]), 104, 914.4, 1.284, T, full_or_reduced)
+            self.assertAlmostEqual(I_arc, I_arc_v[0], 9)
+            self.assertAlmostEqual(E, E_v[0], 9)
+        self.assertAlmostEqual(self.HV.query_one(4.16, 15.0, 104, 914.4, 1.284, 197, "full")[1], 12.152, delta=0.2)
+
+    def test_outside_region(self):
+        with self.assertRaises(ValueError):
+            self.HV.query_one(16.0, 15.0, 104, 914.4, 1.284, 197, "full")
+        with self.assertRaises(ValueError):
+            self.LV.query(np.array([0.48]), np.array([200.0]), 32, 609.6, 1.0, 100, "full")
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "VCB_HV.npz")
+            self.HV.save(path)
+            table = SurrogateTable.load(path)
+        self.assertEqual((table.EC, table.band), ("VCB", "HV"))
+        self.assertEqual(table.max_rel_error, self.HV.max_rel_error)
+        for name in OUTPUTS:
+            np.testing.assert_array_equal(table.values[name], self.HV.values[name])
+        self.assertEqual(table.query_one(4.16, 15.0, 104, 914.4, 1.284, 197, "full"),
+                         self.HV.query_one(4.16, 15.0, 104, 914.4, 1.284, 197, "full"))
+
+
+if __name__ == '__main__':
+    unittest.main()
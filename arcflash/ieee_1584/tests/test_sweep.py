@@ -0,0 +1,70 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.result_store import ResultReader
+from arcflash.ieee_1584.scenario_space import ScenarioSpace
+from arcflash.ieee_1584.sweep import run_sweep, merge_shards, completed_shards, evaluate_scenarios, shard_bounds
+from arcflash.ieee_1584.units import kA, kV, ms, mm
+
+space = ScenarioSpace(
+    EC=("VCB", "VCBB", "HOA",),
+    V_oc=(0.48 * kV, 4.16 * kV, 13.8 * kV,),
+    I_bf=(1 * kA, 15 * kA, 40 * kA,),
+    G=(25 * mm, 104 * mm,),
+    D=(457.2 * mm, 914.4 * mm,),
+    T=(100 * ms,),
+    width=(600 * mm,),
+    height=(1143 * mm,),
+    depth=(508 * mm,),
+).filter(("V_oc", "G",), lambda V_oc, G: (V_oc > 0.6) | (G < 76.2))
+
+
+class SweepTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.out_dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_shard_bounds(self):
+        bounds = [shard_bounds(103, 10, s) for s in range(10)]
+        self.assertEqual(bounds[0][0], 0)
+        self.assertEqual(bounds[-1][1], 103)
+        for (_, stop), (start, _) in zip(bounds, bounds[1:]):
+            self.assertEqual(stop, start)
+
+    def test_resume_and_merge(self):
+        # "Machine 0 of 2" completes only the even-numbered shards, as if the sweep had been interrupted part way.
+        ran = run_sweep(space, self.out_dir, n_shards=7, workers=0, machine=0, n_machines=2)
+        self.assertEqual(ran, [0, 2, 4, 6])
+        with self.assertRaises(ValueError):
+            merge_shards(self.out_dir)
+
+        # Resuming runs only the remaining shards, using worker processes.
+        ran = run_sweep(space, self.out_dir, n_shards=7, workers=2, chunk_size=10)
+        self.assertEqual(ran, [1, 3, 5])
+        self.assertEqual(completed_shards(self.out_dir, 7), list(range(7)))
+        self.assertEqual(run_sweep(space, self.out_dir, n_shards=7, workers=0), [])
+
+        # A different sweep can't be resumed in the same directory.
+        with self.assertRaises(ValueError):
+            run_sweep(space, self.out_dir, n_shards=8, workers=0)
+
+        r = ResultReader(merge_shards(self.out_dir))
+        expected = evaluate_scenarios(space[:])
+        self.assertEqual(len(r), len(space))
+        self.assertEqual(set(r.columns), set(expected))
+        for name, values in expected.items():
+            np.testing.assert_array_equal(r[name], values)
+        self.assertTrue(os.path.exists(os.path.join(self.out_dir, "results", "E_full.npy")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.result_store import ResultReader
+from arcflash.ieee_1584.sweep import evaluate_scenarios
+from arcflash.ieee_1584.synthetic import SyntheticSite, SiteProfile, BLOCK_SIZE
+from arcflash.ieee_1584.validation import validate
+
+
+class SyntheticTest(unittest.TestCase):
+    def test_seeded(self):
+        a = SyntheticSite(100000, seed=7)
+        b = SyntheticSite(100000, seed=7)
+        c = SyntheticSite(100000, seed=8)
+        for name in a.designs:
+            np.testing.assert_array_equal(a.designs[name], b.designs[name])
+        # Blocks can be generated in any order.
+        buses_b, steps_b = b.block(1)
+        buses_a, steps_a = list(a.blocks())[1]
+        for name in buses_a:
+            np.testing.assert_array_equal(buses_a[name], buses_b[name])
+        for name in steps_a:
+            np.testing.assert_array_equal(steps_a[name], steps_b[name])
+        self.assertFalse(np.array_equal(buses_a["I_bf"], c.block(1)[0]["I_bf"]))
+
+    def test_realistic(self):
+        site = SyntheticSite(200000, seed=1)
+        blocks = [buses for buses, _ in site.blocks()]
+        buses = {name: np.concatenate([b[name] for b in blocks]) for name in blocks[0]}
+        self.assertEqual(len(buses["bus"]), 200000)
+        np.testing.assert_array_equal(buses["bus"], np.arange(200000))
+
+        # Every bus is within the model's range.
+        reasons = validate(buses["V_oc"], buses["EC"], buses["G"], buses["D"], buses["width"], buses["I_bf"])
+        self.assertTrue(np.all(reasons == 0))
+
+        # Mixture of LV and HV, mostly LV. Skewed EC mix, and many repeated enclosures.
+        LV = np.mean(buses["V_oc"] <= 0.6)
+        self.assertTrue(0.6 < LV < 0.99)
+        self.assertGreater(np.mean(buses["EC"] == "VCB"), 2 * np.mean(buses["EC"] == "HOA"))
+        counts = np.bincount(buses["design"])
+        self.assertGreater(np.sort(counts)[::-1][:len(counts) // 10].sum(), 0.5 * len(buses["bus"]))
+
+    def test_steps(self):
+        profile = SiteProfile(multistep_fraction=0.5, n_steps=4, decrement=0.5)
+        buses, steps = SyntheticSite(5000, seed=2, profile=profile).block(0)
+        multistep = buses["bus"][buses["n_steps"] > 1]
+        self.assertTrue(0.4 < len(multistep) / len(buses["bus"]) < 0.6)
+        np.testing.assert_array_equal(np.unique(steps["bus"]), multistep)
+
+        T = np.bincount(steps["bus"], weights=steps["T"], minlength=len(buses["bus"]))
+        np.testing.assert_allclose(T[multistep], buses["T"][multistep], rtol=1e-12)
+        first = steps["step"] == 0
+        np.testing.assert_array_equal(steps["I_bf"][first], buses["I_bf"][steps["bus"][first]])
+        self.assertTrue(np.all(np.diff(steps["I_bf"].reshape(-1, 4), axis=1) <= 0))
+
+    def test_profile_errors(self):
+        with self.assertRaises(ValueError):
+            SiteProfile(class_weights={"Switchboard": 1})
+        with self.assertRaises(ValueError):
+            SiteProfile(EC_weights={"XYZ": 1})
+
+    def test_write(self):
+        site = SyntheticSite(BLOCK_SIZE + 1000, seed=3)
+        with tempfile.TemporaryDirectory() as tmp:
+            buses_path, steps_path = site.write(os.path.join(tmp, "site"))
+            buses = ResultReader(buses_path)
+            steps = ResultReader(steps_path)
+            self.assertEqual(len(buses), BLOCK_SIZE + 1000)
+            self.assertEqual(len(steps), int(np.sum(buses["n_steps"][buses["n_steps"] > 1])))
+            self.assertEqual(buses.units["I_bf"], "kA")
+
+            # The stored columns can be fed straight to the bulk calculation.
+            chunk = {name: np.asarray(buses[name][:1000]) for name in buses.columns}
+            results = evaluate_scenarios(chunk)
+            self.assertFalse(np.isnan(results["E_full"]).any())
+
+
+if __name__ == "__main__":
+    unittest.main()
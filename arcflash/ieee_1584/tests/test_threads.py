@@ -0,0 +1,82 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Stress test: many threads calculating against the same shared cubicles at once must get exactly the same results as
+# a single thread. Refer frozen.py, and the notes on thread safety in units.py. (To measure how throughput scales with
+# the number of threads, run thread_scaling.py.)
+
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from arcflash.ieee_1584.frozen import FrozenCubicle, ArcFlashResult
+from arcflash.ieee_1584.units import kA, kV, ms, mm
+
+N_THREADS = 16
+
+
+def shared_cubicles() -> list:
+    return [
+        FrozenCubicle(V_oc=4.16 * kV, EC="VCB", G=104 * mm, D=914.4 * mm, height=1143 * mm, width=762 * mm,
+                      depth=508 * mm),
+        FrozenCubicle(V_oc=0.48 * kV, EC="VCBB", G=32 * mm, D=609.6 * mm, height=610 * mm, width=610 * mm,
+                      depth=254 * mm),
+        FrozenCubicle(V_oc=13.8 * kV, EC="HOA", G=152 * mm, D=914.4 * mm, height=1143 * mm, width=762 * mm,
+                      depth=508 * mm),
+        FrozenCubicle(V_oc=0.208 * kV, EC="HCB", G=25 * mm, D=457.2 * mm, height=355.6 * mm, width=304.8 * mm,
+                      depth=190.5 * mm),
+    ]
+
+
+def work(cubicles: list, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    out = list()
+    for i in range(50):
+        c = cubicles[i % len(cubicles)]
+        I_bf = (rng.uniform(0.5, 60) if c.vlevel == "LV" else rng.uniform(0.2, 60)) * kA
+        T_arc = rng.uniform(20, 2000) * ms
+        full_or_reduced = ("full", "reduced",)[i % 2]
+        r = ArcFlashResult.calculate(c, I_bf, T_arc, full_or_reduced)
+        out.append((r.I_arc, r.E, r.AFB))
+    return out
+
+
+class ThreadStressTest(unittest.TestCase):
+    def test_shared_cubicles(self):
+        cubicles = shared_cubicles()
+        expected = [work(cubicles, seed) for seed in range(N_THREADS)]
+
+        # Release all threads at once, to maximise contention.
+        barrier = threading.Barrier(N_THREADS)
+
+        def run(seed):
+            barrier.wait()
+            return work(cubicles, seed)
+
+        with ThreadPoolExecutor(max_workers=N_THREADS) as pool:
+            results = list(pool.map(run, range(N_THREADS)))
+
+        self.assertEqual(results, expected)
+        # The shared cubicles are unchanged.
+        self.assertEqual(cubicles, shared_cubicles())
+
+    def test_shared_compiled_cubicles(self):
+        compiled = [c.compile() for c in shared_cubicles()]
+        I_bf = np.linspace(1, 60, 1000)
+
+        def run(i):
+            c = compiled[i % len(compiled)]
+            return c.evaluate(I_bf, 100.0, ("full", "reduced",)[i % 2])["E"]
+
+        expected = [run(i) for i in range(N_THREADS * 4)]
+        with ThreadPoolExecutor(max_workers=N_THREADS) as pool:
+            results = list(pool.map(run, range(N_THREADS * 4)))
+
+        for r, e in zip(results, expected):
+            np.testing.assert_array_equal(r, e)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+from math import sqrt
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.short_circuit import Network
+from arcflash.ieee_1584.transformer import transformer_fault_currents, transformer_study
+from arcflash.ieee_1584.units import kV, kA, kVA, ohm
+from arcflash.ieee_1584.validation import Reason
+
+TRANSFORMERS = {
+    "V_primary": np.array([11.0, 11.0, 33.0, 6.6]),
+    "I_sc": np.array([25.0, np.inf, 10.0, 20.0]),
+    "X_R_source": np.array([10.0, 10.0, 15.0, 8.0]),
+    "S_rated": np.array([1500.0, 1000.0, 2500.0, 500.0]),
+    "Z_percent": np.array([6.0, 5.0, 7.0, 4.5]),
+    "X_R": np.array([8.0, 6.0, 10.0, 4.0]),
+    "V_secondary": np.array([0.415, 0.4, 0.69, 0.48]),
+    "R_cable": np.array([0.0, 0.002, 0.0, 0.01]),
+    "X_cable": np.array([0.0, 0.001, 0.0, 0.005]),
+    "motor_kVA": np.array([0.0, 0.0, 800.0, 200.0]),
+}
+
+
+class TransformerTest(unittest.TestCase):
+    def test_matches_network(self):
+        # Each row, as a Network: supply, transformer, cable to the bus, and the motors as a source at the bus.
+        I = transformer_fault_currents(TRANSFORMERS)
+        for i in range(len(TRANSFORMERS["S_rated"])):
+            t = {name: values[i].item() for name, values in TRANSFORMERS.items()}
+            n = Network()
+            n.add_bus("HV", t["V_primary"] * kV)
+            n.add_bus("LV", t["V_secondary"] * kV)
+            n.add_source("HV", I_sc=min(t["I_sc"], 1e12) * kA, X_R=t["X_R_source"])  # inf: a very large fault level
+            n.add_transformer("TX", "HV", "LV", S_rated=t["S_rated"] * kVA, Z_percent=t["Z_percent"], X_R=t["X_R"])
+            bus = "LV"
+            if t["R_cable"] or t["X_cable"]:
+                bus = "Bus"
+                n.add_bus(bus, t["V_secondary"] * kV)
+                n.add_cable("C", "LV", bus, R=t["R_cable"] * ohm, X=t["X_cable"] * ohm)
+            if t["motor_kVA"] > 0:
+                # 25% impedance on the motor rating, i.e. 4 times full load current.
+                I_motor = 4 * t["motor_kVA"] / (sqrt(3) * t["V_secondary"] * 1000)
+                n.add_source(bus, I_sc=I_motor * kA, X_R=6)
+                self.assertAlmostEqual(I["I_bf_motor"][i], I_motor, 9)
+            else:
+                self.assertEqual(I["I_bf_motor"][i], 0)
+            self.assertAlmostEqual(I["I_bf"][i] / n.fault_currents()[n.bus_index(bus)], 1, 9)
+            self.assertLessEqual(I["I_bf"][i], (I["I_bf_source"][i] + I["I_bf_motor"][i]) * (1 + 1e-12))
+
+    def test_hand_calculation(self):
+        # 1500 kVA, 6%, fed from an infinite bus: I_bf = 1500 / (sqrt(3) * 0.415 * 0.06) = 34.78 kA.
+        I = transformer_fault_currents({"V_primary": 11, "I_sc": np.inf, "S_rated": 1500, "Z_percent": 6, "X_R": 8,
+                                        "V_secondary": 0.415})
+        self.assertAlmostEqual(I["I_bf"][0], 1500 / (sqrt(3) * 0.415 * 0.06) / 1000, 9)
+
+    def test_study(self):
+        equipment = {"EC": "VCB", "G": 32.0, "D": 609.6, "height": 508.0, "width": 508.0, "depth": 508.0,
+                     "T": np.array([200.0, 150.0, 100.0, 50.0])}
+        r = transformer_study({**TRANSFORMERS, **equipment})
+        np.testing.assert_array_equal(r["V_oc"], TRANSFORMERS["V_secondary"])
+        np.testing.assert_array_equal(r["I_bf"], transformer_fault_currents(TRANSFORMERS)["I_bf"])
+        expected = vectorized.calculate(r["V_oc"], "VCB", 32.0, 609.6, 508.0, 508.0, 508.0, r["I_bf"], r["T"], "full")
+        np.testing.assert_array_equal(r["E_full"], expected["E"])
+        self.assertEqual(r["EC"].shape, (4,))
+
+    def test_study_out_of_range(self):
+        # 5 MVA, 4%, from an infinite bus: I_bf = 5000 / (sqrt(3) * 0.415 * 0.04) = 174 kA, above the LV limit of
+        # 106 kA.
+        equipment = {"EC": "VCB", "G": 32.0, "D": 609.6, "height": 508.0, "width": 508.0, "depth": 508.0, "T": 100.0}
+        r = transformer_study({"V_primary": 11, "I_sc": np.inf, "S_rated": np.array([5000.0, 1500.0]),
+                               "Z_percent": np.array([4.0, 6.0]), "X_R": 8, "V_secondary": 0.415, **equipment})
+        self.assertGreater(r["I_bf"][0], 106)
+        self.assertEqual(r["invalid"].tolist(), [Reason.I_BF, 0])
+        self.assertTrue(np.isnan(r["E_full"][0]))
+        self.assertFalse(np.isnan(r["E_full"][1]))
+
+    def test_missing_column(self):
+        with self.assertRaises(ValueError):
+            transformer_fault_currents({"V_primary": 11, "I_sc": 25})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.units import kA, kV, ms, mm
+from arcflash.ieee_1584.validation import validate, describe, evaluate_valid, Reason
+from arcflash.ieee_1584 import vectorized
+
+
+def random_rows(n: int, seed: int) -> dict:
+    # Inputs straddling every bound.
+    rng = np.random.default_rng(seed)
+    return {
+        "V_oc": rng.choice([0.2, 0.208, 0.48, 0.6, 0.601, 4.16, 15.0, 15.5], n),
+        "EC": rng.choice(["VCB", "VCBB", "HCB", "VOA", "HOA"], n),
+        "G": rng.choice([6.0, 6.35, 25.0, 76.2, 80.0, 19.0, 19.05, 104.0, 254.0, 260.0], n),
+        "D": rng.choice([300.0, 305.0, 914.4], n),
+        "height": rng.choice([355.6, 1143.0], n),
+        "width": rng.choice([100.0, 304.8, 762.0, 1100.0], n),
+        "depth": rng.choice([190.5, 508.0], n),
+        "I_bf": rng.choice([0.1, 0.2, 0.5, 15.0, 65.0, 70.0, 106.0, 110.0], n),
+        "T": rng.uniform(20, 2000, n),
+    }
+
+
+def scalar_ok(row: dict) -> bool:
+    try:
+        c = Cubicle(row["V_oc"] * kV, row["EC"], row["G"] * mm, row["D"] * mm, row["height"] * mm,
+                    row["width"] * mm, row["depth"] * mm)
+        Calculation(c, row["I_bf"] * kA, "full")
+    except (AssertionError, ValueError):
+        return False
+    return True
+
+
+class ValidationTest(unittest.TestCase):
+    def test_matches_scalar_checks(self):
+        rows = random_rows(2000, 1584)
+        reasons = validate(rows["V_oc"], rows["EC"], rows["G"], rows["D"], rows["width"], rows["I_bf"])
+        self.assertEqual(reasons.dtype, np.uint8)
+        for i in range(2000):
+            row = {name: values[i].item() for name, values in rows.items()}
+            self.assertEqual(reasons[i] == 0, scalar_ok(row), (row, describe(reasons[i])))
+        # The test data exercises both outcomes.
+        self.assertTrue(0 < np.count_nonzero(reasons == 0) < 2000)
+
+    def test_reason_codes(self):
+        reasons = validate(
+            V_oc=[0.48, 16.0, 0.48, 4.16, 4.16],
+            EC=["VCB", "VCB", "XYZ", "HCB", "VCB"],
+            G=[25.0, 104.0, 25.0, 10.0, 104.0],
+            D=[457.2, 914.4, 100.0, 914.4, 914.4],
+            width=[508.0, 762.0, 508.0, 762.0, 300.0],
+            I_bf=[20.0, 20.0, 20.0, 80.0, 20.0])
+        self.assertEqual(reasons.tolist(), [0, Reason.V_OC, Reason.EC | Reason.D, Reason.G | Reason.I_BF, Reason.WIDTH])
+        self.assertEqual(describe(reasons[2]), ["D: working distance less than 305 mm",
+                                                "EC: unknown electrode configuration"])
+        self.assertEqual(describe(0), [])
+
+    def test_non_finite(self):
+        nan, inf = np.nan, np.inf
+        reasons = validate(
+            V_oc=[nan, 0.48, 0.48, 0.48, 0.48, 0.48],
+            EC=["VCB"] * 6,
+            G=[104.0, 25.0, nan, 25.0, 25.0, 25.0],
+            D=[914.4, 457.2, 457.2, inf, 457.2, 457.2],
+            width=[762.0, 508.0, 508.0, 508.0, nan, 508.0],
+            I_bf=[20.0, nan, 20.0, 20.0, 20.0, inf])
+        self.assertEqual(reasons.tolist(), [Reason.V_OC, Reason.I_BF, Reason.G | Reason.WIDTH, Reason.D, Reason.WIDTH,
+                                            Reason.I_BF])
+
+    def test_evaluate_valid_mask(self):
+        # Rows masked out (e.g. de-energised) skip the I_bf check, but not the others. A NaN I_bf on a row that isn't
+        # masked out is reported.
+        rows = {"V_oc": 0.48, "EC": "VCB", "G": 32.0, "D": np.array([609.6, 609.6, 100.0, 609.6]), "height": 610.0,
+                "width": 610.0, "depth": 254.0, "I_bf": np.array([0.0, 20.0, 0.0, np.nan]), "T": 100.0}
+        out = evaluate_valid(rows, mask=np.array([False, True, False, True]))
+        self.assertEqual(out["invalid"].tolist(), [0, 0, Reason.D, Reason.I_BF])
+        self.assertEqual(np.isnan(out["E_full"]).tolist(), [True, False, True, True])
+
+    def test_evaluate_valid(self):
+        rows = random_rows(500, 1)
+        out = evaluate_valid(rows)
+        valid = out["invalid"] == 0
+
+        self.assertTrue(np.all(np.isnan(out["E_full"][~valid])))
+        self.assertTrue(np.all(out["E_full"][valid] > 0))
+        expected = vectorized.calculate(*(rows[name][valid] for name in ("V_oc", "EC", "G", "D", "height", "width",
+                                                                          "depth", "I_bf", "T")), "reduced")
+        np.testing.assert_array_equal(out["E_reduced"][valid], expected["E"])
+
+    def test_trusted_mode(self):
+        args = (4.16 * kV, "VCB", 104 * mm, 914.4 * mm, 1143 * mm, 762 * mm, 508 * mm)
+        for check in (True, False):
+            c = Cubicle(*args, check=check)
+            calc = Calculation(c, 15 * kA, "full", check=check)
+            calc.calculate_I_arc()
+            calc.calculate_E_AFB(197 * ms)
+            self.assertAlmostEqual(calc.E.m, 12.152, 3)
+
+        # Out of range inputs are not caught in trusted mode.
+        c = Cubicle(4.16 * kV, "VCB", 104 * mm, 100 * mm, 1143 * mm, 762 * mm, 508 * mm, check=False)
+        Calculation(c, 100 * kA, "full", check=False)
+        with self.assertRaises(AssertionError):
+            Cubicle(4.16 * kV, "VCB", 104 * mm, 100 * mm, 1143 * mm, 762 * mm, 508 * mm)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.additional_test_cases.test_case_generator import valid_space
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.units import kA, kV, ms, mm, inch, J_per_sq_cm
+
+
+def scalar_results(row: dict, full_or_reduced: str) -> dict:
+    c = Cubicle(row["V_oc"] * kV, row["EC"], row["G"] * mm, row["D"] * mm, row["height"] * mm, row["width"] * mm,
+                row["depth"] * mm)
+    calc = Calculation(c, row["I_bf"] * kA, full_or_reduced)
+    calc.calculate_I_arc()
+    calc.calculate_E_AFB(row["T"] * ms)
+    return {"I_arc": calc.I_arc.m_as(kA), "E": calc.E.m_as(J_per_sq_cm), "AFB": calc.AFB.m_as(mm)}
+
+
+class VectorizedTest(unittest.TestCase):
+    def test_annex_D1_D2(self):
+        # D.1 (HV) and D.2 (LV) examples, full and reduced, in a single call for each.
+        V_oc = np.array([4.16, 4.16, 0.48, 0.48])
+        EC = np.array(["VCB"] * 4)
+        G = np.array([104, 104, 32, 32])
+        D = np.array([914.4, 914.4, 609.6, 609.6])
+        height = np.array([1143, 1143, 610, 610])
+        width = np.array([762, 762, 610, 610])
+        depth = np.array([508, 508, 254, 254])
+        I_bf = np.array([15.0, 15.0, 45.0, 45.0])
+
+        T_full = np.array([197, 197, 61.3, 61.3])
+        T_reduced = np.array([223, 223, 319, 319])
+
+        full = vectorized.calculate(V_oc, EC, G, D, height, width, depth, I_bf, T_full, "full")
+        reduced = vectorized.calculate(V_oc, EC, G, D, height, width, depth, I_bf, T_reduced, "reduced")
+
+        self.assertAlmostEqual(full["I_arc"][0], 12.979, 3)  # D.17
+        self.assertAlmostEqual(full["E"][0], 12.152, 3)  # D.32
+        self.assertAlmostEqual(full["AFB"][0], 1606, 0)  # D.42
+        self.assertAlmostEqual(reduced["I_arc"][1], 12.675, 3)  # D.51
+        self.assertAlmostEqual(reduced["E"][1], 13.343, 3)  # D.62
+        self.assertAlmostEqual(reduced["AFB"][1], 1704, 0)  # D.72
+
+        self.assertAlmostEqual(full["I_arc"][2], 28.793, 3)  # D.84
+        self.assertAlmostEqual(full["E"][2], 11.585, 3)  # D.91
+        self.assertAlmostEqual(full["AFB"][2], 1029, 0)  # D.95
+        self.assertAlmostEqual(reduced["I_arc"][3], 25.244, 3)  # D.99
+        self.assertAlmostEqual(reduced["E"][3], 53.156, 3)  # D.103
+        self.assertAlmostEqual(reduced["AFB"][3], 2669, 0)  # D.106
+
+    def test_matches_scalar_calculation(self):
+        # Compare against the scalar code for a spread of the "additional test cases" scenarios.
+        indices = np.arange(0, len(valid_space), 997)
+        cols = valid_space.take(indices)
+
+        for full_or_reduced in ("full", "reduced",):
+            results = vectorized.calculate(cols["V_oc"], cols["EC"], cols["G"], cols["D"], cols["height"],
+                                           cols["width"], cols["depth"], cols["I_bf"], cols["T"], full_or_reduced)
+            for i in range(len(indices)):
+                expected = scalar_results({k: v[i].item() for k, v in cols.items()}, full_or_reduced)
+                for name, value in expected.items():
+                    self.assertAlmostEqual(results[name][i] / value, 1.0, 12)
+
+    def test_enclosure_factors_match_cubicle(self):
+        # Every branch of Table 6, including dimensions exactly on the breakpoints, must match Cubicle bit for bit.
+        rng = np.random.default_rng(0)
+        n = 2000
+        breakpoints = [100, 203.2, 400, 508, 600, 660.4, 900, 1244.6, 1500]
+
+        def dimension():
+            return np.where(rng.random(n) < 0.5, rng.choice(breakpoints, n), rng.uniform(100, 1600, n))
+
+        V_oc = rng.choice([0.208, 0.48, 0.6, 2.4, 4.16, 13.8], n)
+        EC = rng.choice(vectorized.EC_NAMES, n)
+        height, width, depth = dimension(), dimension(), dimension()
+        f = vectorized.enclosure_factors(V_oc, EC, height, width, depth)
+
+        for i in range(n):
+            try:
+                c = Cubicle(V_oc[i] * kV, EC[i], 25 * mm, 914.4 * mm, height[i] * mm, width[i] * mm, depth[i] * mm,
+                            check=False)
+            except AssertionError:
+                continue  # EES < 20 inch for a typical enclosure, which Cubicle rejects
+            self.assertEqual(f["CF"][i], c.CF.m)
+            self.assertEqual(f["VarCF"][i], c.VarCF.m)
+            self.assertEqual(f["enclosure_type"][i], c.enclosure_type or "")
+            if c.EES is None:
+                self.assertTrue(np.isnan(f["EES"][i]))
+            else:
+                self.assertEqual(f["EES"][i], c.EES.m_as(inch))
+                self.assertEqual(f["height_1"][i], c.height_1.m_as(inch))
+                self.assertEqual(f["width_1"][i], c.width_1.m_as(inch))
+
+    def test_full_and_reduced_matches_separate(self):
+        indices = np.arange(0, len(valid_space), 97)
+        cols = valid_space.take(indices)
+        args = (cols["V_oc"], cols["EC"], cols["G"], cols["D"], cols["height"], cols["width"], cols["depth"],
+                cols["I_bf"])
+        T_reduced = cols["T"] * 1.5
+
+        both = vectorized.calculate_full_and_reduced(*args, cols["T"], T_reduced)
+        for full_or_reduced, T in (("full", cols["T"]), ("reduced", T_reduced),):
+            expected = vectorized.calculate(*args, T, full_or_reduced)
+            for name, values in expected.items():
+                np.testing.assert_array_equal(both[full_or_reduced][name], values)
+
+        # T_reduced defaults to T_full.
+        both = vectorized.calculate_full_and_reduced(*args, cols["T"])
+        np.testing.assert_array_equal(both["reduced"]["E"], vectorized.calculate(*args, cols["T"], "reduced")["E"])
+
+    def test_nan_V_oc(self):
+        # A row with V_oc NaN gives NaN results, and does not affect the LV and HV rows either side of it.
+        V_oc = np.array([0.48, np.nan, 4.16])
+        results = vectorized.calculate_full_and_reduced(V_oc, "VCB", 32.0, 609.6, 610.0, 610.0, 254.0, 20.0, 100.0)
+        for case in ("full", "reduced",):
+            for name in ("I_arc", "E", "AFB",):
+                values = results[case][name]
+                self.assertTrue(np.isnan(values[1]))
+                for i in (0, 2,):
+                    expected = vectorized.calculate_full_and_reduced(V_oc[i:i + 1], "VCB", 32.0, 609.6, 610.0, 610.0,
+                                                                     254.0, 20.0, 100.0)[case][name]
+                    self.assertEqual(values[i], expected[0])
+
+    def test_unknown_EC(self):
+        with self.assertRaises(ValueError):
+            vectorized.ec_index(["VCB", "XYZ"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584 import vectorized
+from arcflash.ieee_1584.additional_test_cases.test_case_generator import no_of_scenarios, valid_space
+
+
+class Float32Test(unittest.TestCase):
+    def test_additional_test_cases_float32(self):
+        # Runs every one of the 144,000 "additional test cases" scenarios (less those which are invalid due to busbar
+        # gap vs. enclosure width) in float32 and in float64, and checks that they agree to within 0.1% - the same
+        # tolerance used when checking against the official IEEE 1584 spreadsheets.
+        self.assertEqual(no_of_scenarios, 144000)
+
+        cols = valid_space[:]
+        CF, VarCF = vectorized.cubicle_factors(cols["V_oc"], cols["EC"], cols["height"], cols["width"], cols["depth"])
+
+        for full_or_reduced in ("full", "reduced",):
+            args = (cols["V_oc"], cols["EC"], cols["G"], cols["D"], CF, VarCF, cols["I_bf"], cols["T"],
+                    full_or_reduced,)
+            r32 = vectorized.calculate_from_factors(*args, dtype=np.float32)
+            r64 = vectorized.calculate_from_factors(*args, dtype=np.float64)
+
+            for name in ("I_arc", "E", "AFB",):
+                self.assertEqual(r32[name].dtype, np.float32)
+                self.assertTrue(np.isfinite(r32[name]).all())
+                rel_error = np.abs(r32[name] / r64[name] - 1)
+                self.assertLess(rel_error.max(), 0.001, f"{name} ({full_or_reduced})")
+
+
+if __name__ == '__main__':
+    unittest.main()
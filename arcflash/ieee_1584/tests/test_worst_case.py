@@ -0,0 +1,78 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+import unittest
+
+import numpy as np
+
+from arcflash.ieee_1584.calculation import Calculation
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.units import kA, kV, ms, mm
+from arcflash.ieee_1584.validation import I_BF_RANGE
+from arcflash.ieee_1584.worst_case import Scenario, EnergyBound, worst_case
+
+HV_cubicle = Cubicle(V_oc=4.16 * kV, EC="VCB", G=104 * mm, D=914.4 * mm, height=1143 * mm, width=762 * mm,
+                     depth=508 * mm)
+LV_cubicle = Cubicle(V_oc=0.48 * kV, EC="VCBB", G=32 * mm, D=609.6 * mm, height=610 * mm, width=610 * mm,
+                     depth=254 * mm)
+
+
+class WorstCaseTest(unittest.TestCase):
+    def test_bound_is_an_upper_bound(self):
+        for c in (HV_cubicle, LV_cubicle):
+            bound = EnergyBound(c)
+            compiled = c.compile()
+            I_bf = np.geomspace(*I_BF_RANGE[c.vlevel], 10000)
+            for full_or_reduced in ("full", "reduced",):
+                E = compiled.evaluate(I_bf, 100.0, full_or_reduced)["E"]
+                self.assertTrue(np.all(bound.bound(I_bf, 100.0, full_or_reduced) >= E))
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(1584)
+        for c in (HV_cubicle, LV_cubicle):
+            lo, hi = I_BF_RANGE[c.vlevel]
+            scenarios = [
+                Scenario(f"scenario {i}", rng.uniform(lo, hi) * kA, rng.uniform(20, 2000) * ms,
+                         rng.uniform(20, 2000) * ms)
+                for i in range(40)
+            ]
+
+            worst = worst_case(c, scenarios)
+
+            all_E = list()
+            for s in scenarios:
+                for f, T in s.T_arc.items():
+                    calc = Calculation(c, s.I_bf, f)
+                    calc.calculate_I_arc()
+                    calc.calculate_E_AFB(T)
+                    all_E.append(calc.E)
+
+            self.assertEqual(worst.calculation.E, max(all_E))
+            self.assertEqual(worst.n_candidates, 80)
+            self.assertLess(worst.n_evaluated, worst.n_candidates)
+
+    def test_single_case_scenarios(self):
+        scenarios = [
+            Scenario("A", 15 * kA, T_arc_full=197 * ms),
+            Scenario("B", 15 * kA, T_arc_reduced=223 * ms),
+        ]
+        worst = worst_case(HV_cubicle, scenarios)
+        self.assertEqual(worst.scenario.name, "B")
+        self.assertEqual(worst.full_or_reduced, "reduced")
+        self.assertAlmostEqual(worst.calculation.AFB, 1704 * mm, 0)  # D.72
+
+        with self.assertRaises(ValueError):
+            worst_case(HV_cubicle, [Scenario("None", 15 * kA)])
+
+    def test_out_of_range(self):
+        # A scenario outside the model's range of I_bf raises ValueError, whatever other scenarios there are - even one
+        # whose bound would otherwise have it pruned.
+        ok = Scenario("OK", 50 * kA, T_arc_full=500 * ms)
+        low = Scenario("Low", 0.1 * kA, T_arc_full=1 * ms)
+        for scenarios in ([low], [ok, low], [low, ok],):
+            with self.assertRaises(ValueError):
+                worst_case(LV_cubicle, scenarios)
+
+
+if __name__ == '__main__':
+    unittest.main()
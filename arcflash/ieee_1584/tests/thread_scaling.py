@@ -0,0 +1,34 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Script to measure how calculation throughput scales with the number of threads, with all threads sharing the same
+# FrozenCubicle objects.
+#
+# On a standard (GIL) build of Python, throughput stays roughly flat as threads are added, as the calculation is pure
+# Python. On a free-threaded build (Python 3.13t or later), it should scale with the number of cores.
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from arcflash.ieee_1584.tests.test_threads import shared_cubicles, work
+
+if __name__ == '__main__':
+    cubicles = shared_cubicles()
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}, {os.cpu_count()} CPUs")
+
+    n_tasks = 64
+    work(cubicles, 0)  # warm up
+
+    baseline = None
+    for n_threads in (1, 2, 4, 8, 16):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n_threads) as pool:
+            list(pool.map(lambda seed: work(cubicles, seed), range(n_tasks)))
+        elapsed = time.perf_counter() - start
+
+        rate = n_tasks * 50 / elapsed
+        baseline = baseline or rate
+        print(f"{n_threads:3d} threads: {rate:8.0f} calculations/s ({rate / baseline:.2f}x)")
@@ -0,0 +1,115 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Bolted fault currents for buses fed from a transformer, for many buses at once.
+#
+# Most LV buses in a site study are simply fed from a transformer, from a utility supply of known fault level, possibly
+# through a length of cable, and possibly with motors on the bus. Building a Network (refer short_circuit.py) for each
+# of them is unnecessary: the fault current follows directly from the series impedances, for every bus at once.
+#
+# All impedances are worked out in ohms, referred to the secondary voltage V_secondary:
+#
+#       Z_source = V_secondary² / S_sc              where S_sc = sqrt(3) * V_primary * I_sc
+#       Z_tx     = Z_percent / 100 * V_secondary² / S_rated
+#       Z_cable  = R_cable + j X_cable              (total, per phase, from the transformer to the bus)
+#       Z_motor  = motor_Z_percent / 100 * V_secondary² / motor_kVA
+#
+# with each of Z_source, Z_tx and Z_motor given its X/R ratio. The motors are connected at the faulted bus, so their
+# contribution is in parallel with the supply:
+#
+#       Z_supply    = Z_source + Z_tx + Z_cable
+#       Z_total     = Z_supply || Z_motor
+#
+#       I_bf_source = V_prefault * V_secondary / (sqrt(3) * |Z_supply|)
+#       I_bf_motor  = V_prefault * V_secondary / (sqrt(3) * |Z_motor|)
+#       I_bf        = V_prefault * V_secondary / (sqrt(3) * |Z_total|)
+#
+# (I_bf is the magnitude of the complex sum of the two contributions, so it is a little less than their arithmetic sum
+# when the X/R ratios differ.) The default motor impedance of 25% on the motors' kVA rating is the usual rule of thumb
+# of a locked rotor contribution of 4 times full load current. The same simplifications apply as for short_circuit.py:
+# no load current, nominal taps, and no decrement of the source or motor contributions.
+#
+# Inputs are a dict of columns, one row per bus. Scalars are broadcast to every row.
+#
+#   V_primary           kV          primary (supply) voltage
+#   I_sc                kA          fault level of the supply at the primary. inf for an infinite bus.
+#   X_R_source                      X/R ratio of the supply. Default 10.
+#   S_rated             kVA         transformer rating
+#   Z_percent           %           transformer impedance, on its own rating
+#   X_R                             transformer X/R ratio
+#   V_secondary         kV          secondary voltage
+#   R_cable, X_cable    ohm         cable impedance, per phase. Default 0.
+#   motor_kVA           kVA         total rating of the motors on the bus. Default 0.
+#   motor_Z_percent     %           motor impedance, on motor_kVA. Default 25.
+#   motor_X_R                       motor X/R ratio. Default 6.
+#
+#     buses = {"V_primary": 11, "I_sc": 25, "S_rated": [1500, 1000, 500], "Z_percent": [6, 5, 4.5], "X_R": 8,
+#              "V_secondary": 0.415, "EC": "VCB", "G": 32, "D": 609.6, "height": 508, "width": 508, "depth": 508,
+#              "T": [200, 150, 100]}
+#     results = transformer_study(buses)
+#     results["I_bf"], results["E_full"], results["E_reduced"]
+
+import numpy as np
+
+from arcflash.ieee_1584.executor import Executor
+from arcflash.ieee_1584.short_circuit import _impedance
+from arcflash.ieee_1584.sweep import evaluate_scenarios
+from arcflash.ieee_1584.validation import evaluate_valid
+
+DEFAULTS = {
+    "X_R_source": 10.0,
+    "R_cable": 0.0,
+    "X_cable": 0.0,
+    "motor_kVA": 0.0,
+    "motor_Z_percent": 25.0,
+    "motor_X_R": 6.0,
+}
+
+REQUIRED = ("V_primary", "I_sc", "S_rated", "Z_percent", "X_R", "V_secondary",)
+
+
+def transformer_fault_currents(columns: dict, V_prefault: float = 1.0) -> dict:
+    # Bolted fault current at each bus, and the contributions to it. Refer the notes at the top of this file.
+    # Returns a dict of arrays (kA): I_bf, I_bf_source and I_bf_motor.
+    missing = [name for name in REQUIRED if name not in columns]
+    if missing:
+        raise ValueError(f"Missing column(s) {missing}.")
+    c = {name: columns.get(name, default) for name, default in DEFAULTS.items()}
+    c.update({name: columns[name] for name in REQUIRED})
+    names = tuple(c)
+    values = np.broadcast_arrays(*(np.asarray(c[name], dtype=float) for name in names))
+    c = {name: np.ravel(v) for name, v in zip(names, values)}
+
+    V2 = c["V_secondary"] ** 2  # kV², so that kV² / MVA is ohms
+    Z_source = _impedance(V2 / (np.sqrt(3) * c["V_primary"] * c["I_sc"]), c["X_R_source"])
+    Z_tx = _impedance(c["Z_percent"] / 100 * V2 / (c["S_rated"] / 1000), c["X_R"])
+    Z_supply = Z_source + Z_tx + c["R_cable"] + 1j * c["X_cable"]
+
+    # 1 / Z_total = 1 / Z_supply + 1 / Z_motor. The motors are worked out as an admittance, which is simply 0 where
+    # there are no motors.
+    Y_motor = (c["motor_kVA"] / 1000) / (c["motor_Z_percent"] / 100 * V2) / _impedance(1.0, c["motor_X_R"])
+    I_base = V_prefault * c["V_secondary"] / np.sqrt(3)
+    return {
+        "I_bf": I_base * np.abs(1 / Z_supply + Y_motor),
+        "I_bf_source": I_base / np.abs(Z_supply),
+        "I_bf_motor": I_base * np.abs(Y_motor),
+    }
+
+
+def transformer_study(columns: dict, V_prefault: float = 1.0, evaluate=evaluate_scenarios,
+                      executor: Executor = None) -> dict:
+    # Evaluates IEEE 1584 for every bus, with I_bf from transformer_fault_currents().
+    #
+    # `columns` holds the transformer columns above, plus the equipment columns for evaluate_scenarios(): "EC", "G",
+    # "D", "height", "width", "depth" and "T". V_oc defaults to V_secondary, unless a "V_oc" column is given.
+    #
+    # Returns the columns (broadcast to one value per bus) plus V_oc, I_bf, I_bf_source, I_bf_motor, and the results
+    # of `evaluate`. Buses with no fault current, and buses whose inputs (including I_bf) are outside the model's range,
+    # have NaN results; the "invalid" column gives the reason code for each row. Refer short_circuit.arc_flash_study().
+    # `executor`: refer executor.py.
+    currents = transformer_fault_currents(columns, V_prefault)
+    n = len(currents["I_bf"])
+    out = {name: np.broadcast_to(np.asarray(values), (n,)).copy() for name, values in columns.items()}
+    out.setdefault("V_oc", np.broadcast_to(np.asarray(columns["V_secondary"], dtype=float), (n,)).copy())
+    out.update(currents)
+    return evaluate_valid(out, evaluate, executor, mask=out["I_bf"] > 0)
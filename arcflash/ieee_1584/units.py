@@ -10,6 +10,7 @@ dimensionless = ureg.dimensionless
 inch = ureg.inch
 m = ureg.metre
 mm = ureg.millimetre
+km = ureg.kilometre
 
 sec = ureg.second
 ms = ureg.millisecond
@@ -26,3 +27,38 @@ cal_per_sq_cm = ureg.calorie / (ureg.centimetre ** 2)
 deg = ureg.degree  # Useful when doing phasor arithmetic
 
 ohm = ureg.ohm
+
+kVA = ureg.kilovolt_ampere
+MVA = ureg.megavolt_ampere
+
+# Thread safety
+# =============
+#
+# All of arcflash shares the one unit registry `ureg`. pint fills in several caches inside the registry the first time a
+# unit is parsed, or a conversion is done (parsed units, dimensionality, root units, conversion factors). Each cache
+# entry is written in a single dict assignment, and two threads racing to fill the same entry write the same value, so
+# concurrent use is safe - both with the GIL, and on free-threaded builds of Python (where dict operations are
+# internally locked).
+#
+# To keep it that way:
+#
+#   * Don't change the registry after import - e.g. ureg.define(), enabling contexts with ureg.context() /
+#     ureg.enable_contexts(), or setting ureg.default_format. These change state that every thread sees.
+#   * Don't share Quantities with NumPy array magnitudes between threads, unless nothing changes them in place.
+#
+# The caches are also warmed up here, at import time, for every unit and dimension used by arcflash. Threads then only
+# read from the caches, rather than all filling them at once when a thread pool starts up.
+
+def _warm_up() -> None:
+    units = (dimensionless, inch, m, mm, km, sec, ms, V, kV, A, kA, J_per_sq_cm, cal_per_sq_cm, deg, ohm, kVA, MVA,)
+    for u in units:
+        q = 1.0 * u
+        for other in units:
+            if q.is_compatible_with(other):
+                q.m_as(other)
+    for u, dimension in ((mm, '[length]'), (ms, '[time]'), (kV, '[electric_potential]'), (kA, '[current]'),
+                         (ohm, '[resistance]'), (MVA, '[power]'),):
+        (1.0 * u).check(dimension)
+
+
+_warm_up()
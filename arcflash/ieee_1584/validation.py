@@ -0,0 +1,122 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Vectorised input validation, for batch calculations.
+#
+# Cubicle and Calculation check their inputs with `assert` and ValueError, which is right for one calculation at a
+# time - but in a batch, one bad row would abort the whole study. validate() instead checks whole columns of inputs at
+# once, and returns a reason code for each row: 0 if the row is valid, otherwise a combination of Reason flags, one for
+# each check that failed.
+#
+# The checks are the same as Cubicle.check_model_bounds() and Calculation.__init__() (refer IEEE 1584-2018 s4.2 "Range
+# of model"):
+#
+#   V_OC        0.208 kV <= V_oc <= 15 kV
+#   I_BF        LV: 0.5 kA <= I_bf <= 106 kA. HV: 0.2 kA <= I_bf <= 65 kA.
+#   G           LV: 6.35 mm <= G <= 76.2 mm. HV: 19.05 mm <= G <= 254 mm.
+#   D           D >= 305 mm
+#   WIDTH       width >= 4 * G
+#   EC          EC is one of VCB, VCBB, HCB, VOA, HOA
+#
+# Rows with V_oc outside the model's range are checked against the HV limits if V_oc > 0.6 kV, else the LV limits.
+# A NaN or infinite value fails the check it belongs to (e.g. I_bf NaN gives Reason.I_BF), as does a NaN gap G for
+# WIDTH; a NaN V_oc is checked against the HV limits.
+#
+# Units are as in vectorized.py: V_oc kV, I_bf kA, G, D and width mm.
+#
+#     reasons = validate(V_oc, EC, G, D, width, I_bf)
+#     valid = reasons == 0
+#     describe(reasons[i])    # e.g. ["D: working distance less than 305 mm"]
+#
+# Once inputs have been validated, Cubicle(..., check=False) and Calculation(..., check=False) skip their own checks.
+
+import enum
+
+import numpy as np
+
+from arcflash.ieee_1584.executor import Executor
+from arcflash.ieee_1584.sweep import evaluate_scenarios, evaluate_rows
+from arcflash.ieee_1584.vectorized import EC_NAMES
+
+
+# Range of I_bf (kA) over which the model is valid, for LV (V_oc <= 0.6 kV) and HV. Refer Calculation.__init__().
+I_BF_RANGE = {"LV": (0.5, 106.0), "HV": (0.2, 65.0)}
+
+
+class Reason(enum.IntFlag):
+    V_OC = 1
+    I_BF = 2
+    G = 4
+    D = 8
+    WIDTH = 16
+    EC = 32
+
+
+DESCRIPTIONS = {
+    Reason.V_OC: "V_oc: outside the range 0.208 kV to 15 kV",
+    Reason.I_BF: "I_bf: outside the range 0.5 kA to 106 kA (LV) or 0.2 kA to 65 kA (HV)",
+    Reason.G: "G: outside the range 6.35 mm to 76.2 mm (LV) or 19.05 mm to 254 mm (HV)",
+    Reason.D: "D: working distance less than 305 mm",
+    Reason.WIDTH: "width: enclosure width less than 4 times the gap G",
+    Reason.EC: "EC: unknown electrode configuration",
+}
+
+
+def _outside(x, lo, hi=np.inf) -> np.ndarray:
+    # True where x is not within [lo, hi], including where x is NaN or infinite.
+    x = np.asarray(x, dtype=float)
+    return ~(np.isfinite(x) & (x >= lo) & (x <= hi))
+
+
+def _I_bf_failed(V_oc, I_bf) -> np.ndarray:
+    # The I_BF check, which depends on the voltage level.
+    LV = np.asarray(V_oc, dtype=float) <= 0.6
+    return np.where(LV, _outside(I_bf, *I_BF_RANGE["LV"]), _outside(I_bf, *I_BF_RANGE["HV"]))
+
+
+def validate(V_oc, EC, G, D, width, I_bf=None) -> np.ndarray:
+    # Returns a reason code (uint8) for every row. Rows that pass every check have code 0.
+    # If I_bf is not given, it is not checked.
+    V_oc = np.asarray(V_oc, dtype=float)
+    G = np.asarray(G, dtype=float)
+    LV = V_oc <= 0.6
+
+    failed = {
+        Reason.V_OC: _outside(V_oc, 0.208, 15),
+        Reason.G: np.where(LV, _outside(G, 6.35, 76.2), _outside(G, 19.05, 254)),
+        Reason.D: _outside(D, 305),
+        Reason.WIDTH: _outside(width, 4 * G),
+        Reason.EC: ~np.isin(EC, EC_NAMES),
+    }
+    if I_bf is not None:
+        failed[Reason.I_BF] = _I_bf_failed(V_oc, I_bf)
+
+    reasons = np.zeros(np.broadcast(*failed.values()).shape, dtype=np.uint8)
+    for reason, mask in failed.items():
+        reasons[np.broadcast_to(mask, reasons.shape)] |= np.uint8(reason)
+    return reasons
+
+
+def describe(code: int) -> list:
+    # Human-readable descriptions of the checks that failed, for one reason code.
+    return [text for reason, text in DESCRIPTIONS.items() if int(code) & reason]
+
+
+def evaluate_valid(columns: dict, evaluate=evaluate_scenarios, executor: Executor = None,
+                   mask: np.ndarray = None) -> dict:
+    # Validates a chunk of scenarios (as for sweep.evaluate_scenarios()), and evaluates only the valid rows.
+    # Returns the input columns, an "invalid" column of reason codes, and the results of `evaluate` (NaN for invalid
+    # rows). Can be passed to sweep.run_sweep() as `evaluate`.
+    #
+    # `mask`: if given, rows where it is False (e.g. equipment on de-energised buses) are not evaluated either, and
+    # their I_bf is not checked.
+    reasons = validate(columns["V_oc"], columns["EC"], columns["G"], columns["D"], columns["width"])
+    if columns.get("I_bf") is not None:
+        failed = _I_bf_failed(columns["V_oc"], columns["I_bf"])
+        if mask is not None:
+            failed = failed & mask
+        reasons = reasons | np.where(failed, np.uint8(Reason.I_BF), np.uint8(0))
+    valid = reasons == 0 if mask is None else (reasons == 0) & mask
+    out = evaluate_rows(columns, valid, evaluate, executor)
+    out["invalid"] = reasons
+    return out
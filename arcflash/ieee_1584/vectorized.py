@@ -0,0 +1,392 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Vectorised implementation of the IEEE 1584-2018 calculation, for evaluating large numbers of scenarios at once.
+#
+# The functions here mirror those in equations.py one-for-one, and are written the same way so that they can be
+# checked against the standard (and against each other) by eye. The difference is that they take and return NumPy
+# arrays with one element per scenario, instead of pint Quantities for a single scenario. Creating a pint Quantity for
+# every value of every scenario is far too slow for sweeps of millions of scenarios.
+#
+# All values are plain floats in fixed units - the same units that equations.py converts to internally:
+#
+#   V_oc        kV
+#   I_bf, I_arc kA
+#   G, D        mm
+#   height, width, depth    mm
+#   T           ms
+#   E           J/cm²
+#   AFB         mm
+#
+# The electrode configuration EC can be given as an array of strings ("VCB", etc.) or as an array of indices into
+# EC_NAMES.
+#
+# Unlike the scalar code, the functions here do no checking of input ranges. Refer Cubicle.check_model_bounds() and
+# Calculation.__init__() for the range of validity of the model.
+#
+# Reduced precision:
+# ==================
+#
+# calculate() and calculate_from_factors() take an optional `dtype`. The default is float64. Passing np.float32 halves
+# the memory and bandwidth needed for large sweeps, at the cost of precision. The calculation is arranged to stay
+# accurate in float32:
+#   * The I_bf polynomials in Eq 1 and Eqs 3-6 are evaluated by Horner's method, rather than as a sum of powers of
+#     I_bf. (I_bf ** 7 is up to 106 ** 7 ~ 1.5E14, and the terms of the sum largely cancel.)
+#   * Eqs 3-6 are evaluated as a single power of 10 of a sum of logarithms, as in the standard, so no intermediate
+#     value over- or underflows.
+#   * The AFB is worked out from log10(E) directly, rather than via the (very small) quantity D ** k12.
+# The float32 results are verified against float64 for all of the "additional test cases" scenarios - refer
+# tests/test_vectorized_float32.py.
+
+import numpy as np
+
+from arcflash.ieee_1584.tables import table_1, table_2, table_3, table_4, table_5, table_7
+
+EC_NAMES = ("VCB", "VCBB", "HCB", "VOA", "HOA",)
+
+# Intermediate voltage levels (kV) used for HV calculations.
+V_LEVELS = (0.6, 2.7, 14.3,)
+
+
+def _coefficients(table: dict, n: int, key=lambda ec: ec) -> np.ndarray:
+    # Converts a coefficient table to an array, with one row per electrode configuration (in the order of EC_NAMES)
+    # and one column per coefficient k1 ... kn.
+    return np.array([[table[key(ec)][f"k{i}"] for i in range(1, n + 1)] for ec in EC_NAMES])
+
+
+# Table 1, for Equation 1. Indexed by intermediate voltage level.
+_table_1 = {V: _coefficients(table_1, 10, key=lambda ec, V=V: (ec, V,)) for V in V_LEVELS}
+
+# Table 2, for the equation under Equation 2.
+_table_2 = _coefficients(table_2, 7)
+
+# Table 7, for Equations 14 and 15. Indexed by enclosure type, with one row per enclosed electrode configuration (VCB,
+# VCBB, HCB) and columns b1, b2, b3.
+_table_7 = {
+    enclosure_type: np.array([[table_7[(enclosure_type, ec)][f"b{i}"] for i in range(1, 4)] for ec in EC_NAMES[:3]])
+    for enclosure_type in ("Typical", "Shallow",)
+}
+
+# Tables 3, 4, 5, for Equations 3, 4, 5, 6. Indexed by intermediate voltage level. (0.6 kV is also used for LV.)
+_tables_3_4_5 = {
+    0.6: _coefficients(table_3, 13),
+    2.7: _coefficients(table_4, 13),
+    14.3: _coefficients(table_5, 13),
+}
+
+
+def ec_index(EC) -> np.ndarray:
+    # Converts an array of electrode configuration names to an array of indices into EC_NAMES.
+    EC = np.asarray(EC)
+    if EC.dtype.kind in "iu":
+        return EC.astype(np.intp)
+
+    index = np.full(EC.shape, -1, dtype=np.intp)
+    for i, name in enumerate(EC_NAMES):
+        index[EC == name] = i
+    if (index < 0).any():
+        unknown = sorted(set(EC[index < 0].tolist()))
+        raise ValueError(f"Unknown electrode configuration(s) {unknown}. Must be one of {EC_NAMES}.")
+    return index
+
+
+def I_arc_intermediate(ec: np.ndarray, V_level: float, I_bf: np.ndarray, G: np.ndarray) -> np.ndarray:
+    # Equation 1
+    k = _table_1[V_level].astype(I_bf.dtype)[ec].T
+
+    x1 = + k[0] \
+         + k[1] * np.log10(I_bf) \
+         + k[2] * np.log10(G)
+
+    # k4 * I_bf ** 6 + k5 * I_bf ** 5 + ... + k9 * I_bf + k10, by Horner's method.
+    x2 = k[3]
+    for kn in k[4:10]:
+        x2 = x2 * I_bf + kn
+
+    return (10 ** x1) * x2
+
+
+def I_arc_min(I_arc: np.ndarray, VarCF: np.ndarray) -> np.ndarray:
+    # Equation 2
+    return I_arc * (1 - 0.5 * VarCF)
+
+
+def _powers(x: np.ndarray, n: int) -> np.ndarray:
+    # x ** 0, x ** 1, ... x ** n, stacked along the first axis.
+    #
+    # The powers are worked out with Python's `float ** int`, once per distinct value of x, so that they match the
+    # scalar code bit for bit. (NumPy's power functions round differently in the last place for some inputs.) This is
+    # only used where the scalar code is matched exactly, for V_oc and EES, which have few distinct values.
+    x = np.asarray(x, dtype=float)
+    unique, inverse = np.unique(x, return_inverse=True)
+    table = np.array([[v ** i for i in range(n + 1)] for v in unique.tolist()]).reshape(-1, n + 1)
+    return np.moveaxis(table[inverse.reshape(x.shape)], -1, 0)
+
+
+def VarCF(ec: np.ndarray, V_oc: np.ndarray) -> np.ndarray:
+    # Arcing current variation correction factor. The equation under Equation 2.
+    k = _table_2[ec].T
+    V = _powers(V_oc, 6)
+
+    return + k[0] * V[6] \
+           + k[1] * V[5] \
+           + k[2] * V[4] \
+           + k[3] * V[3] \
+           + k[4] * V[2] \
+           + k[5] * V[1] \
+           + k[6]
+
+
+def intermediate_E(ec: np.ndarray, V_level: float, I_arc: np.ndarray, I_bf: np.ndarray, T: np.ndarray,
+                   G: np.ndarray, CF: np.ndarray, D: np.ndarray, I_arc_600: np.ndarray = None) -> np.ndarray:
+    # Equations 3, 4, 5, 6. Use V_level = 0.6 and supply I_arc_600 for the LV case (Eq 6).
+    k = _tables_3_4_5[V_level].astype(I_bf.dtype)[ec].T
+
+    x1 = 12.552 / 50 * T
+
+    x2 = k[0] + k[1] * np.log10(G)
+
+    if I_arc_600 is None:  # HV case. Eqs 3, 4, 5
+        x3_num = k[2] * I_arc
+    else:  # LV case. Eq 6.
+        x3_num = k[2] * I_arc_600
+
+    # k4 * I_bf ** 7 + k5 * I_bf ** 6 + ... + k10 * I_bf, by Horner's method.
+    x3_den = k[3]
+    for kn in k[4:10]:
+        x3_den = x3_den * I_bf + kn
+    x3_den = x3_den * I_bf
+
+    x3 = x3_num / x3_den
+
+    x4 = + k[10] * np.log10(I_bf) \
+         + k[12] * np.log10(I_arc) \
+         - np.log10(CF)  # i.e. log10(1 / CF)
+
+    x5 = k[11] * np.log10(D)
+
+    return x1 * 10 ** (x2 + x3 + x4 + x5)
+
+
+def intermediate_AFB_from_E(ec: np.ndarray, V_level: float, E: np.ndarray, D: np.ndarray) -> np.ndarray:
+    # Equations 7, 8, 9, 10, via the incident energy. Refer equations.intermediate_AFB_from_E() for the derivation.
+    #
+    #   F = E / (D ** k12)
+    #   AFB = (5.0208 / F) ** (1 / k12)
+    #
+    # which is evaluated in log form, i.e. log10(AFB) = log10(D) + (log10(5.0208) - log10(E)) / k12.
+    k12 = _tables_3_4_5[V_level][ec, 11].astype(E.dtype)
+
+    return 10 ** (np.log10(D) + (np.log10(E.dtype.type(5.0208)) - np.log10(E)) / k12)
+
+
+def interpolate(V_oc: np.ndarray, x_600: np.ndarray, x_2700: np.ndarray, x_14300: np.ndarray) -> np.ndarray:
+    # Eq 16, Eq 19, Eq 22
+    x1 = (((x_2700 - x_600) / 2.1) * (V_oc - 2.7)) + x_2700
+    # Eq 17, Eq 20, Eq 23
+    x2 = (((x_14300 - x_2700) / 11.6) * (V_oc - 14.3)) + x_14300
+    # Eq 18, Eq 21, Eq 24
+    x3 = ((x1 * (2.7 - V_oc)) / 2.1) + ((x2 * (V_oc - 0.6)) / 2.1)
+
+    return np.where(V_oc > 2.7, x2, x3)
+
+
+def I_arc_final_LV(V_oc: np.ndarray, I_arc_600: np.ndarray, I_bf: np.ndarray) -> np.ndarray:
+    # Equation 25
+    x1 = (0.6 / V_oc) ** 2
+    x2 = 1 / (I_arc_600 ** 2)
+    x3 = (0.6 ** 2 - V_oc ** 2) / (0.6 ** 2 * I_bf ** 2)
+    x4 = np.sqrt(x1 * (x2 - x3))
+    return 1 / x4
+
+
+def enclosure_factors(V_oc, EC, height, width, depth) -> dict:
+    # The enclosure size correction factor, as Cubicle.calc_CF() and Cubicle.calc_VarCf(), for each row.
+    # Returns a dict of arrays:
+    #
+    #   enclosure_type  "Typical" or "Shallow" ("" for the open air configurations VOA and HOA)
+    #   height_1        Table 6 (inch; NaN for open air)
+    #   width_1         Table 6 (inch; NaN for open air)
+    #   EES             Equation 13 (inch; NaN for open air)
+    #   CF              Equations 14, 15 (1.0 for open air)
+    #   VarCF           the equation under Equation 2
+    #
+    # The results are identical to Cubicle's, including the printed mm -> inch factor of 0.03937. The branches of
+    # Table 6 are tested in the same order as Cubicle.calc_CF(), so rows exactly on a breakpoint (e.g. 660.4 mm) take
+    # the same branch. Unlike Cubicle, there is no check that EES >= 20 inch for typical enclosures.
+    ec, V_oc, height, width, depth = np.broadcast_arrays(ec_index(EC), *(np.asarray(a, dtype=float) for a in (
+        V_oc, height, width, depth)))
+
+    enclosed = ec < 3  # VCB, VCBB, HCB
+    shallow = enclosed & (V_oc < 0.6) & (height < 508) & (width < 508) & (depth <= 203.2)
+    typical = enclosed & ~shallow
+
+    # Equation 11 / 12
+    A = np.array([4, 10, 10, 0, 0], dtype=float)[ec]
+    B = np.array([20, 24, 22, 1, 1], dtype=float)[ec]
+
+    def eq_11_12(dim):
+        y1 = dim - 660.4
+        y2 = (V_oc + A) / B
+        return (660.4 + (y1 * y2)) / 25.4
+
+    # Table 6. Refer Cubicle.calc_CF() for the mm -> inch factor.
+    mm_to_in = 0.03937
+    vcb = ec == 0
+
+    w = width
+    width_1 = np.select(
+        [(w < 508) & typical, (w < 508) & shallow, (508 <= w) & (w <= 660.4), (660.4 <= w) & (w <= 1244.6),
+         1244.6 < w],
+        [20.0, mm_to_in * w, mm_to_in * w, eq_11_12(w), eq_11_12(np.full_like(w, 1244.6))],
+        np.nan)
+
+    h = height
+    height_1 = np.select(
+        [(h < 508) & typical, (h < 508) & shallow, (508 <= h) & (h <= 660.4), (660.4 <= h) & (h <= 1244.6) & vcb,
+         (660.4 <= h) & (h <= 1244.6), (1244.6 < h) & vcb, 1244.6 < h],
+        [20.0, mm_to_in * h, mm_to_in * h, mm_to_in * h, eq_11_12(h), 49.0, eq_11_12(np.full_like(h, 1244.6))],
+        np.nan)
+
+    width_1[~enclosed] = np.nan
+    height_1[~enclosed] = np.nan
+
+    # Equation 13
+    EES = (height_1 + width_1) / 2
+
+    # Equation 14 / 15
+    b = np.where(shallow[..., np.newaxis], _table_7["Shallow"][np.minimum(ec, 2)],
+                 _table_7["Typical"][np.minimum(ec, 2)])
+    _EES = _powers(EES, 2)
+    x1 = + b[..., 0] * _EES[2] \
+         + b[..., 1] * EES \
+         + b[..., 2]
+    CF = np.where(shallow, 1 / x1, np.where(typical, x1, 1.0))
+
+    return {
+        "enclosure_type": np.where(shallow, "Shallow", np.where(typical, "Typical", "")),
+        "height_1": height_1,
+        "width_1": width_1,
+        "EES": EES,
+        "CF": CF,
+        "VarCF": VarCF(ec, V_oc),
+    }
+
+
+def cubicle_factors(V_oc, EC, height, width, depth) -> (np.ndarray, np.ndarray):
+    # Returns the enclosure size correction factor CF and arcing current variation factor VarCF for each row.
+    f = enclosure_factors(V_oc, EC, height, width, depth)
+    return f["CF"], f["VarCF"]
+
+
+def calculate(V_oc, EC, G, D, height, width, depth, I_bf, T, full_or_reduced: str, dtype=np.float64) -> dict:
+    # Does the full calculation for each row, i.e. the equivalent of:
+    #
+    #     c = Cubicle(V_oc, EC, G, D, height, width, depth)
+    #     calc = Calculation(c, I_bf, full_or_reduced)
+    #     calc.calculate_I_arc()
+    #     calc.calculate_E_AFB(T)
+    #
+    # Returns a dict of arrays: I_arc (kA), E (J/cm²), and AFB (mm), of the given dtype.
+    CF, _VarCF = cubicle_factors(V_oc, EC, height, width, depth)
+    return calculate_from_factors(V_oc, EC, G, D, CF, _VarCF, I_bf, T, full_or_reduced, dtype)
+
+
+def calculate_from_factors(V_oc, EC, G, D, CF, VarCF, I_bf, T, full_or_reduced: str, dtype=np.float64) -> dict:
+    # As calculate(), but with the enclosure correction factors CF and VarCF already known.
+    assert full_or_reduced in ("full", "reduced",)
+    return _calculate_cases(V_oc, EC, G, D, CF, VarCF, I_bf, {full_or_reduced: T}, dtype)[full_or_reduced]
+
+
+def calculate_full_and_reduced(V_oc, EC, G, D, height, width, depth, I_bf, T_full, T_reduced=None,
+                               dtype=np.float64) -> dict:
+    # Does both the "full" and the "reduced" calculation for each row, i.e. the equivalent of:
+    #
+    #     calculate(..., I_bf, T_full, "full"), calculate(..., I_bf, T_reduced, "reduced")
+    #
+    # but with the intermediate arcing currents (Eq 1, and Eq 25 for LV) worked out only once, and shared between the
+    # two cases. Each case has its own clearing time; T_reduced defaults to T_full.
+    #
+    # Returns a dict {"full": ..., "reduced": ...} of the results of calculate(), which it matches exactly.
+    CF, _VarCF = cubicle_factors(V_oc, EC, height, width, depth)
+    return calculate_full_and_reduced_from_factors(V_oc, EC, G, D, CF, _VarCF, I_bf, T_full, T_reduced, dtype)
+
+
+def calculate_full_and_reduced_from_factors(V_oc, EC, G, D, CF, VarCF, I_bf, T_full, T_reduced=None,
+                                            dtype=np.float64) -> dict:
+    # As calculate_full_and_reduced(), but with the enclosure correction factors CF and VarCF already known.
+    T = {"full": T_full, "reduced": T_full if T_reduced is None else T_reduced}
+    return _calculate_cases(V_oc, EC, G, D, CF, VarCF, I_bf, T, dtype)
+
+
+def _rows(mask: np.ndarray):
+    # An index for the rows where `mask` is True: a slice (i.e. a view, with no copying) if that is every row, or None
+    # if there are none.
+    if mask.all():
+        return slice(None)
+    return mask if mask.any() else None
+
+
+def _uniform(ec: np.ndarray):
+    # A single electrode configuration index, if every row has the same one. Indexing the coefficient tables with it
+    # gives one row of coefficients, which broadcasts, instead of a copy of the row for every scenario.
+    if len(ec) and (ec == ec[0]).all():
+        return ec[0]
+    return ec
+
+
+def _calculate_cases(V_oc, EC, G, D, CF, VarCF, I_bf, T: dict, dtype) -> dict:
+    # Evaluates one or both of the "full" and "reduced" cases, given as a dict of case -> T. The intermediate arcing
+    # currents are shared between the cases. Returns a dict of case -> {"I_arc": ..., "E": ..., "AFB": ...}.
+    dtype = np.dtype(dtype)
+    assert dtype in (np.float32, np.float64)
+
+    cases = tuple(T)
+    ec = ec_index(EC)
+    ec, V_oc, G, D, CF, VarCF, I_bf, *Ts = np.broadcast_arrays(ec, *(np.asarray(a, dtype=dtype) for a in (
+        V_oc, G, D, CF, VarCF, I_bf, *T.values())))
+    ec, V_oc, G, D, CF, VarCF, I_bf, *Ts = (np.ravel(a) for a in (ec, V_oc, G, D, CF, VarCF, I_bf, *Ts))
+    T = dict(zip(cases, Ts))
+
+    out = {case: {name: np.empty(V_oc.shape, dtype=dtype) for name in ("I_arc", "E", "AFB",)} for case in cases}
+
+    # Homogeneous inputs (e.g. blocks from scheduler.py) skip the LV/HV masking, and use a single row of coefficients.
+    # (Rows with V_oc NaN go to the HV model, which gives NaN for them.)
+    lv_mask = V_oc <= 0.6
+    lv, hv = _rows(lv_mask), _rows(~lv_mask)
+    if lv is not None:
+        _V_oc, _ec, _G, _D, _CF, _VarCF, _I_bf = (a[lv] for a in (V_oc, ec, G, D, CF, VarCF, I_bf))
+        _ec = _uniform(_ec)
+
+        _I_arc_600 = I_arc_intermediate(_ec, 0.6, _I_bf, _G)
+        _I_arc_full = I_arc_final_LV(_V_oc, _I_arc_600, _I_bf)
+        for case in cases:
+            _I_arc = I_arc_min(_I_arc_full, _VarCF) if case == "reduced" else _I_arc_full
+
+            # Note I_arc_600 (full), **not** I_arc_600 (reduced), even in a "reduced" calculation.
+            _E = intermediate_E(_ec, 0.6, _I_arc, _I_bf, T[case][lv], _G, _CF, _D, _I_arc_600)
+
+            out[case]["I_arc"][lv] = _I_arc
+            out[case]["E"][lv] = _E
+            out[case]["AFB"][lv] = intermediate_AFB_from_E(_ec, 0.6, _E, _D)
+
+    if hv is not None:
+        _V_oc, _ec, _G, _D, _CF, _VarCF, _I_bf = (a[hv] for a in (V_oc, ec, G, D, CF, VarCF, I_bf))
+        _ec = _uniform(_ec)
+
+        I_arc_full = {V: I_arc_intermediate(_ec, V, _I_bf, _G) for V in V_LEVELS}
+        for case in cases:
+            _T = T[case][hv]
+            I_arc_x = dict()
+            E_x = dict()
+            AFB_x = dict()
+            for V in V_LEVELS:
+                I_arc_x[V] = I_arc_min(I_arc_full[V], _VarCF) if case == "reduced" else I_arc_full[V]
+                E_x[V] = intermediate_E(_ec, V, I_arc_x[V], _I_bf, _T, _G, _CF, _D)
+                AFB_x[V] = intermediate_AFB_from_E(_ec, V, E_x[V], _D)
+
+            out[case]["I_arc"][hv] = interpolate(_V_oc, *(I_arc_x[V] for V in V_LEVELS))
+            out[case]["E"][hv] = interpolate(_V_oc, *(E_x[V] for V in V_LEVELS))
+            out[case]["AFB"][hv] = interpolate(_V_oc, *(AFB_x[V] for V in V_LEVELS))
+
+    return out
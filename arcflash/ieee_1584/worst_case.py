@@ -0,0 +1,127 @@
+# Copyright 2022, Li-aung Yip - https://www.penwatch.net
+# Licensed under the MIT License. Refer LICENSE.txt.
+
+# Finds the worst-case (highest incident energy) operating scenario for a cubicle, without evaluating every scenario.
+#
+# A bus is usually studied under several operating scenarios - maximum and minimum utility fault level, tie open or
+# closed, motors on or off - each with a full and a reduced arcing current case and its own clearing time. Only the
+# worst case goes on the label.
+#
+# Bounds:
+# =======
+#
+# For a fixed cubicle, Eqs 3-6 give E = T * e(I_bf), i.e. E is exactly proportional to T. (The factor 12.552 / 50 * T
+# is outside the power of 10, and nothing else depends on T.) So an upper bound on E is:
+#
+#       E <= T * e_max(I_bf)
+#
+# where e_max(I_bf) is an upper bound on the "energy per millisecond" e(I_bf). e(I_bf) is not monotonic in I_bf (due to
+# the polynomial terms in Eq 1 and Eqs 3-6), so its values at a few points say nothing certain about the values in
+# between. Instead, e_max is tabulated once per cubicle, for each cell of a log-spaced grid covering the model's I_bf
+# range, with interval.bounds(): Eqs 1-25 evaluated in interval arithmetic over the cell, with the polynomials bounded
+# exactly by their values at the ends of the cell and at their turning points, and monotonicity in I_bf used where it
+# can be shown. This is a guaranteed upper bound on e(I_bf) anywhere in the cell (refer interval.py), so the pruning
+# below can never skip the worst case.
+#
+# Search:
+# =======
+#
+# Candidates are evaluated (with Calculation, in full) in decreasing order of their bound. As soon as the next bound is
+# no greater than the worst E found so far, none of the remaining candidates can beat it, so the search stops.
+#
+#     scenarios = [
+#         Scenario("Max utility, tie closed", 32 * kA, T_arc_full=80 * ms, T_arc_reduced=120 * ms),
+#         Scenario("Min utility, tie open", 18 * kA, T_arc_full=350 * ms, T_arc_reduced=600 * ms),
+#         ...
+#     ]
+#     worst = worst_case(cubicle, scenarios)
+#     worst.scenario.name, worst.full_or_reduced, worst.calculation.E, worst.calculation.AFB
+
+import numpy as np
+
+from arcflash.ieee_1584.calculation import Calculation, check_inputs
+from arcflash.ieee_1584.cubicle import Cubicle
+from arcflash.ieee_1584.executor import Executor
+from arcflash.ieee_1584.interval import Interval, bounds
+from arcflash.ieee_1584.units import Q_, kA, kV, ms, mm, J_per_sq_cm
+from arcflash.ieee_1584.validation import I_BF_RANGE
+
+
+class Scenario:
+    def __init__(self, name: str, I_bf: Q_, T_arc_full: Q_ = None, T_arc_reduced: Q_ = None):
+        # A scenario with no clearing time for the full (or reduced) case does not include that case.
+        assert I_bf.check('[current]')
+        assert T_arc_full is None or T_arc_full.check('[time]')
+        assert T_arc_reduced is None or T_arc_reduced.check('[time]')
+
+        self.name = name
+        self.I_bf = I_bf
+        self.T_arc = {"full": T_arc_full, "reduced": T_arc_reduced}
+
+
+class WorstCase:
+    def __init__(self, scenario: Scenario, full_or_reduced: str, calculation: Calculation, n_evaluated: int,
+                 n_candidates: int):
+        self.scenario = scenario
+        self.full_or_reduced = full_or_reduced
+        self.calculation = calculation
+
+        # Number of (scenario, full/reduced) cases evaluated in full, out of the total number of cases.
+        self.n_evaluated = n_evaluated
+        self.n_candidates = n_candidates
+
+
+class EnergyBound:
+    # Tabulated upper bound on incident energy per millisecond of arcing, e_max(I_bf), for one cubicle.
+    def __init__(self, c: Cubicle, n_grid: int = 128, executor: Executor = None):
+        # `executor`: the grid cells are bounded in chunks, on `executor` (refer interval.bounds()).
+        lo, hi = I_BF_RANGE[c.vlevel]
+        self.grid = np.geomspace(lo, hi, n_grid)
+        cells = Interval(self.grid[:-1], self.grid[1:])
+
+        self.cell_max = dict()
+        for full_or_reduced in ("full", "reduced",):
+            b = bounds(c.V_oc.m_as(kV), c.EC, c.G.m_as(mm), c.D.m_as(mm), c.height.m_as(mm), c.width.m_as(mm),
+                       c.depth.m_as(mm), cells, 1.0, full_or_reduced, executor=executor)
+            self.cell_max[full_or_reduced] = b["E"].hi
+
+    def bound(self, I_bf, T, full_or_reduced: str) -> np.ndarray:
+        # Upper bound on E (J/cm²), for I_bf in kA and T in ms (scalars or arrays).
+        cell = np.clip(np.searchsorted(self.grid, I_bf, side="right") - 1, 0, len(self.grid) - 2)
+        return np.asarray(T) * self.cell_max[full_or_reduced][cell]
+
+
+def worst_case(c: Cubicle, scenarios: list, bound: EnergyBound = None, executor: Executor = None) -> WorstCase:
+    # Returns the scenario and case (full or reduced) giving the highest incident energy E.
+    # Pass a previously constructed `bound` to reuse it across calls for the same cubicle. `executor` is used to build
+    # the bound, if it isn't given (refer EnergyBound).
+    if bound is None:
+        bound = EnergyBound(c, executor=executor)
+
+    candidates = [(s, f, T) for s in scenarios for f, T in s.T_arc.items() if T is not None]
+    if not candidates:
+        raise ValueError("No scenarios to evaluate.")
+
+    # The bound only covers the model's range of I_bf, so check every candidate before any are pruned. Otherwise a
+    # scenario outside the range would be skipped or not depending on the others.
+    for s, f, _ in candidates:
+        check_inputs(c, s.I_bf, f)
+
+    bounds = np.array([bound.bound(s.I_bf.m_as(kA), T.m_as(ms), f) for s, f, T in candidates])
+
+    worst = None
+    n_evaluated = 0
+    for i in np.argsort(-bounds, kind="stable"):
+        if worst is not None and bounds[i] <= worst[2].E.m_as(J_per_sq_cm):
+            break
+
+        s, full_or_reduced, T = candidates[i]
+        calc = Calculation(c, s.I_bf, full_or_reduced)
+        calc.calculate_I_arc()
+        calc.calculate_E_AFB(T)
+        n_evaluated += 1
+
+        if worst is None or calc.E > worst[2].E:
+            worst = (s, full_or_reduced, calc)
+
+    return WorstCase(*worst, n_evaluated=n_evaluated, n_candidates=len(candidates))